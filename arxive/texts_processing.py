@@ -12,14 +12,59 @@ def group_gen(asc_dsc: list):
         yield k, [x[0] for x in v]
 
 
+_WORD = re.compile(r"\w+")
+_PHRASE_END = None
+
+
+def _is_word_phrase(phrase: str) -> bool:
+    """True if phrase is non-empty words separated by single spaces, i.e. \b...\b matches whole tokens only."""
+    tokens = phrase.split(" ")
+    return bool(phrase) and all(_WORD.fullmatch(tk) for tk in tokens)
+
+
+class PhraseMatcher:
+    """Token trie of multi-word phrases. Each phrase carries a list of payloads in insertion order."""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, phrase: list[str], payload):
+        node = self.root
+        for token in phrase:
+            node = node.setdefault(token, {})
+        node.setdefault(_PHRASE_END, []).append(payload)
+
+    def __bool__(self):
+        return bool(self.root)
+
+    def matches_at(self, tokens: list[str], start: int):
+        """(length, payloads) of every phrase that starts at tokens[start], shortest first"""
+        node = self.root
+        for end in range(start, len(tokens)):
+            node = node.get(tokens[end])
+            if node is None:
+                return
+            if _PHRASE_END in node:
+                yield end - start + 1, node[_PHRASE_END]
+
+
 class TextsTokenizer:
     """Tokenizer"""
 
-    def __init__(self, mystem_path=None):
+    def __init__(self, mystem_path=None, lemmatizer=None):
         self.stopwords = []
         self.synonyms = []
         self.stop_words_patterns = re.compile("")
-        if mystem_path:
+        # token-trie engine: lemmatized phrases of each synonym group (same order as self.synonyms)
+        self._synonym_groups = []
+        self._synonym_replacements = []
+        self._synonym_matcher = PhraseMatcher()
+        self._stopword_matcher = PhraseMatcher()
+        self._use_matcher = True
+        if lemmatizer is not None:
+            # anything with Mystem-compatible lemmatize(text) -> list[str]
+            self.m = lemmatizer
+        elif mystem_path:
             self.m = Mystem(mystem_bin=mystem_path)
         else:
             self.m = Mystem()
@@ -38,6 +83,7 @@ class TextsTokenizer:
         """adding stop words into class"""
         self.stopwords = [" ".join(x) for x in self.texts2tokens(stopwords)]
         self.stop_words_patterns = re.compile("|".join([r"\b" + tx + r"\b" for tx in self.stopwords]))
+        self._build_matchers()
 
     def add_synonyms(self, synonyms: list[(str)]):
         """adding stop words into class"""
@@ -46,16 +92,125 @@ class TextsTokenizer:
         syns_dct = {k: v for k, v in group_gen([(a, d) for a, d in zip(lm_ascs, dscs)])}
         for asc in syns_dct:
             self.synonyms.append((asc, re.compile("|".join([r"\b" + w + r"\b" for w in syns_dct[asc]]))))
+            self._synonym_groups.append(syns_dct[asc])
+        self._build_matchers()
 
     def del_stopwords(self, stopwords: list[str]):
         """adding stop words into class"""
         stopwords_del = [x for x in chain(*self.texts2tokens(stopwords))]
         self.stopwords = [w for w in self.stopwords if w not in stopwords_del]
         self.stop_words_patterns = re.compile("|".join([r"\b" + tx + r"\b" for tx in self.stopwords]))
+        self._build_matchers()
+
+    def _build_matchers(self):
+        """
+        Compile stopwords and synonyms into token tries applied in one pass per text.
+
+        The regex engine applies synonym groups one after another, so a replacement
+        may be rewritten again by a later group. The trie engine reproduces that only
+        when no later group can match inside an earlier replacement; for such
+        dictionaries (and for phrases that are not plain words) tokenization keeps
+        using the regex engine, so the output is the same either way.
+        """
+        self._use_matcher = True
+        self._stopword_matcher = PhraseMatcher()
+        for i, phrase in enumerate(self.stopwords):
+            if not _is_word_phrase(phrase):
+                self._use_matcher = False
+            self._stopword_matcher.add(phrase.split(), i)
+
+        self._synonym_matcher = PhraseMatcher()
+        replacements = []
+        for (dsc, _), ascs in zip(self.synonyms, self._synonym_groups):
+            try:
+                # the regex engine treats dsc as a re.sub template
+                text = re.compile("").sub(dsc, "", count=1)
+            except re.error:
+                self._use_matcher = False
+                text = dsc
+            if not _is_word_phrase(text):
+                self._use_matcher = False
+            replacements.append((text.split(), text))
+
+        later_tokens = set()
+        for group in reversed(range(len(self._synonym_groups))):
+            if later_tokens.intersection(replacements[group][0]):
+                self._use_matcher = False
+            for alt, asc in enumerate(self._synonym_groups[group]):
+                if not _is_word_phrase(asc):
+                    self._use_matcher = False
+                self._synonym_matcher.add(asc.split(), (group, alt))
+                later_tokens.update(asc.split())
+        self._synonym_replacements = replacements
+
+    def _replace_synonyms(self, tokens: list[str]) -> list[str]:
+        """Synonym replacement over one text with the result of the sequential regex groups"""
+        candidates = {}
+        for start in range(len(tokens)):
+            for length, payloads in self._synonym_matcher.matches_at(tokens, start):
+                for group, alt in payloads:
+                    candidates.setdefault(group, []).append((start, alt, length))
+        if not candidates:
+            return tokens
+
+        covered = [False] * len(tokens)
+        replaced = {}
+        for group in sorted(candidates):
+            # leftmost match, first alternative wins, matches of one group do not overlap
+            cursor = 0
+            for start, alt, length in sorted(candidates[group]):
+                if start < cursor or any(covered[start:start + length]):
+                    continue
+                covered[start:start + length] = [True] * length
+                replaced[start] = (length, group)
+                cursor = start + length
+
+        result = []
+        i = 0
+        while i < len(tokens):
+            if i in replaced:
+                length, group = replaced[i]
+                result.extend(self._synonym_replacements[group][0])
+                i += length
+            else:
+                result.append(tokens[i])
+                i += 1
+        return result
+
+    def _remove_stopwords(self, tokens: list[str]) -> list[str]:
+        """Stop words removal over one text: leftmost match, first stop word in the list wins"""
+        result = []
+        i = 0
+        while i < len(tokens):
+            best = None
+            for length, indexes in self._stopword_matcher.matches_at(tokens, i):
+                if best is None or indexes[0] < best[0]:
+                    best = (indexes[0], length)
+            if best is None:
+                result.append(tokens[i])
+                i += 1
+            else:
+                i += best[1]
+        return result
 
     def tokenization(self, texts: list[str]) -> list[list]:
         """list of texts lemmatization with stop words deleting"""
         lemm_texts = self.texts2tokens(texts)
+        if self._use_matcher:
+            return self._apply_matchers(lemm_texts)
+        return self._apply_patterns(lemm_texts)
+
+    def _apply_matchers(self, lemm_texts: list[list]) -> list[list]:
+        """synonyms and stop words in one pass over tokens of each text"""
+        if self.synonyms:
+            # the regex engine splits "".join of no texts into one empty text
+            lemm_texts = [self._replace_synonyms(l_tx) for l_tx in lemm_texts] or [[]]
+        if self.stopwords:
+            return [self._remove_stopwords(l_tx) for l_tx in lemm_texts]
+        return lemm_texts
+
+    def _apply_patterns(self, lemm_texts: list[list]) -> list[list]:
+        """synonyms and stop words with the compiled regular expressions"""
         if self.synonyms:
             lem_texts_union = "\n".join([" ".join(lm_tx) for lm_tx in lemm_texts])
             for syn_pair in self.synonyms:
@@ -0,0 +1,87 @@
+"""
+Stop words / synonyms engine of arxive/texts_processing.TextsTokenizer:
+regex alternation (one re.sub per synonym group) vs the token-trie matcher.
+
+Mystem is replaced by a whitespace splitter so only the dictionary engine is measured.
+
+    python benchmarks/bench_phrase_matcher.py [--synonyms 3000] [--stopwords 300]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "arxive"))
+
+from texts_processing import TextsTokenizer
+
+
+class SplitLemmatizer:
+    """Mystem-compatible lemmatize(): words and separators as they are, plus the trailing newline"""
+
+    def lemmatize(self, text):
+        return re.findall(r"\w+|\W+", text) + ["\n"]
+
+
+def make_words(count: int, rnd: random.Random) -> list[str]:
+    letters = "абвгдежзиклмнопрстуфхцчшэюя"
+    return ["".join(rnd.choice(letters) for _ in range(rnd.randint(3, 9))) for _ in range(count)]
+
+
+def make_phrase(words: list[str], rnd: random.Random) -> str:
+    return " ".join(rnd.choice(words) for _ in range(rnd.choice((1, 1, 2, 2, 3))))
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synonyms", type=int, default=3000)
+    parser.add_argument("--stopwords", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    words = make_words(5000, rnd)
+    # replacements come from their own vocabulary, so synonym groups do not cascade,
+    # and stop words are kept out of synonym phrases, which would otherwise lemmatize to ""
+    targets = [w.upper() for w in make_words(args.synonyms // 3 + 1, rnd)]
+    stop_words = words[:1000]
+    words = words[1000:]
+
+    tknz = TextsTokenizer(lemmatizer=SplitLemmatizer())
+    start = time.perf_counter()
+    tknz.add_stopwords([make_phrase(stop_words, rnd) for _ in range(args.stopwords)])
+    tknz.add_synonyms([(make_phrase(words, rnd), rnd.choice(targets)) for _ in range(args.synonyms)])
+    print(f"dictionaries: {len(tknz.stopwords)} stop words, {len(tknz.synonyms)} synonym groups, "
+          f"built in {time.perf_counter() - start:.2f}s, trie engine: {tknz._use_matcher}")
+
+    text_words = words + stop_words
+    cases = {
+        "1 short query (5 words)": [" ".join(rnd.choice(text_words) for _ in range(5))],
+        "1 long text (2000 words)": [" ".join(rnd.choice(text_words) for _ in range(2000))],
+        "20 texts x 200 words": [" ".join(rnd.choice(text_words) for _ in range(200)) for _ in range(20)],
+    }
+
+    print(f"{'case':<28}{'regex, ms':>12}{'trie, ms':>12}{'speedup':>10}  same output")
+    for name, texts in cases.items():
+        lemm_texts = tknz.texts2tokens(texts)
+        regex_result = tknz._apply_patterns(lemm_texts)
+        trie_result = tknz._apply_matchers(lemm_texts)
+        regex_time = timeit(lambda: tknz._apply_patterns(lemm_texts), args.repeat)
+        trie_time = timeit(lambda: tknz._apply_matchers(lemm_texts), args.repeat)
+        print(f"{name:<28}{regex_time * 1000:>12.2f}{trie_time * 1000:>12.2f}{regex_time / trie_time:>9.1f}x  {regex_result == trie_result}")
+
+
+if __name__ == "__main__":
+    main()
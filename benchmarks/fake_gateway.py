@@ -0,0 +1,109 @@
+"""
+Local stand-in for the Search Gateway: POST /search/projects and /search/prices
+answer after a configurable latency with synthetic results of a configurable size.
+
+The "fields" projection and "snippet_length" of a request are honored by default;
+--projection ignore answers like a gateway that doesn't know them, and
+--projection reject like one that refuses them with 422.
+
+    python benchmarks/fake_gateway.py [--port 8002] [--latency-ms 20] [--jitter-ms 5] [--results 5] [--text-size 2000]
+                                      [--projection honor|ignore|reject]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.infrastructure.nlp.snippets import extract_snippet
+
+PROJECTIONS = ("honor", "ignore", "reject")
+
+
+def make_results(kind: str, count: int, text_size: int, rnd: random.Random) -> list:
+    words = ["сайт", "магазин", "дизайн", "интеграция", "разработка", "поддержка", "хостинг", "клиника", "каталог", "доставка"]
+
+    def text() -> str:
+        out = []
+        size = 0
+        while size < text_size:
+            word = rnd.choice(words)
+            out.append(word)
+            size += len(word) + 1
+        return " ".join(out)[:text_size]
+
+    if kind == "projects":
+        return [{"title": f"Проект {i}", "url": f"https://example.com/projects/{i}", "full_text": text()} for i in range(count)]
+    return [
+        {"service": f"Услуга {i}", "price": 1000.0 + 250 * i, "description": text()[:200], "full_text": text()}
+        for i in range(count)
+    ]
+
+
+def project(results: list, body: dict) -> list:
+    """results as a gateway honoring the request's "fields" and "snippet_length" returns them."""
+    fields = body.get("fields")
+    length = body.get("snippet_length")
+    if not fields and not length:
+        return results
+    projected = []
+    for item in results:
+        item = {k: v for k, v in item.items() if k in fields} if fields else dict(item)
+        if length and "full_text" in item:
+            item["full_text"] = extract_snippet(item["full_text"], body.get("query") or "", length, highlight=False)
+        projected.append(item)
+    return projected
+
+
+def create_app(latency_ms: float = 20.0, jitter_ms: float = 5.0, results: int = 5, text_size: int = 2000, seed: int = 42,
+               projection: str = "honor") -> Starlette:
+    rnd = random.Random(seed)
+    # Bodies are built once: the stub should cost the benchmark as little CPU as possible
+    payloads = {kind: make_results(kind, results, text_size, rnd) for kind in ("projects", "prices")}
+
+    def endpoint(kind: str):
+        async def handle(request: Request):
+            body = await request.json()
+            if projection == "reject" and ("fields" in body or "snippet_length" in body):
+                return JSONResponse({"detail": "unknown parameters: fields, snippet_length"}, status_code=422)
+            delay = max(0.0, rnd.gauss(latency_ms, jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+            limit = int(body.get("limit") or results)
+            hits = payloads[kind][:limit]
+            return JSONResponse({"results": project(hits, body) if projection == "honor" else hits})
+        return handle
+
+    async def root(request: Request):
+        return PlainTextResponse("fake search gateway")
+
+    return Starlette(routes=[
+        Route("/", root),
+        Route("/search/projects", endpoint("projects"), methods=["POST"]),
+        Route("/search/prices", endpoint("prices"), methods=["POST"]),
+    ])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--results", type=int, default=5)
+    parser.add_argument("--text-size", type=int, default=2000)
+    parser.add_argument("--projection", choices=PROJECTIONS, default="honor")
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.results, args.text_size, projection=args.projection)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
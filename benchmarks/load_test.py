@@ -0,0 +1,251 @@
+"""
+Load test of the SSE MCP server (src/presentation/mcp_sse_server.py) against the fake gateway.
+
+Starts benchmarks/fake_gateway.py and starlette_app in child processes (so server
+CPU and RSS are measured apart from the load generator; with --workers, summed over
+the workers and the session broker), then for every concurrency
+level opens N SSE sessions that call search_projects / search_prices in a loop
+for --duration seconds, and reports throughput, latency percentiles, errors and
+server CPU / RSS (Linux /proc). The load generator runs on the same machine:
+on few cores it competes with the server, so compare runs on the same host only.
+
+    python benchmarks/load_test.py [--concurrency 1,8,32] [--duration 10] [--latency-ms 20] [--text-size 2000]
+                                   [--gateway-projection honor|ignore|reject] [--workers 4] [--no-cache]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "benchmarks"))
+
+
+def run_gateway(port: int, latency_ms: float, jitter_ms: float, results: int, text_size: int, projection: str = "honor") -> None:
+    import uvicorn
+    from fake_gateway import create_app
+
+    app = create_app(latency_ms, jitter_ms, results, text_size, projection=projection)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def run_server(port: int, env: dict, server_logs: bool, workers: int = 1) -> None:
+    # Settings are read from the environment on import
+    os.environ.update(env)
+    import logging
+    from src.presentation.mcp_sse_server import run
+
+    options = {}
+    if not server_logs:
+        # Per-call INFO logging would dominate the measurement
+        logging.disable(logging.INFO)
+        # Workers are fresh processes: their root logger is configured by uvicorn before the app is imported
+        options["log_config"] = {
+            "version": 1,
+            "disable_existing_loggers": False,
+            "handlers": {"default": {"class": "logging.StreamHandler"}},
+            "root": {"level": "WARNING", "handlers": ["default"]},
+        }
+    run("127.0.0.1", port, workers, log_level="warning", **options)
+
+
+def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"Nothing is listening on port {port} after {timeout}s")
+
+
+def _stat(pid: int) -> List[str]:
+    with open(f"/proc/{pid}/stat") as f:
+        # Fields after the command name, which may contain spaces
+        return f.read().rsplit(")", 1)[1].split()
+
+
+class ProcessStats:
+    """CPU seconds and RSS of a process and its descendants from /proc; None where /proc is not available."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.tick = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def pids(self) -> List[int]:
+        try:
+            parents = {}
+            for entry in os.listdir("/proc"):
+                if entry.isdigit():
+                    try:
+                        # ppid is field 4 of stat, i.e. 2 after the command name
+                        parents[int(entry)] = int(_stat(int(entry))[1])
+                    except (OSError, IndexError, ValueError):
+                        continue
+        except OSError:
+            return [self.pid]
+        tree = [self.pid]
+        for pid in tree:
+            tree.extend(child for child, parent in parents.items() if parent == pid)
+        return tree
+
+    def cpu_seconds(self) -> Optional[float]:
+        try:
+            # utime and stime are fields 14 and 15 of stat, i.e. 12 and 13 after the command name
+            return sum(int(fields[11]) + int(fields[12]) for fields in map(_stat, self.pids())) / self.tick
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def rss_mb(self) -> Optional[float]:
+        total = 0.0
+        try:
+            for pid in self.pids():
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total += int(line.split()[1]) / 1024
+        except (OSError, ValueError):
+            return None
+        return total or None
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def session_worker(url: str, tools: List[str], queries: List[str], start: asyncio.Event, stop: List[float],
+                         latencies: List[float], errors: List[int], connected: List[int], seed: int) -> None:
+    from mcp import ClientSession
+    from mcp.client.sse import sse_client
+
+    rnd = random.Random(seed)
+    async with sse_client(url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            connected[0] += 1
+            await start.wait()
+            while time.perf_counter() < stop[0]:
+                tool = rnd.choice(tools)
+                started = time.perf_counter()
+                try:
+                    result = await session.call_tool(tool, {"query": rnd.choice(queries)})
+                    failed = result.isError or result.content[0].text.startswith("Error")
+                except Exception:
+                    failed = True
+                latencies.append(time.perf_counter() - started)
+                if failed:
+                    errors[0] += 1
+
+
+async def run_level(url: str, sessions: int, duration: float, tools: List[str], queries: List[str], server: ProcessStats) -> dict:
+    start = asyncio.Event()
+    stop = [float("inf")]
+    latencies: List[float] = []
+    errors = [0]
+    connected = [0]
+    workers = [
+        asyncio.create_task(session_worker(url, tools, queries, start, stop, latencies, errors, connected, seed=i))
+        for i in range(sessions)
+    ]
+    # Measure steady state only: every session is connected and initialized first
+    while connected[0] < sessions:
+        if any(w.done() for w in workers):
+            for w in workers:
+                if w.done() and w.exception():
+                    raise w.exception()
+        await asyncio.sleep(0.05)
+
+    cpu_before = server.cpu_seconds()
+    peak_rss = server.rss_mb() or 0.0
+    started = time.perf_counter()
+    stop[0] = started + duration
+    start.set()
+    while time.perf_counter() < stop[0]:
+        await asyncio.sleep(0.25)
+        peak_rss = max(peak_rss, server.rss_mb() or 0.0)
+    await asyncio.gather(*workers, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    cpu_after = server.cpu_seconds()
+
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "calls": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "errors": errors[0],
+        "cpu": (cpu_after - cpu_before) / elapsed * 100 if cpu_before is not None and cpu_after is not None else None,
+        "rss": peak_rss or None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated numbers of SSE sessions")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--tools", default="search_projects,search_prices")
+    parser.add_argument("--queries", type=int, default=1000, help="distinct queries (result cache hit rate)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake gateway latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--results", type=int, default=5, help="results per gateway response")
+    parser.add_argument("--text-size", type=int, default=2000, help="full_text characters per result")
+    parser.add_argument("--gateway-projection", choices=("honor", "ignore", "reject"), default="honor",
+                        help="how the fake gateway treats the fields / snippet_length request parameters")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--gateway-port", type=int, default=8102)
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes sharing sessions through the broker")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="disable the result cache, which is on by default as in production")
+    parser.add_argument("--server-logs", action="store_true", help="keep the server's INFO logging")
+    args = parser.parse_args()
+
+    env = {
+        "SEARCH_GATEWAY_URL": f"http://127.0.0.1:{args.gateway_port}",
+        "RESULT_CACHE_ENABLED": "true" if args.cache else "false",
+        "KB_BACKEND": "gateway",
+    }
+    ctx = multiprocessing.get_context("spawn")
+    gateway = ctx.Process(target=run_gateway, args=(args.gateway_port, args.latency_ms, args.jitter_ms, args.results, args.text_size, args.gateway_projection), daemon=True)
+    # Not a daemon: with --workers it starts the worker and broker processes itself
+    server = ctx.Process(target=run_server, args=(args.port, env, args.server_logs, args.workers))
+    gateway.start()
+    wait_for_port(args.gateway_port)
+    server.start()
+    wait_for_port(args.port)
+
+    rnd = random.Random(0)
+    words = ["сайт", "магазин", "клиника", "дизайн", "хостинг", "логотип", "crm", "бот", "лендинг", "каталог", "seo", "1с"]
+    queries = [" ".join(rnd.sample(words, 2)) + f" {i}" for i in range(args.queries)]
+    tools = args.tools.split(",")
+    stats = ProcessStats(server.pid)
+
+    print(f"gateway: {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, {args.results} results x {args.text_size} chars; "
+          f"projection {args.gateway_projection}; {args.workers} server worker(s); result cache {'on' if args.cache else 'off'}; {args.duration:.0f}s per level")
+    print(f"{'sessions':>8}{'calls':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'cpu %':>8}{'rss MB':>8}")
+    try:
+        for level in (int(c) for c in args.concurrency.split(",")):
+            r = asyncio.run(run_level(f"http://127.0.0.1:{args.port}/sse", level, args.duration, tools, queries, stats))
+            cpu = f"{r['cpu']:.0f}" if r["cpu"] is not None else "n/a"
+            rss = f"{r['rss']:.0f}" if r["rss"] is not None else "n/a"
+            print(f"{r['sessions']:>8}{r['calls']:>8}{r['rps']:>9.1f}{r['p50']:>9.1f}{r['p95']:>9.1f}{r['p99']:>9.1f}"
+                  f"{r['errors']:>8}{cpu:>8}{rss:>8}")
+    finally:
+        server.terminate()
+        gateway.terminate()
+        server.join(5)
+        gateway.join(5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Micro-benchmarks of the per-call CPU path: gateway response decoding, entity
+construction, text rendering of 3/5/50 results and tokenization of short and
+long texts.
+
+Every case is timed in auto-calibrated loops (at least --min-time seconds each),
+--repeat times; the median is the headline number, the minimum is shown next to
+it, and the median absolute deviation of the runs is kept as the case's noise.
+Results can be saved as a JSON baseline and later compared against it by their
+medians: cases slower than the baseline by more than --threshold, or by more
+than NOISE_FACTOR times the noise of either measurement if that is larger, are
+measured once more, and those still slower are reported as regressions with
+exit status 1, so the script can gate a CI job.
+
+Tokenization runs the real Mystem binary when it is installed; otherwise Mystem
+is replaced by a whitespace splitter (the case name says which one was used, so
+baselines from different setups are not compared against each other).
+
+    python benchmarks/micro_bench.py [--filter render] [--save benchmarks/baselines/micro.json]
+    python benchmarks/micro_bench.py --compare benchmarks/baselines/micro.json [--threshold 0.10]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "benchmarks"))
+
+from fake_gateway import make_results, project
+from src.domain.entities import BatchSearchItem, ProjectEntity, ServiceEntity
+from src.infrastructure.api.decoding import PROJECT_FIELDS, decode_projects, decode_services
+from src.infrastructure.api.search_gateway import parse_projects, parse_services
+from src.infrastructure.local.hybrid_index import tokenize
+from src.infrastructure.nlp.lemmatizer import lemmatizer_key
+from src.infrastructure.nlp.snippets import extract_snippet, sentence_offsets
+from src.presentation.formatting import CompactRenderer, JsonRenderer, TextRenderer, format_batch, format_projects, format_services
+
+SIZES = (3, 5, 50)
+TEXT_SIZE = 2000
+QUERY = "разработка сайта"
+PAYLOAD = {"query": QUERY, "limit": 5}
+# What SearchGatewayAdapter asks for, see fake_gateway.project
+PROJECTION = {**PAYLOAD, "fields": list(PROJECT_FIELDS), "snippet_length": 200}
+
+
+class SplitLemmatizer:
+    """Mystem-compatible lemmatize(): words and separators as they are, plus the trailing newline"""
+
+    def lemmatize(self, text):
+        return re.findall(r"\w+|\W+", text) + ["\n"]
+
+
+def make_tokenizer():
+    """TextsTokenizer with the real Mystem if its binary is installed, else with SplitLemmatizer."""
+    from pymystem3.constants import MYSTEM_BIN
+    from src.infrastructure.nlp.tokenizer import TextsTokenizer
+
+    if os.path.exists(MYSTEM_BIN):
+        return TextsTokenizer(), "mystem"
+    # Mystem() would try to download the binary
+    tokenizer = TextsTokenizer.__new__(TextsTokenizer)
+    tokenizer.m = SplitLemmatizer()
+    return tokenizer, "split"
+
+
+def make_cases(seed: int) -> Dict[str, Callable[[], object]]:
+    rnd = random.Random(seed)
+    cases: Dict[str, Callable[[], object]] = {}
+    compact, as_json, budgeted = CompactRenderer(), JsonRenderer(), TextRenderer(max_chars=2000)
+
+    for n in SIZES:
+        body = {kind: json.dumps({"results": make_results(kind, n, TEXT_SIZE, rnd)}, ensure_ascii=False).encode()
+                for kind in ("projects", "prices")}
+        data = {kind: json.loads(raw) for kind, raw in body.items()}
+        # A gateway that ignores "fields" and also sends the stored vectors
+        vectors = json.dumps({"results": [{**item, "vector": [rnd.random() for _ in range(384)]} for item in data["prices"]["results"]]},
+                             ensure_ascii=False).encode()
+        projected = json.dumps({"results": project(data["projects"]["results"], PROJECTION)}, ensure_ascii=False).encode()
+        projects = parse_projects(data["projects"], QUERY)
+        services = parse_services(data["prices"])
+        items = [BatchSearchItem(query=f"query {i}", projects=projects, services=services) for i in range(3)]
+
+        cases[f"decode/projects/{n}"] = lambda raw=body["projects"]: json.loads(raw)
+        cases[f"decode/prices/{n}"] = lambda raw=body["prices"]: json.loads(raw)
+        cases[f"entities/projects/{n}"] = lambda d=data["projects"]: parse_projects(d, QUERY)
+        cases[f"entities/prices/{n}"] = lambda d=data["prices"]: parse_services(d)
+        # SEARCH_GATEWAY_FAST_DECODE: body straight to records, compare with decode + entities
+        cases[f"fastdecode/projects/{n}"] = lambda raw=body["projects"]: parse_projects(decode_projects(raw, PAYLOAD))
+        # The gateway honored "fields" and "snippet_length"
+        cases[f"fastdecode/projected/{n}"] = lambda raw=projected: parse_projects(decode_projects(raw, PROJECTION))
+        cases[f"fastdecode/prices/{n}"] = lambda raw=body["prices"]: parse_services(decode_services(raw, PAYLOAD))
+        cases[f"decode/vectors/{n}"] = lambda raw=vectors: json.loads(raw)
+        cases[f"fastdecode/vectors/{n}"] = lambda raw=vectors: parse_services(decode_services(raw, PAYLOAD))
+        cases[f"render/projects/{n}"] = lambda p=projects: format_projects("разработка сайта", p)
+        cases[f"render/services/{n}"] = lambda s=services: format_services("разработка сайта", s)
+        cases[f"render/batch3/{n}"] = lambda i=items: format_batch(i)
+        cases[f"render/compact/{n}"] = lambda p=projects: compact.projects("разработка сайта", p)
+        cases[f"render/json/{n}"] = lambda p=projects: as_json.projects("разработка сайта", p)
+        cases[f"render/budget2000/{n}"] = lambda p=projects: budgeted.projects("разработка сайта", p)
+
+    # Bare dataclass construction, without the dict lookups of the parser
+    cases["entities/construct/project"] = lambda: ProjectEntity(title="t", url="u", description="d")
+    cases["entities/construct/service"] = lambda: ServiceEntity(name="n", price=1.0, description="d")
+
+    tokenizer, lemmatizer = make_tokenizer()
+    texts = {
+        "short": "Сколько стоит разработка интернет-магазина на 1С-Битрикс?",
+        "long": make_results("projects", 1, 20000, rnd)[0]["full_text"],
+    }
+    for size, text in texts.items():
+        cases[f"tokenize/{lemmatizer}/{size}"] = lambda t=text: tokenizer([t])
+        cases[f"tokenize/key/{size}"] = lambda t=text: lemmatizer_key(t)
+        cases[f"tokenize/bm25/{size}"] = lambda t=text: tokenize(t)
+        cases[f"snippet/{size}"] = lambda t=text: extract_snippet(t, "доставка для клиники")
+        cases[f"snippet/offsets/{size}"] = lambda t=text, o=sentence_offsets(text): extract_snippet(t, "доставка для клиники", offsets=o)
+    return cases
+
+
+# Relative slowdowns within this many times the measured noise are not regressions
+NOISE_FACTOR = 3.0
+
+
+def measure(fn: Callable[[], object], min_time: float, repeat: int) -> Dict[str, float]:
+    """ns per call: loops are doubled until one run takes min_time, then the run is repeated."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    runs = [elapsed / loops]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - started) / loops)
+    median = statistics.median(runs)
+    noise = statistics.median(abs(run - median) for run in runs) / median
+    return {"ns": min(runs) * 1e9, "median_ns": median * 1e9, "noise": noise, "loops": loops}
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def human(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def change(result: dict, old: dict) -> float:
+    """Relative change of the median time against the baseline."""
+    return result["median_ns"] / old["median_ns"] - 1
+
+
+def tolerance(result: dict, old: dict, threshold: float) -> float:
+    """Largest relative change taken for noise: threshold, or more for noisy measurements."""
+    # Baselines saved before the noise was recorded fall back to the plain threshold
+    noise = max(result.get("noise", 0.0), old.get("noise", 0.0))
+    return max(threshold, NOISE_FACTOR * noise)
+
+
+def suspects(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Cases slower than the baseline beyond their tolerance."""
+    return [
+        name for name, result in results.items()
+        if name in baseline and change(result, baseline[name]) > tolerance(result, baseline[name], threshold)
+    ]
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Prints the comparison table and returns the names of regressed cases."""
+    regressions = []
+    print(f"{'case':<32}{'baseline':>12}{'current':>12}{'change':>9}{'noise':>9}")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<32}{'-':>12}{human(result['median_ns']):>12}{'new':>9}")
+            continue
+        delta = change(result, old)
+        limit = tolerance(result, old, threshold)
+        mark = ""
+        if delta > limit:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        elif delta < -limit:
+            mark = "  faster"
+        print(f"{name:<32}{human(old['median_ns']):>12}{human(result['median_ns']):>12}{delta:>+9.1%}{limit:>8.0%}±{mark}")
+    missing = sorted(set(baseline) - set(results))
+    if missing:
+        print(f"not run (in baseline only): {', '.join(missing)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="run only cases whose name contains this substring")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown of the median reported as a regression (raised for noisy cases)")
+    args = parser.parse_args()
+
+    baseline: Optional[dict] = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    cases = {name: fn for name, fn in make_cases(args.seed).items() if args.filter in name}
+    results: Dict[str, dict] = {}
+    for name, fn in cases.items():
+        results[name] = measure(fn, args.min_time, args.repeat)
+        if baseline is None:
+            r = results[name]
+            print(f"{name:<32}{human(r['median_ns']):>12}  (min {human(r['ns'])}, noise {r['noise']:.1%}, {r['loops']} loops)")
+
+    baseline_results: Dict[str, dict] = {}
+    if baseline is not None:
+        baseline_results = {k: v for k, v in baseline["results"].items() if args.filter in k}
+        # A slow run is usually a noisy one: suspects are measured again and keep the faster median
+        for name in suspects(results, baseline_results, args.threshold):
+            again = measure(cases[name], args.min_time, args.repeat)
+            if again["median_ns"] < results[name]["median_ns"]:
+                results[name] = again
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine(), "results": results}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if baseline is not None:
+        print(f"baseline: {baseline['machine'].get('date')}, Python {baseline['machine'].get('python')} "
+              f"on {baseline['machine'].get('platform')}")
+        regressions = compare(results, baseline_results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} or the noise: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} or the noise")
+
+
+if __name__ == "__main__":
+    main()
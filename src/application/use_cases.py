@@ -1,13 +1,102 @@
-from typing import List
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple
+from src.domain.deadline import budget, within_deadline
 from src.domain.interfaces import IKnowledgeBase
-from src.domain.entities import ProjectEntity, ServiceEntity
+from src.domain.entities import BatchSearchItem, ProjectEntity, ServiceEntity
+
+# Called with the item and the source ("projects" / "services") as soon as that search finishes
+ResultCallback = Callable[[BatchSearchItem, str], Awaitable[None]]
 
 class SearchUseCase:
-    def __init__(self, kb: IKnowledgeBase):
+    """
+    Searches of the MCP tools. Every search is bounded by the deadline of the
+    current call (src.domain.deadline) and cancels the backend call when it runs out.
+    """
+
+    def __init__(
+        self,
+        kb: IKnowledgeBase,
+        batch_concurrency: int = 4,
+        batch_max_queries: int = 10,
+        everything_timeout: float = 8.0,
+    ):
         self.kb = kb
+        self.batch_concurrency = batch_concurrency
+        self.batch_max_queries = batch_max_queries
+        self.everything_timeout = everything_timeout
 
     async def search_projects(self, query: str) -> List[ProjectEntity]:
-        return await self.kb.search_projects(query)
+        return await within_deadline(self.kb.search_projects(query))
 
     async def search_services(self, query: str) -> List[ServiceEntity]:
-        return await self.kb.search_services(query)
+        return await within_deadline(self.kb.search_services(query))
+
+    def batch_queries(self, queries: List[str]) -> List[str]:
+        """The queries batch_search() runs: stripped, without empty ones, the first batch_max_queries."""
+        return [q.strip() for q in queries if q and q.strip()][:self.batch_max_queries]
+
+    async def batch_search(
+        self,
+        queries: List[str],
+        include_projects: bool = True,
+        include_services: bool = True,
+        on_result: Optional[ResultCallback] = None,
+    ) -> List[BatchSearchItem]:
+        """
+        Run the batch_queries() of queries concurrently (at most batch_concurrency searches at a time).
+        A failed search is reported in BatchSearchItem.errors and does not fail the batch.
+        """
+        queries = self.batch_queries(queries)
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def limited(search: Callable[[str], Awaitable[list]], query: str) -> list:
+            async with semaphore:
+                return await search(query)
+
+        items = [BatchSearchItem(query=q) for q in queries]
+        jobs = []
+        for item in items:
+            if include_projects:
+                jobs.append((item, "projects", limited(self.search_projects, item.query)))
+            if include_services:
+                jobs.append((item, "services", limited(self.search_services, item.query)))
+
+        await self._gather_into(jobs, on_result)
+        return items
+
+    async def search_everything(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        on_result: Optional[ResultCallback] = None,
+    ) -> BatchSearchItem:
+        """
+        Search projects and services concurrently under one overall deadline.
+        A side that misses the deadline is reported in errors; the other side is still returned.
+        """
+        timeout = budget(timeout or self.everything_timeout)
+        item = BatchSearchItem(query=query)
+        await self._gather_into([
+            (item, "projects", asyncio.wait_for(self.search_projects(query), timeout)),
+            (item, "services", asyncio.wait_for(self.search_services(query), timeout)),
+        ], on_result)
+        return item
+
+    @staticmethod
+    async def _gather_into(
+        jobs: List[Tuple[BatchSearchItem, str, Awaitable[list]]],
+        on_result: Optional[ResultCallback] = None,
+    ) -> None:
+        """Await all jobs concurrently, storing each result or error on its item as it lands."""
+
+        async def run(item: BatchSearchItem, source: str, job: Awaitable[list]) -> None:
+            try:
+                setattr(item, source, await job)
+            except asyncio.TimeoutError:
+                item.errors[source] = "timed out"
+            except Exception as e:
+                item.errors[source] = str(e) or type(e).__name__
+            if on_result:
+                await on_result(item, source)
+
+        await asyncio.gather(*(run(item, source, job) for item, source, job in jobs))
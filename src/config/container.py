@@ -1,22 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from src.domain.interfaces import IKnowledgeBase
 from src.infrastructure.api.search_gateway import SearchGatewayAdapter
+from src.infrastructure.cache.cached_knowledge_base import CachedKnowledgeBase
+from src.infrastructure.cache.embedding_cache import CachedEmbeddingClient, EmbeddingCache, IEmbeddingClient
+from src.infrastructure.nlp.embedding_batcher import EmbeddingBatcher
+from src.infrastructure.nlp.embeddings import TransformersEmbeddingClient
+from src.infrastructure.nlp.lemmatizer import AsyncLemmatizer
+from src.infrastructure.nlp.query_preparer import QueryPreparer
 from src.application.use_cases import SearchUseCase
+from src.config.settings import settings
 
 class Container:
     def __init__(self):
+        self._backend = None
+        self._embeddings = None
+        self._query_preparer = None
         self._kb = None
         self._search_use_case = None
 
     @property
-    def kb(self) -> SearchGatewayAdapter:
+    def backend(self) -> IKnowledgeBase:
+        """Knowledge base backend that actually performs the search (selected by KB_BACKEND)."""
+        if not self._backend:
+            # Backends are imported lazily: weaviate-client and numpy are only needed by their backend
+            if settings.KB_BACKEND == "weaviate":
+                from src.infrastructure.weaviate.weaviate_adapter import AsyncWeaviateAdapter
+                self._backend = AsyncWeaviateAdapter(self.query_preparer)
+            elif settings.KB_BACKEND == "local":
+                from src.infrastructure.local.local_knowledge_base import LocalKnowledgeBase
+                self._backend = LocalKnowledgeBase(settings.LOCAL_KB_PATH, self.query_preparer, alpha=settings.SEARCH_ALPHA)
+            else:
+                self._backend = SearchGatewayAdapter()
+        return self._backend
+
+    @property
+    def query_preparer(self) -> QueryPreparer:
+        """Query lemmatization + embedding for the backends that search by themselves (weaviate, local)."""
+        if not self._query_preparer:
+            # pymystem3 is only needed by these backends
+            from src.infrastructure.nlp.tokenizer import TextsTokenizer
+
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mystem")
+            tokenizer = None
+
+            def lemmatize_batch(texts):
+                # One Mystem process, created on first use on the executor's only thread
+                nonlocal tokenizer
+                if tokenizer is None:
+                    tokenizer = TextsTokenizer()
+                return tokenizer(texts)
+
+            lemmatizer = AsyncLemmatizer(
+                lemmatize_batch,
+                executor,
+                window=settings.LEMMATIZER_BATCH_WINDOW_MS / 1000,
+                max_batch=settings.LEMMATIZER_BATCH_MAX_SIZE,
+                cache_size=settings.LEMMATIZER_CACHE_SIZE,
+            )
+            self._query_preparer = QueryPreparer(lemmatizer, self.embeddings, executor)
+        return self._query_preparer
+
+    @property
+    def embeddings(self) -> IEmbeddingClient:
+        """Transformers embedding client used by the weaviate and local backends."""
+        if not self._embeddings:
+            embeddings = TransformersEmbeddingClient(settings.TRANSFORMERS_URL, batch_url=settings.TRANSFORMERS_BATCH_URL)
+            if settings.EMBEDDING_BATCHING_ENABLED:
+                embeddings = EmbeddingBatcher(
+                    embeddings,
+                    window=settings.EMBEDDING_BATCH_WINDOW_MS / 1000,
+                    max_batch=settings.EMBEDDING_BATCH_MAX_SIZE,
+                )
+            if settings.EMBEDDING_CACHE_ENABLED:
+                embeddings = CachedEmbeddingClient(
+                    embeddings,
+                    EmbeddingCache(
+                        settings.EMBEDDING_CACHE_DIR,
+                        memory_entries=settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+                        max_disk_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+                    ),
+                )
+            self._embeddings = embeddings
+        return self._embeddings
+
+    @property
+    def kb(self) -> IKnowledgeBase:
+        """Backend wrapped with the configured decorators (result cache)."""
         if not self._kb:
-            self._kb = SearchGatewayAdapter()
+            kb = self.backend
+            if settings.RESULT_CACHE_ENABLED:
+                kb = CachedKnowledgeBase(
+                    kb,
+                    ttl=settings.RESULT_CACHE_TTL,
+                    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+                    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+                    alpha=settings.SEARCH_ALPHA,
+                )
+            self._kb = kb
         return self._kb
 
     @property
     def search_use_case(self) -> SearchUseCase:
         if not self._search_use_case:
-            self._search_use_case = SearchUseCase(self.kb)
+            self._search_use_case = SearchUseCase(
+                self.kb,
+                batch_concurrency=settings.BATCH_SEARCH_CONCURRENCY,
+                batch_max_queries=settings.BATCH_SEARCH_MAX_QUERIES,
+                everything_timeout=settings.SEARCH_EVERYTHING_TIMEOUT,
+            )
         return self._search_use_case
 
+    async def startup(self) -> None:
+        """Open long-lived resources (connection pools) before serving requests."""
+        await self.backend.startup()
+
+    async def shutdown(self) -> None:
+        """Release resources opened in startup()."""
+        if self._backend:
+            await self._backend.shutdown()
+
+    @asynccontextmanager
+    async def lifespan(self, _app=None):
+        """Lifespan usable by both Starlette and FastMCP."""
+        await self.startup()
+        try:
+            yield
+        finally:
+            await self.shutdown()
+
 # Global container instance
 container = Container()
@@ -1,15 +1,126 @@
 import os
+from typing import Literal, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     SEARCH_GATEWAY_URL: str = Field(default="http://localhost:8002", validation_alias="SEARCH_GATEWAY_URL")
+    SEARCH_GATEWAY_TIMEOUT: float = Field(default=10.0, validation_alias="SEARCH_GATEWAY_TIMEOUT")
+
+    # Connection pool of the long-lived gateway client
+    SEARCH_GATEWAY_MAX_CONNECTIONS: int = Field(default=100, validation_alias="SEARCH_GATEWAY_MAX_CONNECTIONS")
+    SEARCH_GATEWAY_MAX_KEEPALIVE: int = Field(default=20, validation_alias="SEARCH_GATEWAY_MAX_KEEPALIVE")
+    SEARCH_GATEWAY_KEEPALIVE_EXPIRY: float = Field(default=30.0, validation_alias="SEARCH_GATEWAY_KEEPALIVE_EXPIRY")
+    SEARCH_GATEWAY_HTTP2: bool = Field(default=False, validation_alias="SEARCH_GATEWAY_HTTP2")
+    # Number of connections opened at startup (0 disables warm-up), each given up after WARMUP_TIMEOUT seconds
+    SEARCH_GATEWAY_WARMUP_CONNECTIONS: int = Field(default=2, validation_alias="SEARCH_GATEWAY_WARMUP_CONNECTIONS")
+    SEARCH_GATEWAY_WARMUP_PATH: str = Field(default="/", validation_alias="SEARCH_GATEWAY_WARMUP_PATH")
+    SEARCH_GATEWAY_WARMUP_TIMEOUT: float = Field(default=2.0, validation_alias="SEARCH_GATEWAY_WARMUP_TIMEOUT")
+    # Share one in-flight gateway call between identical concurrent queries
+    SEARCH_GATEWAY_COALESCE: bool = Field(default=True, validation_alias="SEARCH_GATEWAY_COALESCE")
+    # Decode search responses straight into entities built without validation (model_construct)
+    # instead of validated ones (the full project text is dropped right after decoding)
+    SEARCH_GATEWAY_FAST_DECODE: bool = Field(default=True, validation_alias="SEARCH_GATEWAY_FAST_DECODE")
+    # Ask the gateway for the shown fields only ("fields") and for project texts already cut to a passage of
+    # about SNIPPET_LENGTH characters around the query ("snippet_length"); a gateway that ignores them is still
+    # understood, one that rejects them (400 / 422) is asked without them from then on
+    SEARCH_GATEWAY_PROJECTION: bool = Field(default=True, validation_alias="SEARCH_GATEWAY_PROJECTION")
+    SEARCH_GATEWAY_SNIPPETS: bool = Field(default=True, validation_alias="SEARCH_GATEWAY_SNIPPETS")
+    # Hedged requests: a second POST if the first hasn't answered after HEDGE_DELAY seconds,
+    # or the live HEDGE_PERCENTILE latency when HEDGE_DELAY is unset; at most HEDGE_MAX_RATIO of calls are hedged
+    SEARCH_GATEWAY_HEDGE: bool = Field(default=False, validation_alias="SEARCH_GATEWAY_HEDGE")
+    SEARCH_GATEWAY_HEDGE_DELAY: Optional[float] = Field(default=None, validation_alias="SEARCH_GATEWAY_HEDGE_DELAY")
+    SEARCH_GATEWAY_HEDGE_PERCENTILE: float = Field(default=0.95, validation_alias="SEARCH_GATEWAY_HEDGE_PERCENTILE")
+    SEARCH_GATEWAY_HEDGE_MAX_RATIO: float = Field(default=0.1, validation_alias="SEARCH_GATEWAY_HEDGE_MAX_RATIO")
+    # Circuit breaker: fail fast after FAILURE_THRESHOLD consecutive errors, probe again after RESET_TIMEOUT seconds
+    SEARCH_GATEWAY_BREAKER: bool = Field(default=True, validation_alias="SEARCH_GATEWAY_BREAKER")
+    SEARCH_GATEWAY_BREAKER_FAILURE_THRESHOLD: int = Field(default=5, validation_alias="SEARCH_GATEWAY_BREAKER_FAILURE_THRESHOLD")
+    SEARCH_GATEWAY_BREAKER_RESET_TIMEOUT: float = Field(default=30.0, validation_alias="SEARCH_GATEWAY_BREAKER_RESET_TIMEOUT")
+    # Last good response per request, served (marked stale) while the gateway is failing
+    SEARCH_GATEWAY_STALE_TTL: float = Field(default=24 * 3600.0, validation_alias="SEARCH_GATEWAY_STALE_TTL")
+    SEARCH_GATEWAY_STALE_MAX_ENTRIES: int = Field(default=4096, validation_alias="SEARCH_GATEWAY_STALE_MAX_ENTRIES")
+
+    # Hybrid search weight sent to the backend (0 = keyword only, 1 = vector only)
+    SEARCH_ALPHA: float = Field(default=0.5, validation_alias="SEARCH_ALPHA")
+
+    # Time budget of one tool call, seconds. Clients may ask for another one with a "timeout"
+    # tool argument or "timeout" in the request _meta, capped at TOOL_CALL_MAX_TIMEOUT
+    TOOL_CALL_TIMEOUT: float = Field(default=15.0, validation_alias="TOOL_CALL_TIMEOUT")
+    TOOL_CALL_MAX_TIMEOUT: float = Field(default=60.0, validation_alias="TOOL_CALL_MAX_TIMEOUT")
+
+    # Layout of tool results (clients may pick another one with a "format" tool argument):
+    # "text" - the verbose layout, "compact" - one line per hit, "json" - JSON text plus MCP structured content.
+    # Results longer than RESULT_MAX_CHARS characters or ~RESULT_MAX_TOKENS tokens are trimmed to fit (0 - no limit)
+    RESULT_FORMAT: Literal["text", "compact", "json"] = Field(default="text", validation_alias="RESULT_FORMAT")
+    RESULT_MAX_CHARS: int = Field(default=0, validation_alias="RESULT_MAX_CHARS")
+    RESULT_MAX_TOKENS: int = Field(default=0, validation_alias="RESULT_MAX_TOKENS")
+    # Project descriptions: the passage of the text that best matches the query, about SNIPPET_LENGTH
+    # characters, with the matched words in **bold** if SNIPPET_HIGHLIGHT
+    SNIPPET_LENGTH: int = Field(default=200, validation_alias="SNIPPET_LENGTH")
+    SNIPPET_HIGHLIGHT: bool = Field(default=True, validation_alias="SNIPPET_HIGHLIGHT")
+
+    # SSE server: uvicorn workers when run as a script, sharing their sessions through the session broker at
+    # SSE_BROKER_URL (unix:///path/to.sock or tcp://host:port, see src/infrastructure/sessions/broker.py);
+    # with several workers and no URL a broker on a Unix socket is started alongside them.
+    # Messages reaching a worker other than the session's go through the broker, so on one host several
+    # workers answer fewer calls per second than one (see benchmarks/load_test.py --workers) unless a single
+    # worker's CPU is saturated; use them to spread CPU-bound load or to serve one endpoint from several hosts
+    SSE_WORKERS: int = Field(default=1, validation_alias="SSE_WORKERS")
+    SSE_BROKER_URL: str = Field(default="", validation_alias="SSE_BROKER_URL")
+    # Seconds a worker waits for the worker holding a session to accept a forwarded message
+    SSE_FORWARD_TIMEOUT: float = Field(default=10.0, validation_alias="SSE_FORWARD_TIMEOUT")
+
+    # Tracing: spans of sampled tool calls as JSON lines on stderr / stdout or appended to TRACING_FILE.
+    # stdout carries the JSON-RPC messages of the stdio server, which uses stderr instead
+    TRACING_ENABLED: bool = Field(default=False, validation_alias="TRACING_ENABLED")
+    TRACING_SAMPLE_RATE: float = Field(default=0.1, validation_alias="TRACING_SAMPLE_RATE")
+    TRACING_EXPORTER: Literal["stderr", "stdout", "file"] = Field(default="stderr", validation_alias="TRACING_EXPORTER")
+    TRACING_FILE: str = Field(default="traces.jsonl", validation_alias="TRACING_FILE")
+
+    # batch_search tool: searches running at once, queries per call (the rest of a longer list is dropped)
+    BATCH_SEARCH_CONCURRENCY: int = Field(default=4, validation_alias="BATCH_SEARCH_CONCURRENCY")
+    BATCH_SEARCH_MAX_QUERIES: int = Field(default=10, validation_alias="BATCH_SEARCH_MAX_QUERIES")
+
+    # Overall deadline of the search_everything tool, seconds
+    SEARCH_EVERYTHING_TIMEOUT: float = Field(default=8.0, validation_alias="SEARCH_EVERYTHING_TIMEOUT")
+
+    # Result cache in front of the knowledge base
+    RESULT_CACHE_ENABLED: bool = Field(default=True, validation_alias="RESULT_CACHE_ENABLED")
+    RESULT_CACHE_TTL: float = Field(default=300.0, validation_alias="RESULT_CACHE_TTL")
+    RESULT_CACHE_MAX_ENTRIES: int = Field(default=1024, validation_alias="RESULT_CACHE_MAX_ENTRIES")
+    RESULT_CACHE_MAX_BYTES: int = Field(default=16 * 1024 * 1024, validation_alias="RESULT_CACHE_MAX_BYTES")
     
-    # Legacy settings (can be removed if we are sure we don't need direct Weaviate access anymore)
-    # WEAVIATE_HOST: str = Field(default="localhost", validation_alias="WEAVIATE_HOST")
-    # WEAVIATE_PORT: int = Field(default=8080, validation_alias="WEAVIATE_PORT")
-    # WEAVIATE_GRPC_PORT: int = Field(default=50051, validation_alias="WEAVIATE_GRPC_PORT")
-    # TRANSFORMERS_URL: str = Field(default="http://localhost:9090/vectors", validation_alias="TRANSFORMERS_URL")
+    # Knowledge base backend: "gateway" (Search Gateway HTTP API), "weaviate" (direct async Weaviate access)
+    # or "local" (in-process BM25 + vector index over a local copy of the collections).
+    # weaviate and local embed every query through TRANSFORMERS_URL; local skips that when its copy has
+    # no vectors or SEARCH_ALPHA is 0, and falls back to keyword-only results while the service is unavailable
+    KB_BACKEND: Literal["gateway", "weaviate", "local"] = Field(default="gateway", validation_alias="KB_BACKEND")
+    # Snapshot directory (python -m src.presentation.export_snapshot) or a JSON copy
+    LOCAL_KB_PATH: str = Field(default="data/knowledge_base.json", validation_alias="LOCAL_KB_PATH")
+
+    # Direct Weaviate access (KB_BACKEND=weaviate)
+    WEAVIATE_HOST: str = Field(default="localhost", validation_alias="WEAVIATE_HOST")
+    WEAVIATE_PORT: int = Field(default=8080, validation_alias="WEAVIATE_PORT")
+    WEAVIATE_GRPC_PORT: int = Field(default=50051, validation_alias="WEAVIATE_GRPC_PORT")
+    TRANSFORMERS_URL: str = Field(default="http://localhost:9090/vectors", validation_alias="TRANSFORMERS_URL")
+    # Batch endpoint ({"texts": [...]} -> {"vectors": [...]}); without it batches are sent as parallel single requests
+    TRANSFORMERS_BATCH_URL: Optional[str] = Field(default=None, validation_alias="TRANSFORMERS_BATCH_URL")
+
+    # Micro-batching of concurrent embedding requests
+    EMBEDDING_BATCHING_ENABLED: bool = Field(default=True, validation_alias="EMBEDDING_BATCHING_ENABLED")
+    EMBEDDING_BATCH_WINDOW_MS: float = Field(default=5.0, validation_alias="EMBEDDING_BATCH_WINDOW_MS")
+    EMBEDDING_BATCH_MAX_SIZE: int = Field(default=32, validation_alias="EMBEDDING_BATCH_MAX_SIZE")
+
+    # Batched, cached lemmatization of queries (Mystem)
+    LEMMATIZER_CACHE_SIZE: int = Field(default=10000, validation_alias="LEMMATIZER_CACHE_SIZE")
+    LEMMATIZER_BATCH_WINDOW_MS: float = Field(default=2.0, validation_alias="LEMMATIZER_BATCH_WINDOW_MS")
+    LEMMATIZER_BATCH_MAX_SIZE: int = Field(default=64, validation_alias="LEMMATIZER_BATCH_MAX_SIZE")
+
+    # Persistent embedding cache (in-memory LRU + memory-mapped store on disk)
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True, validation_alias="EMBEDDING_CACHE_ENABLED")
+    EMBEDDING_CACHE_DIR: str = Field(default=".cache/embeddings", validation_alias="EMBEDDING_CACHE_DIR")
+    EMBEDDING_CACHE_MEMORY_ENTRIES: int = Field(default=10000, validation_alias="EMBEDDING_CACHE_MEMORY_ENTRIES")
+    EMBEDDING_CACHE_MAX_BYTES: int = Field(default=256 * 1024 * 1024, validation_alias="EMBEDDING_CACHE_MAX_BYTES")
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Absolute time.monotonic() deadline of the current tool call; copied into every task it spawns
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The time budget of the current call ran out."""
+
+
+@contextmanager
+def deadline(timeout: Optional[float]) -> Iterator[Optional[float]]:
+    """Run the block with a deadline timeout seconds from now, never later than an enclosing one."""
+    if timeout is None:
+        yield _deadline.get()
+        return
+    at = time.monotonic() + timeout
+    current = _deadline.get()
+    if current is not None:
+        at = min(at, current)
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """Run the block without the current deadline, for work shared with calls that have their own."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, None without one."""
+    at = _deadline.get()
+    if at is None:
+        return None
+    return max(0.0, at - time.monotonic())
+
+
+def budget(default: float) -> float:
+    """default capped by the time left, for timeouts of a single hop."""
+    left = remaining()
+    return default if left is None else min(default, left)
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await with the remaining budget; the awaitable is cancelled when it runs out."""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("deadline exceeded")
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError as e:
+        if isinstance(e, DeadlineExceeded):
+            raise
+        raise DeadlineExceeded("deadline exceeded") from e
@@ -1,12 +1,23 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 
 class ProjectEntity(BaseModel):
     title: str
     url: Optional[str] = None
     description: str = Field(..., description="Snippet or full text description")
+    stale_age: Optional[float] = Field(None, description="Set when served from the last good response during a backend outage: its age in seconds")
 
 class ServiceEntity(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     name: str = Field(..., alias="service")
     price: float
     description: Optional[str] = None
+    stale_age: Optional[float] = Field(None, description="Set when served from the last good response during a backend outage: its age in seconds")
+
+class BatchSearchItem(BaseModel):
+    """Results of one query of a batch search."""
+    query: str
+    projects: Optional[List[ProjectEntity]] = None
+    services: Optional[List[ServiceEntity]] = None
+    errors: Dict[str, str] = Field(default_factory=dict, description="Error message per failed source ('projects' / 'services')")
@@ -0,0 +1,159 @@
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Callable, Collection, Dict, List, Optional
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.infrastructure.nlp.snippets import project_snippet
+
+# Hot-path decoding of Search Gateway responses (SEARCH_GATEWAY_FAST_DECODE).
+#
+# One decoder per response type turns the body straight into entities built
+# with model_construct (no validation) holding only what the renderer shows. The project description is reduced to
+# its snippet here, so the full text is not kept alive by the response, the
+# single-flight waiters or the stale cache.
+#
+# A gateway that ignores the "fields" projection of the request may send
+# values the entities don't need. Arrays and objects among them (vectors,
+# metadata) are expensive to decode, so such bodies are scanned rather than
+# loaded: only the fields of the entities are decoded, other values are stepped
+# over with str.find and never turned into objects. Strings are decoded by json
+# about as fast as they can be stepped over, so a body whose first result has
+# nothing else worth skipping, or one the scanner doesn't understand, is loaded
+# with json.loads.
+
+# (response body, request payload) -> decoded response
+Decoder = Callable[[bytes, Dict[str, Any]], Dict[str, Any]]
+
+# Fields the entities are built from, also sent as the "fields" projection
+PROJECT_FIELDS = ("title", "url", "full_text")
+SERVICE_FIELDS = ("service", "price", "full_text")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters of arrays and objects in the first result that make scanning pay off
+_SKIP_WORTH = 256
+_scan_value = json.JSONDecoder().scan_once
+
+def decode_raw(body: bytes, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return json.loads(body)
+
+def decode_projects(body: bytes, payload: Dict[str, Any]) -> Dict[str, Any]:
+    query = payload.get("query") or ""
+    return {"results": [
+        ProjectEntity.model_construct(
+            title=item.get("title", "No Title"),
+            url=item.get("url"),
+            description=project_snippet(item.get("full_text", ""), query),
+            stale_age=None,
+        )
+        for item in select_results(body, PROJECT_FIELDS)
+    ]}
+
+def decode_services(body: bytes, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"results": [
+        ServiceEntity.model_construct(
+            name=item.get("service", "Unknown Service"),
+            price=float(item.get("price", 0.0)),
+            description=item.get("full_text", ""),
+            stale_age=None,
+        )
+        for item in select_results(body, SERVICE_FIELDS)
+    ]}
+
+def select_results(body: bytes, fields: Collection[str]) -> List[Dict[str, Any]]:
+    """The "results" objects of a response body with only fields decoded."""
+    text = body.decode("utf-8")
+    try:
+        selected = _select_results(text, fields)
+    except (ValueError, IndexError, KeyError, StopIteration):
+        # Not the expected shape: let json report what is wrong with it
+        selected = None
+    return selected if selected is not None else json.loads(text).get("results", [])
+
+def _select_results(text: str, fields: Collection[str]) -> Optional[List[Dict[str, Any]]]:
+    """None if json.loads is the faster way to the results."""
+    results: Optional[List[Dict[str, Any]]] = []
+    i = _expect(text, 0, "{")
+    while text[i] != "}":
+        key, i = _key(text, i)
+        if key == "results":
+            results, i = _select_objects(text, i, fields)
+            if results is None:
+                return None
+        else:
+            i = _skip(text, i)
+        i = _next(text, i, "}")
+    return results
+
+def _select_objects(text: str, i: int, fields: Collection[str]) -> tuple:
+    objects = []
+    skipped = 0
+    i = _expect(text, i, "[")
+    while text[i] != "]":
+        i = _expect(text, i, "{")
+        item = {}
+        while text[i] != "}":
+            key, i = _key(text, i)
+            if key in fields:
+                item[key], i = _scan_value(text, i)
+            else:
+                end = _skip(text, i)
+                if text[i] in "[{":
+                    skipped += end - i
+                i = end
+            i = _next(text, i, "}")
+        if not objects and skipped < _SKIP_WORTH:
+            return None, i
+        objects.append(item)
+        i = _next(text, i + 1, "]")
+    return objects, i + 1
+
+def _space(text: str, i: int) -> int:
+    """i moved past whitespace (gateway bodies are usually compact)."""
+    return _WHITESPACE.match(text, i).end() if text[i] in " \t\n\r" else i
+
+def _expect(text: str, i: int, char: str) -> int:
+    """Position of what follows char at i."""
+    i = _space(text, i)
+    if text[i] != char:
+        raise ValueError(f"expected {char!r} at {i}")
+    return _space(text, i + 1)
+
+def _next(text: str, i: int, close: str) -> int:
+    """Position of the next member or element after the one ending at i, or of close."""
+    i = _space(text, i)
+    if text[i] == ",":
+        return _space(text, i + 1)
+    if text[i] != close:
+        raise ValueError(f"expected ',' or {close!r} at {i}")
+    return i
+
+def _key(text: str, i: int) -> tuple:
+    """Member name at i and the position of its value."""
+    if text[i] != '"':
+        raise ValueError(f"expected a member name at {i}")
+    key, i = scanstring(text, i + 1)
+    return key, _expect(text, i, ":")
+
+def _skip(text: str, i: int) -> int:
+    """Position after the value at i, found without decoding it where possible."""
+    char = text[i]
+    if char == '"':
+        end = text.find('"', i + 1)
+        while end > 0 and _escaped(text, end):
+            end = text.find('"', end + 1)
+        if end < 0:
+            raise ValueError(f"unterminated string at {i}")
+        return end + 1
+    if char == "[":
+        # Flat arrays of numbers (vectors) end at the first closing bracket
+        end = text.find("]", i)
+        if end > 0 and all(text.find(c, i + 1, end) < 0 for c in '"[{'):
+            return end + 1
+    return _scan_value(text, i)[1]
+
+def _escaped(text: str, quote: int) -> bool:
+    """True if the quote at quote is preceded by an odd number of backslashes."""
+    i = quote - 1
+    while text[i] == "\\":
+        i -= 1
+    return (quote - 1 - i) % 2 == 1
@@ -1,61 +1,316 @@
+import asyncio
+import importlib.util
+import json
+import logging
+import time
 import httpx
-from typing import List
+from typing import List, Optional, Tuple
 from src.domain.interfaces import IKnowledgeBase
 from src.domain.entities import ProjectEntity, ServiceEntity
 from src.config.settings import settings
+from src.domain.deadline import DeadlineExceeded, budget, no_deadline, remaining, within_deadline
+from src.infrastructure.api.decoding import PROJECT_FIELDS, SERVICE_FIELDS, Decoder, decode_projects, decode_raw, decode_services
+from src.infrastructure.cache.ttl_cache import TTLCache
+from src.infrastructure.concurrency.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.infrastructure.concurrency.hedging import Hedger
+from src.infrastructure.concurrency.single_flight import SingleFlight
+from src.infrastructure.nlp.snippets import project_snippet
+from src.infrastructure.observability.metrics import Counter, Gauge, Histogram
+from src.infrastructure.observability.tracing import current_span, span
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram("search_gateway_request_duration_seconds", "Search Gateway HTTP request latency", ["endpoint"])
+REQUEST_ERRORS = Counter("search_gateway_errors_total", "Failed Search Gateway HTTP requests by error type", ["endpoint", "type"])
+REQUESTS_IN_FLIGHT = Gauge("search_gateway_requests_in_flight", "Search Gateway HTTP requests in flight")
+FALLBACKS = Counter("search_gateway_fallbacks_total", "Searches answered without the gateway, by reason", ["reason"])
+
+# A timeout with less than this many seconds of the call's budget left is blamed on the deadline
+_DEADLINE_SLACK = 0.05
+# Request parameters a gateway that doesn't know them may reject, and how it rejects them
+_PROJECTION_KEYS = ("fields", "snippet_length")
+_REJECTED_STATUSES = (400, 422)
+
+def parse_projects(data: dict, query: str = "") -> List[ProjectEntity]:
+    """Entities of a decoded /search/projects response for query; entities of decode_projects are passed through."""
+    stale_age = data.get("stale_age")
+    results = []
+    for item in data.get("results", []):
+        if isinstance(item, ProjectEntity):
+            # Decoded entities are shared with the stale cache and other callers: never mutated
+            results.append(item if stale_age is None else item.model_copy(update={"stale_age": stale_age}))
+            continue
+        results.append(ProjectEntity(
+            title=item.get("title", "No Title"),
+            url=item.get("url"),
+            description=project_snippet(item.get("full_text", ""), query),
+            stale_age=data.get("stale_age"),
+        ))
+    return results
+
+def parse_services(data: dict) -> List[ServiceEntity]:
+    """Entities of a decoded /search/prices response; entities of decode_services are passed through."""
+    stale_age = data.get("stale_age")
+    results = []
+    for item in data.get("results", []):
+        if isinstance(item, ServiceEntity):
+            results.append(item if stale_age is None else item.model_copy(update={"stale_age": stale_age}))
+            continue
+        results.append(ServiceEntity(
+            name=item.get("service", "Unknown Service"),
+            price=float(item.get("price", 0.0)),
+            description=item.get("full_text", ""),
+            stale_age=data.get("stale_age"),
+        ))
+    return results
 
 class SearchGatewayAdapter(IKnowledgeBase):
     def __init__(self):
         self.base_url = settings.SEARCH_GATEWAY_URL
-        self.timeout = 10.0
+        self.timeout = settings.SEARCH_GATEWAY_TIMEOUT
+        fast = settings.SEARCH_GATEWAY_FAST_DECODE
+        self._decode_projects: Decoder = decode_projects if fast else decode_raw
+        self._decode_services: Decoder = decode_services if fast else decode_raw
+        # Cleared for good once the gateway rejects the projection parameters
+        self._projection = settings.SEARCH_GATEWAY_PROJECTION or settings.SEARCH_GATEWAY_SNIPPETS
+        self._client: Optional[httpx.AsyncClient] = None
+        self._single_flight = SingleFlight() if settings.SEARCH_GATEWAY_COALESCE else None
+        self._hedger = Hedger(
+            delay=settings.SEARCH_GATEWAY_HEDGE_DELAY,
+            percentile=settings.SEARCH_GATEWAY_HEDGE_PERCENTILE,
+            max_ratio=settings.SEARCH_GATEWAY_HEDGE_MAX_RATIO,
+        ) if settings.SEARCH_GATEWAY_HEDGE else None
+        self._breaker = CircuitBreaker(
+            "Search Gateway",
+            failure_threshold=settings.SEARCH_GATEWAY_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.SEARCH_GATEWAY_BREAKER_RESET_TIMEOUT,
+        ) if settings.SEARCH_GATEWAY_BREAKER else None
+        # request key -> (response, fetched_at wall time)
+        self._last_good = TTLCache(ttl=settings.SEARCH_GATEWAY_STALE_TTL, max_entries=settings.SEARCH_GATEWAY_STALE_MAX_ENTRIES)
+
+    def _create_client(self) -> httpx.AsyncClient:
+        http2 = settings.SEARCH_GATEWAY_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("SEARCH_GATEWAY_HTTP2 is set but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.SEARCH_GATEWAY_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SEARCH_GATEWAY_MAX_KEEPALIVE,
+            keepalive_expiry=settings.SEARCH_GATEWAY_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=limits,
+            http2=http2,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client, created lazily if startup() was not called."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
 
-    async def _post_request(self, endpoint: str, payload: dict) -> dict:
-        async with httpx.AsyncClient() as client:
+    async def startup(self) -> None:
+        """Create the pooled client and open warm connections to the gateway."""
+        client = self.client
+        count = settings.SEARCH_GATEWAY_WARMUP_CONNECTIONS
+        if count <= 0:
+            return
+
+        async def _warm():
             try:
-                response = await client.post(
-                    f"{self.base_url}{endpoint}",
-                    json=payload,
-                    timeout=self.timeout
-                )
+                # Any response (even 404) leaves an open keep-alive connection in the pool.
+                # Bounded: a gateway that is down must not hold up the server's startup
+                await asyncio.wait_for(client.get(settings.SEARCH_GATEWAY_WARMUP_PATH), settings.SEARCH_GATEWAY_WARMUP_TIMEOUT)
+            except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                logger.warning(f"Search Gateway warm-up failed: {e!r}")
+
+        await asyncio.gather(*(_warm() for _ in range(count)))
+        logger.info(f"Search Gateway client ready ({count} warm connections to {self.base_url})")
+
+    async def shutdown(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def _project(self, payload: dict, fields: Tuple[str, ...], snippets: bool = False) -> dict:
+        """payload with the field projection and, for snippets, the server-side snippet length."""
+        if not self._projection:
+            return payload
+        if settings.SEARCH_GATEWAY_PROJECTION:
+            payload["fields"] = list(fields)
+        if snippets and settings.SEARCH_GATEWAY_SNIPPETS:
+            payload["snippet_length"] = settings.SNIPPET_LENGTH
+        return payload
+
+    @staticmethod
+    def _request_key(endpoint: str, payload: dict, decode: Decoder) -> tuple:
+        # Responses decoded differently (records / raw dicts) are never shared
+        return (endpoint, decode, json.dumps(payload, sort_keys=True, ensure_ascii=False))
+
+    async def _post_request(self, endpoint: str, payload: dict, decode: Decoder = decode_raw) -> dict:
+        if self._single_flight is None:
+            return await self._send_request(endpoint, payload, decode)
+        # Identical concurrent queries share one gateway call. It runs without the deadline of the
+        # caller that started it, only capped by SEARCH_GATEWAY_TIMEOUT: every caller waits for it
+        # as long as its own budget allows, so a short deadline can't fail the others
+        key = self._request_key(endpoint, payload, decode)
+        try:
+            return await within_deadline(self._single_flight.do(key, lambda: self._shared_request(endpoint, payload, decode)))
+        except DeadlineExceeded:
+            stale = self._stale(key)
+            if stale is None:
+                raise
+            FALLBACKS.labels("stale").inc()
+            return stale
+
+    async def _shared_request(self, endpoint: str, payload: dict, decode: Decoder) -> dict:
+        with no_deadline():
+            return await self._send_request(endpoint, payload, decode)
+
+    async def _send_request(self, endpoint: str, payload: dict, decode: Decoder = decode_raw) -> dict:
+        """
+        Gateway response; on failure the last good response to the same request
+        with its "stale_age" in seconds, or no results.
+        While the circuit is open the gateway is not called at all, and
+        CircuitOpenError is raised if there is nothing stale to serve.
+        """
+        key = self._request_key(endpoint, payload, decode)
+        if self._breaker is not None and not self._breaker.allow():
+            stale = self._stale(key)
+            if stale is None:
+                FALLBACKS.labels("circuit_open").inc()
+                raise CircuitOpenError(self._breaker.name, self._breaker.retry_in())
+            FALLBACKS.labels("stale").inc()
+            return stale
+
+        try:
+            if self._hedger is not None:
+                data = await self._hedger.run(lambda: self._post(endpoint, payload, decode))
+            else:
+                data = await self._post(endpoint, payload, decode)
+        except asyncio.CancelledError:
+            if self._breaker is not None:
+                self._breaker.record_cancel()
+            raise
+        except (DeadlineExceeded, httpx.TimeoutException) as e:
+            if not self._cut_by_deadline(e):
+                return self._failed(key, e)
+            # The caller's budget ran out, which says nothing about the gateway's health
+            if self._breaker is not None:
+                self._breaker.record_cancel()
+            stale = self._stale(key)
+            if stale is None:
+                raise DeadlineExceeded("deadline exceeded") from e
+            FALLBACKS.labels("stale").inc()
+            return stale
+        except Exception as e:
+            return self._failed(key, e)
+
+        if self._breaker is not None:
+            self._breaker.record_success()
+        self._last_good.set(key, (data, time.time()))
+        return data
+
+    def _failed(self, key: tuple, error: Exception) -> dict:
+        if self._breaker is not None:
+            self._breaker.record_failure()
+        logger.warning(f"Error querying Search Gateway: {error!r}")
+        stale = self._stale(key)
+        FALLBACKS.labels("empty" if stale is None else "stale").inc()
+        return stale or {"results": []}
+
+    def _cut_by_deadline(self, error: Exception) -> bool:
+        """True if the request timed out because the call's deadline, not SEARCH_GATEWAY_TIMEOUT, limited it."""
+        left = remaining()
+        return isinstance(error, DeadlineExceeded) or (left is not None and left <= _DEADLINE_SLACK)
+
+    def _stale(self, key: tuple) -> Optional[dict]:
+        entry = self._last_good.get(key)
+        if entry is None:
+            return None
+        data, fetched_at = entry
+        return {**data, "stale_age": time.time() - fetched_at}
+
+    def _request_timeout(self, attempt: str) -> float:
+        """Only the remaining budget of the tool call, never more than SEARCH_GATEWAY_TIMEOUT."""
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(f"deadline exceeded before the {attempt}")
+        return budget(self.timeout)
+
+    async def _post(self, endpoint: str, payload: dict, decode: Decoder = decode_raw) -> dict:
+        timeout = self._request_timeout("gateway call")
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            with span("gateway.request", endpoint=endpoint) as request_span:
+                # The gateway can log the caller's trace id and span
+                parent = current_span()
+                headers = {"traceparent": parent.traceparent()} if parent is not None else None
+                response = await self.client.post(endpoint, json=payload, timeout=timeout, headers=headers)
+                if response.status_code in _REJECTED_STATUSES and any(k in payload for k in _PROJECTION_KEYS):
+                    payload = self._without_projection(payload, response.status_code)
+                    request_span.set("projection", False)
+                    # The rejected attempt may have used up the budget
+                    retry_timeout = self._request_timeout("projection retry")
+                    response = await self.client.post(endpoint, json=payload, timeout=retry_timeout, headers=headers)
+                request_span.set("status", response.status_code)
                 response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error querying Search Gateway: {e}")
-                return {"results": []}
+            with span("gateway.decode", bytes=len(response.content)):
+                data = decode(response.content, payload)
+        except Exception as e:
+            REQUEST_ERRORS.labels(endpoint, type(e).__name__).inc()
+            raise
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+        # Cancelled attempts (losing hedges, abandoned calls) are not observed
+        REQUEST_LATENCY.labels(endpoint).observe(time.perf_counter() - started)
+        return data
+
+    def _without_projection(self, payload: dict, status: int) -> dict:
+        if self._projection:
+            self._projection = False
+            logger.warning(f"Search Gateway rejected the projection parameters ({status}), no longer sending them")
+        return {k: v for k, v in payload.items() if k not in _PROJECTION_KEYS}
+
+    async def fetch_collection(self, collection: str, limit: int) -> List[dict]:
+        """
+        Raw result objects of "projects" or "prices", for snapshot export.
+
+        The gateway has no listing endpoint: a pure vector query for an empty
+        string ranks every object, so limit bounds what is exported. Unlike
+        searches, a failed request raises (httpx.HTTPError) instead of falling
+        back to stale or empty results, which would replace a good snapshot.
+        """
+        data = await self._post(f"/search/{collection}", {"query": "", "limit": limit, "alpha": 1.0})
+        return data.get("results", [])
 
     async def search_projects(self, query: str, limit: int = 3) -> List[ProjectEntity]:
-        payload = {
+        payload = self._project({
             "query": query,
             "limit": limit,
-            "alpha": 0.5
-        }
-        print(f"DEBUG: Querying Gateway for projects: {payload}")
-        data = await self._post_request("/search/projects", payload)
-        print(f"DEBUG: Gateway response data keys: {data.keys()}")
-        
-        results = []
-        for item in data.get("results", []):
-            results.append(ProjectEntity(
-                title=item.get("title", "No Title"),
-                url=item.get("url"),
-                description=item.get("full_text", "")[:200] + "..."
-            ))
-        print(f"DEBUG: Parsed {len(results)} projects")
+            "alpha": settings.SEARCH_ALPHA
+        }, PROJECT_FIELDS, snippets=True)
+        logger.debug(f"Querying Gateway for projects: {payload}")
+        data = await self._post_request("/search/projects", payload, self._decode_projects)
+
+        with span("gateway.entities", kind="projects"):
+            results = parse_projects(data, query)
+        logger.debug(f"Parsed {len(results)} projects")
         return results
 
     async def search_services(self, query: str, limit: int = 5) -> List[ServiceEntity]:
-        payload = {
+        payload = self._project({
             "query": query,
             "limit": limit,
-            "alpha": 0.5
-        }
-        data = await self._post_request("/search/prices", payload)
+            "alpha": settings.SEARCH_ALPHA
+        }, SERVICE_FIELDS)
+        data = await self._post_request("/search/prices", payload, self._decode_services)
         
-        results = []
-        for item in data.get("results", []):
-            results.append(ServiceEntity(
-                name=item.get("service", "Unknown Service"),
-                price=float(item.get("price", 0.0)),
-                description=item.get("full_text", "")
-            ))
-        return results
+        with span("gateway.entities", kind="services"):
+            return parse_services(data)
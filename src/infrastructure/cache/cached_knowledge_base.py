@@ -0,0 +1,53 @@
+from typing import List
+from pydantic import BaseModel
+from src.domain.interfaces import IKnowledgeBase
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.infrastructure.cache.ttl_cache import TTLCache
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query used as cache key."""
+    return " ".join(query.lower().split())
+
+
+def _entities_size(entities: List[BaseModel]) -> int:
+    """Approximate memory footprint of a cached result list."""
+    size = 0
+    for entity in entities:
+        for value in entity.__dict__.values():
+            size += len(value) if isinstance(value, str) else 8
+    return size
+
+
+class CachedKnowledgeBase(IKnowledgeBase):
+    """IKnowledgeBase decorator that serves repeated searches from a TTL + LRU cache."""
+
+    def __init__(self, kb: IKnowledgeBase, ttl: float, max_entries: int, max_bytes: int = 0, alpha: float = 0.5):
+        self.kb = kb
+        self.alpha = alpha
+        self.cache = TTLCache(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes, sizeof=_entities_size)
+
+    def _key(self, tool: str, query: str, limit: int) -> tuple:
+        return (tool, normalize_query(query), limit, self.alpha)
+
+    async def _cached(self, tool: str, query: str, limit: int, fetch) -> list:
+        key = self._key(tool, query, limit)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        results = await fetch(query, limit)
+        # Empty lists are not cached: the gateway adapter also reports outages as empty results.
+        # Neither are stale outage fallbacks, so fresh results show up as soon as the backend recovers.
+        if results and all(getattr(r, "stale_age", None) is None for r in results):
+            self.cache.set(key, tuple(results))
+        return results
+
+    async def search_projects(self, query: str, limit: int = 3) -> List[ProjectEntity]:
+        return await self._cached("projects", query, limit, self.kb.search_projects)
+
+    async def search_services(self, query: str, limit: int = 5) -> List[ServiceEntity]:
+        return await self._cached("services", query, limit, self.kb.search_services)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
@@ -0,0 +1,381 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Protocol, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: single-process use only
+    fcntl = None
+
+from src.infrastructure.cache.cached_knowledge_base import normalize_query
+
+logger = logging.getLogger(__name__)
+
+_FLOAT_SIZE = array("f").itemsize
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of embedding vectors keyed by normalized text.
+
+    Tier 1 is an in-process LRU of float32 arrays (4 bytes per component, converted
+    to lists only when handed out). Tier 2 is an append-only store on disk:
+    float32 vectors in ``vectors-<gen>.f32`` (memory-mapped, so the page cache
+    is shared between workers) and ``index-<gen>.jsonl`` with one
+    ``[key, offset, dim]`` line per vector. ``CURRENT`` names the live
+    generation; compaction writes a new generation and switches it atomically.
+
+    Appends are serialized between processes with an flock on ``LOCK``, and each
+    process picks up vectors appended by others by tailing the index on a miss.
+
+    recall() and remember() only touch the in-process tier and never block;
+    get(), put() and compact() do disk I/O and are meant for a worker thread
+    (see CachedEmbeddingClient). Both tiers are safe to use from several threads.
+    """
+
+    def __init__(self, path: str, memory_entries: int = 10000, max_disk_bytes: int = 256 * 1024 * 1024, compact_ratio: float = 0.5):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.compact_ratio = compact_ratio
+
+        self._memory: "OrderedDict[str, array]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        # Disk tier state below, also held while the flock is
+        self._disk_lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._generation = -1
+        self._index_pos = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._data_file = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.compactions = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, "LOCK"), "a+")
+        with self._locked():
+            self._load()
+
+    # --- public API ---
+
+    def recall(self, text: str) -> Optional[List[float]]:
+        """Vector from the in-process tier only, without disk I/O."""
+        key = normalize_query(text)
+        with self._memory_lock:
+            vector = self._memory.get(key)
+            if vector is None:
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+        return vector.tolist()
+
+    def remember(self, text: str, vector: List[float]) -> None:
+        """Add a vector to the in-process tier only; store() writes it to disk."""
+        self._remember(normalize_query(text), array("f", vector))
+
+    def get(self, text: str) -> Optional[List[float]]:
+        vector = self.recall(text)
+        if vector is not None:
+            return vector
+
+        key = normalize_query(text)
+        with self._disk_lock:
+            if key not in self._index:
+                self._refresh()
+            location = self._index.get(key)
+            vector = self._read(*location) if location is not None else None
+            if vector is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, vector)
+        return vector.tolist()
+
+    def put(self, text: str, vector: List[float]) -> None:
+        self.remember(text, vector)
+        self.store(text, vector)
+
+    def store(self, text: str, vector: List[float]) -> None:
+        """Append a vector to the disk tier (compacting it when full), unless it is there already."""
+        key = normalize_query(text)
+        with self._locked():
+            self._refresh()
+            if key in self._index:
+                return
+            data = array("f", vector).tobytes()
+            self._data_file.seek(0, os.SEEK_END)
+            offset = self._data_file.tell()
+            self._data_file.write(data)
+            self._data_file.flush()
+            # The index line is written after the vector, so a crash leaves unreferenced bytes, never a dangling entry
+            with open(self._index_path(self._generation), "a", encoding="utf-8") as index_file:
+                index_file.write(json.dumps([key, offset, len(vector)], ensure_ascii=False) + "\n")
+                self._index_pos = index_file.tell()
+            self._index[key] = (offset, len(vector))
+
+            if offset + len(data) > self.max_disk_bytes:
+                self._compact()
+
+    def compact(self) -> None:
+        with self._locked():
+            self._refresh()
+            self._compact()
+
+    def stats(self) -> dict:
+        with self._memory_lock:
+            memory_entries = len(self._memory)
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": memory_entries,
+            "disk_entries": len(self._index),
+            "disk_bytes": self._data_size(),
+            "generation": self._generation,
+            "compactions": self.compactions,
+        }
+
+    def close(self) -> None:
+        with self._disk_lock:
+            self._close_data()
+            self._lock_file.close()
+
+    # --- internals ---
+
+    def _remember(self, key: str, vector: array) -> None:
+        with self._memory_lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _locked(self):
+        return _FileLock(self._lock_file, self._disk_lock)
+
+    def _current_path(self) -> str:
+        return os.path.join(self.path, "CURRENT")
+
+    def _data_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"vectors-{generation}.f32")
+
+    def _index_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"index-{generation}.jsonl")
+
+    def _read_generation(self) -> int:
+        try:
+            with open(self._current_path(), encoding="utf-8") as f:
+                return int(json.load(f)["generation"])
+        except (OSError, ValueError, KeyError):
+            return -1
+
+    def _load(self) -> None:
+        """(Re)open the live generation, creating an empty one if the store is new."""
+        generation = self._read_generation()
+        if generation < 0:
+            generation = 0
+            self._write_generation(generation)
+
+        self._close_data()
+        self._generation = generation
+        self._index = {}
+        self._index_pos = 0
+        self._data_file = open(self._data_path(generation), "a+b")
+        open(self._index_path(generation), "a").close()
+        self._tail_index()
+
+    def _refresh(self) -> None:
+        """Pick up a new generation or index lines appended by other workers."""
+        if self._read_generation() != self._generation:
+            self._load()
+        else:
+            self._tail_index()
+
+    def _tail_index(self) -> None:
+        with open(self._index_path(self._generation), "rb") as f:
+            f.seek(self._index_pos)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partially written line of a concurrent writer; read it next time
+                    break
+                self._index_pos += len(line)
+                try:
+                    key, offset, dim = json.loads(line)
+                except ValueError:
+                    continue
+                self._index[key] = (offset, dim)
+
+    def _data_size(self) -> int:
+        if self._data_file is None:
+            return 0
+        return os.fstat(self._data_file.fileno()).st_size
+
+    def _mapped(self, end: int) -> Optional[mmap.mmap]:
+        """Mapping of the data file covering its first end bytes, None if the file is shorter."""
+        if self._mmap is None or len(self._mmap) < end:
+            size = self._data_size()
+            if size < end or not size:
+                return None
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._data_file.fileno(), size, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def _read(self, offset: int, dim: int) -> Optional[array]:
+        end = offset + dim * _FLOAT_SIZE
+        mapped = self._mapped(end)
+        if mapped is None:
+            return None
+        vector = array("f")
+        vector.frombytes(mapped[offset:end])
+        return vector
+
+    def _compact(self) -> None:
+        """Rewrite the store keeping the most recently added vectors within compact_ratio * max_disk_bytes."""
+        budget = int(self.max_disk_bytes * self.compact_ratio)
+        mapped = self._mapped(self._data_size())
+        kept = []
+        size = 0
+        # Index order is insertion order: walk from the newest entry
+        for key, (offset, dim) in reversed(list(self._index.items())):
+            nbytes = dim * _FLOAT_SIZE
+            if size + nbytes > budget:
+                break
+            if mapped is not None and offset + nbytes <= len(mapped):
+                kept.append((key, offset, dim))
+                size += nbytes
+        kept.reverse()
+
+        generation = self._generation + 1
+        with open(self._data_path(generation), "wb") as data_file, \
+                open(self._index_path(generation), "w", encoding="utf-8") as index_file:
+            # Vectors are copied as raw byte ranges of the mapping; appends are contiguous,
+            # so the kept entries mostly form a single range
+            position = 0
+            run_start = run_end = 0
+            for key, offset, dim in kept:
+                if offset != run_end:
+                    self._copy(mapped, run_start, run_end, data_file)
+                    run_start = run_end = offset
+                run_end += dim * _FLOAT_SIZE
+                index_file.write(json.dumps([key, position, dim], ensure_ascii=False) + "\n")
+                position += dim * _FLOAT_SIZE
+            self._copy(mapped, run_start, run_end, data_file)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+            index_file.flush()
+            os.fsync(index_file.fileno())
+
+        old_generation = self._generation
+        self._write_generation(generation)
+        self._load()
+        # Other workers may still map the old file; on POSIX the unlinked pages stay valid until unmapped
+        for path in (self._data_path(old_generation), self._index_path(old_generation)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.compactions += 1
+        logger.info(f"Embedding cache compacted: {len(kept)} vectors kept, generation {generation}")
+
+    @staticmethod
+    def _copy(mapped: Optional[mmap.mmap], start: int, end: int, file) -> None:
+        if end > start:
+            with memoryview(mapped) as view, view[start:end] as part:
+                file.write(part)
+
+    def _write_generation(self, generation: int) -> None:
+        tmp_path = self._current_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"generation": generation}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._current_path())
+
+    def _close_data(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._data_file is not None:
+            self._data_file.close()
+            self._data_file = None
+
+
+class _FileLock:
+    """Exclusive flock, and the thread lock of this process, held for the duration of a with-block."""
+
+    def __init__(self, file, lock: threading.Lock):
+        self.file = file
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.lock.release()
+        return False
+
+
+class IEmbeddingClient(Protocol):
+    async def get_embedding(self, text: str) -> Optional[List[float]]:
+        ...
+
+
+class CachedEmbeddingClient:
+    """
+    Embedding client decorator that consults an EmbeddingCache before calling the service.
+
+    Only in-process hits are answered on the event loop. Disk lookups run on
+    the executor, and new vectors are written to disk there in the background
+    (flock, appends and compaction), while the caller already has its vector.
+    """
+
+    def __init__(self, client: IEmbeddingClient, cache: EmbeddingCache, executor: Optional[Executor] = None):
+        self.client = client
+        self.cache = cache
+        # One thread: disk writes of this process queue up instead of contending for the flock
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-cache")
+        self._writes: Set[asyncio.Future] = set()
+
+    async def get_embedding(self, text: str) -> Optional[List[float]]:
+        vector = self.cache.recall(text)
+        if vector is not None:
+            return vector
+        loop = asyncio.get_running_loop()
+        vector = await loop.run_in_executor(self.executor, self.cache.get, text)
+        if vector is not None:
+            return vector
+        vector = await self.client.get_embedding(text)
+        if vector:
+            self.cache.remember(text, vector)
+            write = loop.run_in_executor(self.executor, self.cache.store, text, vector)
+            self._writes.add(write)
+            write.add_done_callback(self._written)
+        return vector
+
+    def _written(self, write: asyncio.Future) -> None:
+        self._writes.discard(write)
+        if not write.cancelled() and write.exception() is not None:
+            logger.warning(f"Could not write an embedding to the cache: {write.exception()!r}")
+
+    async def shutdown(self) -> None:
+        if hasattr(self.client, "shutdown"):
+            await self.client.shutdown()
+        # Pending writes first: the store is closed on the same thread
+        await asyncio.gather(*self._writes, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.cache.close)
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Percentile of the most recent latencies; the sorted window is recomputed every few samples."""
+
+    def __init__(self, window: int = 256, refresh_every: int = 16):
+        self._samples: deque = deque(maxlen=window)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._sorted: list = []
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_refresh += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        if self._since_refresh >= self._refresh_every or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._since_refresh = 0
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class Hedger:
+    """
+    Hedged calls: if the first attempt has not finished after a delay, a second
+    one is started; the first successful result wins and the other attempt is cancelled.
+
+    The delay is fixed, or the live latency percentile once min_samples are known
+    (no hedging before that). Hedges are paid from a budget that grows by
+    max_ratio per call, so they stay below max_ratio of the traffic and stop
+    when the backend is uniformly slow instead of doubling its load.
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: float = 0.95,
+        max_ratio: float = 0.1,
+        min_delay: float = 0.01,
+        min_samples: int = 20,
+        burst: float = 10.0,
+    ):
+        self.fixed_delay = delay
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.burst = burst
+        self.latency = LatencyTracker()
+        self._budget = 0.0
+
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.over_budget = 0
+
+    def delay(self) -> Optional[float]:
+        if self.fixed_delay is not None:
+            return self.fixed_delay
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile))
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        self._budget = min(self.burst, self._budget + self.max_ratio)
+        delay = self.delay()
+
+        primary = self._start(fn)
+        if delay is None:
+            return await primary
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            if self._budget < 1.0:
+                self.over_budget += 1
+                return await primary
+
+            self._budget -= 1.0
+            self.hedged += 1
+            hedge = self._start(fn)
+            try:
+                winner = await self._first_success(primary, hedge)
+            finally:
+                hedge.cancel()
+            if winner is hedge:
+                self.hedge_wins += 1
+            return winner.result()
+        finally:
+            primary.cancel()
+
+    def _start(self, fn: Callable[[], Awaitable[T]]) -> asyncio.Future:
+        task = asyncio.ensure_future(self._timed(fn))
+        # The losing attempt's error is never awaited; mark it retrieved
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    @staticmethod
+    async def _first_success(*attempts: asyncio.Future) -> asyncio.Future:
+        """First attempt that succeeds; if all fail, the last error is raised."""
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                if task.exception() is None:
+                    return task
+                error = task.exception()
+        raise error if error is not None else asyncio.CancelledError()
+
+    async def _timed(self, fn: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        result = await fn()
+        # Only successful attempts feed the percentile: fast errors would pull the delay down
+        self.latency.record(time.perf_counter() - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "over_budget": self.over_budget,
+            "delay": self.delay(),
+        }
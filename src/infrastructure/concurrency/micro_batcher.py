@@ -0,0 +1,112 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Collects concurrent submit() calls into batched process() calls.
+
+    A batch is processed when max_batch distinct keys are waiting or window
+    seconds after its first key arrived, whichever comes first. Concurrent
+    submits of the same key share one slot in the batch. process() must
+    return one value per key, in order; its exception is raised to every waiter.
+    """
+
+    def __init__(self, process: Callable[[List[K]], Awaitable[List[V]]], window: float, max_batch: int):
+        self.process = process
+        self.window = window
+        self.max_batch = max_batch
+        # key -> (future, enqueue time)
+        self._pending: Dict[K, Tuple[asyncio.Future, float]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.keys = 0
+        self.max_batch_seen = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    async def submit(self, key: K) -> V:
+        loop = asyncio.get_running_loop()
+        self.items += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = (loop.create_future(), loop.time())
+            self._pending[key] = pending
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+        # Shielded: one cancelled caller must not cancel the result for callers sharing the key
+        return await asyncio.shield(pending[0])
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[K, Tuple[asyncio.Future, float]]) -> None:
+        self._record(batch, asyncio.get_running_loop().time())
+        keys = list(batch)
+        try:
+            values = await self.process(keys)
+            if len(values) != len(keys):
+                raise ValueError(f"Batch returned {len(values)} values for {len(keys)} keys")
+        except BaseException as e:
+            for future, _ in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Retrieved here so nobody-waiting futures do not log "exception was never retrieved"
+                    future.exception()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for key, value in zip(keys, values):
+            future = batch[key][0]
+            if not future.done():
+                future.set_result(value)
+
+    def _record(self, batch: Dict[K, Tuple[asyncio.Future, float]], now: float) -> None:
+        size = len(batch)
+        self.batches += 1
+        self.keys += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+        for _, enqueued_at in batch.values():
+            delay = now - enqueued_at
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.keys / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "mean_queue_delay_ms": 1000 * self.total_delay / self.keys if self.keys else 0.0,
+            "max_queue_delay_ms": 1000 * self.max_delay,
+        }
+
+    async def shutdown(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for future, _ in self._pending.values():
+            future.cancel()
+        self._pending = {}
+        for task in list(self._tasks):
+            task.cancel()
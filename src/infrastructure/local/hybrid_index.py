@@ -0,0 +1,152 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+class HybridIndex:
+    """
+    In-memory hybrid index: BM25 over a CSR inverted index plus brute-force cosine over a vector matrix.
+
+    Scores are fused like Weaviate's relativeScoreFusion: each score is scaled
+    to [0, 1] over the collection, then combined as
+    alpha * vector + (1 - alpha) * keyword. alpha=0 is pure BM25 (only
+    documents containing a query term), alpha=1 is pure vector search.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        terms: Sequence[str],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        weights: np.ndarray,
+        idf: np.ndarray,
+        vectors: Optional[np.ndarray] = None,
+    ):
+        """Open an index from its arrays (see build()); vectors must already be L2-normalized."""
+        self.size = size
+        # CSR layout: postings of terms[t] are doc_ids[indptr[t]:indptr[t + 1]], same for weights
+        self.terms = terms
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.idf = idf
+        self.vectors = vectors
+        self._vocabulary: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def build(cls, texts: Sequence[str], vectors: Optional[np.ndarray] = None, k1: float = 1.2, b: float = 0.75) -> "HybridIndex":
+        size = len(texts)
+        vocabulary: Dict[str, int] = {}
+        postings: List[List[Tuple[int, int]]] = []
+        doc_lengths = np.zeros(size, dtype=np.float32)
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                term_id = vocabulary.setdefault(term, len(postings))
+                if term_id == len(postings):
+                    postings.append([])
+                postings[term_id].append((doc_id, tf))
+
+        avg_length = float(doc_lengths.mean()) if size else 0.0
+        norm = k1 * (1 - b + b * doc_lengths / avg_length) if avg_length else np.full(size, k1, dtype=np.float32)
+
+        indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        doc_ids = np.empty(sum(len(p) for p in postings), dtype=np.int32)
+        weights = np.empty(len(doc_ids), dtype=np.float32)
+        idf = np.empty(len(postings), dtype=np.float32)
+        offset = 0
+        for term_id, plist in enumerate(postings):
+            ids = np.fromiter((d for d, _ in plist), dtype=np.int32, count=len(plist))
+            tfs = np.fromiter((tf for _, tf in plist), dtype=np.float32, count=len(plist))
+            doc_ids[offset:offset + len(plist)] = ids
+            # BM25 term weight without idf, precomputed per posting
+            weights[offset:offset + len(plist)] = tfs * (k1 + 1) / (tfs + norm[ids])
+            df = len(plist)
+            idf[term_id] = math.log(1 + (size - df + 0.5) / (df + 0.5))
+            offset += len(plist)
+            indptr[term_id + 1] = offset
+
+        normalized = None
+        if vectors is not None and len(vectors):
+            vectors = np.asarray(vectors, dtype=np.float32)
+            lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+            lengths[lengths == 0] = 1.0
+            normalized = vectors / lengths
+
+        index = cls(size, list(vocabulary), indptr, doc_ids, weights, idf, normalized)
+        index._vocabulary = vocabulary
+        return index
+
+    @property
+    def vocabulary(self) -> Dict[str, int]:
+        if self._vocabulary is None:
+            self._vocabulary = {term: term_id for term_id, term in enumerate(self.terms)}
+        return self._vocabulary
+
+    def bm25(self, terms: Sequence[str]) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(terms):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # doc ids are unique within a posting list, so fancy-index add is safe
+            scores[self.doc_ids[start:end]] += self.idf[term_id] * self.weights[start:end]
+        return scores
+
+    def cosine(self, vector: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+        if self.vectors is None or vector is None:
+            return None
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape[0] != self.vectors.shape[1]:
+            return None
+        length = np.linalg.norm(query)
+        if length == 0:
+            return None
+        return self.vectors @ (query / length)
+
+    def search(self, query: str, vector: Optional[Sequence[float]], limit: int, alpha: float = 0.5) -> List[Tuple[int, float]]:
+        """Top (doc_id, score) pairs for a lemmatized query and its embedding."""
+        if not self.size or limit <= 0:
+            return []
+
+        keyword = self.bm25(tokenize(query))
+        similarity = self.cosine(vector)
+        if similarity is None:
+            # No usable vector: keyword search only
+            alpha = 0.0
+
+        if alpha <= 0.0:
+            candidates = np.flatnonzero(keyword > 0)
+            if not len(candidates):
+                return []
+            fused = keyword[candidates] / keyword[candidates].max()
+        else:
+            candidates = np.arange(self.size)
+            fused = alpha * _min_max(similarity)
+            if alpha < 1.0:
+                top = keyword.max()
+                if top > 0:
+                    fused += (1 - alpha) * keyword / top
+
+        if len(candidates) > limit:
+            best = np.argpartition(-fused, limit - 1)[:limit]
+        else:
+            best = np.arange(len(candidates))
+        best = best[np.argsort(-fused[best], kind="stable")]
+        return [(int(candidates[i]), float(fused[i])) for i in best]
+
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    low, high = scores.min(), scores.max()
+    if high <= low:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
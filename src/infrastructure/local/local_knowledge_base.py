@@ -0,0 +1,133 @@
+import json
+import logging
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from src.domain.interfaces import IKnowledgeBase
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.infrastructure.local.hybrid_index import HybridIndex
+from src.infrastructure.local.snapshot import Snapshot, is_snapshot
+from src.infrastructure.nlp.query_preparer import QueryPreparer
+from src.infrastructure.nlp.snippets import project_snippet, sentence_offsets
+
+logger = logging.getLogger(__name__)
+
+def _field_text(record: dict, *fields: str) -> str:
+    return " ".join(str(record.get(field) or "") for field in fields)
+
+def _vectors(records: List[dict]) -> Optional[np.ndarray]:
+    """Vector matrix of the records; records without a vector get a zero row."""
+    dim = next((len(r["vector"]) for r in records if r.get("vector")), 0)
+    if not dim:
+        return None
+    matrix = np.zeros((len(records), dim), dtype=np.float32)
+    for i, record in enumerate(records):
+        vector = record.get("vector")
+        if vector and len(vector) == dim:
+            matrix[i] = vector
+    return matrix
+
+class LocalKnowledgeBase(IKnowledgeBase):
+    """
+    Hybrid search over an in-process copy of the PortfolioProject and PriceList collections.
+
+    The copy is either a snapshot directory written by
+    ``python -m src.presentation.export_snapshot`` (memory-mapped, the index is
+    prebuilt) or a JSON file {"projects": [...], "prices": [...]} with the
+    Weaviate properties of each object and an optional "vector", indexed at load.
+    Keyword search runs over the lemmatized properties Weaviate's hybrid query uses;
+    the vector half embeds every query through the preparer's embedding client
+    (TRANSFORMERS_URL) and is left out when the copy has no vectors or alpha is 0,
+    or for the query when the embedding service doesn't answer.
+    """
+
+    def __init__(self, path: str, preparer: QueryPreparer, alpha: float = 0.5):
+        self.path = path
+        self.preparer = preparer
+        self.alpha = alpha
+        # Lists of dicts (JSON) or SnapshotCollections; both index by doc id and support .get()
+        self.projects: Sequence = []
+        self.prices: Sequence = []
+        self._project_index: Optional[HybridIndex] = None
+        self._price_index: Optional[HybridIndex] = None
+
+    async def startup(self) -> None:
+        self.load()
+        await self.preparer.startup()
+
+    async def shutdown(self) -> None:
+        await self.preparer.shutdown()
+
+    def load(self) -> None:
+        if is_snapshot(self.path):
+            self.open_snapshot(Snapshot(self.path))
+            return
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.index(data.get("projects", []), data.get("prices", []))
+
+    def open_snapshot(self, snapshot: Snapshot) -> None:
+        self.projects = snapshot.projects
+        self.prices = snapshot.prices
+        self._project_index = snapshot.projects.index()
+        self._price_index = snapshot.prices.index()
+        logger.info(
+            f"Local knowledge base mapped from snapshot {snapshot.path} ({snapshot.manifest.get('created_at')}): "
+            f"{len(self.projects)} projects, {len(self.prices)} prices"
+        )
+
+    def index(self, projects: List[dict], prices: List[dict]) -> None:
+        for project in projects:
+            project["sentences"] = sentence_offsets(project.get("full_text") or "")
+        self.projects = projects
+        self.prices = prices
+        self._project_index, self._price_index = self.build_indexes(projects, prices)
+        logger.info(f"Local knowledge base indexed: {len(projects)} projects, {len(prices)} prices")
+
+    @staticmethod
+    def build_indexes(projects: List[dict], prices: List[dict]) -> Tuple[HybridIndex, HybridIndex]:
+        project_index = HybridIndex.build(
+            [_field_text(p, "lemmatized_text", "lemmatized_title") for p in projects],
+            _vectors(projects),
+        )
+        price_index = HybridIndex.build(
+            [_field_text(p, "lemmatized_service", "lemmatized_description") for p in prices],
+            _vectors(prices),
+        )
+        return project_index, price_index
+
+    def _ensure_loaded(self) -> None:
+        if self._project_index is None:
+            self.load()
+
+    def _embeds(self, index: HybridIndex) -> bool:
+        """Whether the vector half of the search runs: without vectors or with alpha 0 TRANSFORMERS_URL isn't called."""
+        return self.alpha > 0 and index.vectors is not None
+
+    async def search_projects(self, query: str, limit: int = 3) -> List[ProjectEntity]:
+        self._ensure_loaded()
+        l_query, vector = await self.preparer.prepare(query, embed=self._embeds(self._project_index))
+
+        results = []
+        for doc_id, _ in self._project_index.search(l_query, vector, limit, self.alpha):
+            project = self.projects[doc_id]
+            results.append(ProjectEntity(
+                title=project.get("title") or "No Title",
+                url=project.get("url"),
+                # The BM25 index is built over lemmatized text, so the passage is picked for the lemmatized query too
+                description=project_snippet(project.get("full_text") or "", l_query or query, project.get("sentences")),
+            ))
+        return results
+
+    async def search_services(self, query: str, limit: int = 5) -> List[ServiceEntity]:
+        self._ensure_loaded()
+        l_query, vector = await self.preparer.prepare(query, embed=self._embeds(self._price_index))
+
+        results = []
+        for doc_id, _ in self._price_index.search(l_query, vector, limit, self.alpha):
+            price = self.prices[doc_id]
+            results.append(ServiceEntity(
+                name=price.get("service") or "",
+                price=float(price.get("price") or 0.0),
+                description=price.get("description") or price.get("full_text")
+            ))
+        return results
@@ -0,0 +1,225 @@
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from src.infrastructure.local.hybrid_index import HybridIndex
+from src.infrastructure.nlp.snippets import sentence_offsets
+
+FORMAT = "kb-snapshot"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Properties kept for building results; the lemmatized ones only live on as the BM25 index
+PROJECT_COLUMNS = ("title", "url", "full_text")
+PRICE_COLUMNS = ("service", "description", "full_text")
+# Precomputed sentence offsets of the project texts, for snippets (absent in older snapshots)
+PROJECT_LISTS = ("sentences",)
+
+def is_snapshot(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+class StringColumn:
+    """
+    UTF-8 strings stored back to back in one byte blob, with int64 offsets (n + 1)
+    and a null mask. Values are decoded on access, so opening the column costs nothing.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, nulls: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self.nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self.nulls)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self.nulls[i]:
+            return None
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @staticmethod
+    def write(directory: str, name: str, values: Sequence[Optional[str]]) -> None:
+        encoded = [(v if isinstance(v, str) else str(v)).encode("utf-8") if v is not None else b"" for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        _save(directory, f"{name}.blob", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        _save(directory, f"{name}.offsets", offsets)
+        _save(directory, f"{name}.nulls", np.array([v is None for v in values], dtype=bool))
+
+    @classmethod
+    def open(cls, directory: str, name: str) -> "StringColumn":
+        return cls(_load(directory, f"{name}.blob"), _load(directory, f"{name}.offsets"), _load(directory, f"{name}.nulls"))
+
+class IntListColumn:
+    """Lists of ints stored back to back in one int32 array, with int64 offsets (n + 1)."""
+
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        self.values = values
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> List[int]:
+        return self.values[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    @staticmethod
+    def write(directory: str, name: str, values: Sequence[Sequence[int]]) -> None:
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        flat = np.fromiter((x for v in values for x in v), dtype=np.int32, count=int(offsets[-1]))
+        _save(directory, f"{name}.values", flat)
+        _save(directory, f"{name}.offsets", offsets)
+
+    @classmethod
+    def open(cls, directory: str, name: str) -> Optional["IntListColumn"]:
+        if not os.path.exists(os.path.join(directory, f"{name}.values.npy")):
+            return None
+        return cls(_load(directory, f"{name}.values"), _load(directory, f"{name}.offsets"))
+
+class SnapshotRecord:
+    """Read-only view of one object of a snapshot collection, dict-like enough for entity building."""
+
+    __slots__ = ("_collection", "_doc_id")
+
+    def __init__(self, collection: "SnapshotCollection", doc_id: int):
+        self._collection = collection
+        self._doc_id = doc_id
+
+    def get(self, field: str, default=None):
+        value = self._collection.value(field, self._doc_id)
+        return default if value is None else value
+
+class SnapshotCollection:
+    """One collection of a snapshot: string and int list columns, optional float64 price array and its hybrid index."""
+
+    def __init__(self, directory: str, columns: Sequence[str], size: int, lists: Sequence[str] = ()):
+        self.directory = directory
+        self.size = size
+        self.columns: Dict[str, StringColumn] = {name: StringColumn.open(directory, name) for name in columns}
+        self.lists: Dict[str, IntListColumn] = {}
+        for name in lists:
+            column = IntListColumn.open(directory, name)
+            if column is not None:
+                self.lists[name] = column
+        self.price: Optional[np.ndarray] = _load(directory, "price") if os.path.exists(os.path.join(directory, "price.npy")) else None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, doc_id: int) -> SnapshotRecord:
+        return SnapshotRecord(self, doc_id)
+
+    def value(self, field: str, doc_id: int):
+        if field == "price" and self.price is not None:
+            return float(self.price[doc_id])
+        column = self.columns.get(field) or self.lists.get(field)
+        return column[doc_id] if column is not None else None
+
+    def index(self) -> HybridIndex:
+        vectors = _load(self.directory, "vectors") if os.path.exists(os.path.join(self.directory, "vectors.npy")) else None
+        return HybridIndex(
+            self.size,
+            StringColumn.open(self.directory, "terms"),
+            _load(self.directory, "indptr"),
+            _load(self.directory, "doc_ids"),
+            _load(self.directory, "weights"),
+            _load(self.directory, "idf"),
+            vectors,
+        )
+
+class Snapshot:
+    """
+    Versioned columnar copy of the PortfolioProject and PriceList collections.
+
+    A snapshot is a directory with manifest.json and one subdirectory per
+    collection holding .npy arrays: string tables (blob + offsets + null mask),
+    the sentence offsets of the project texts, the float32 L2-normalized
+    vector matrix, the prices array and the prebuilt BM25 index (CSR arrays
+    and term table). Every array is opened with
+    np.load(mmap_mode="r"), so opening a snapshot reads nothing but the
+    manifest and the pages are shared between all workers mapping the same files.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT or manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot {path}: format {manifest.get('format')!r} "
+                f"version {manifest.get('format_version')!r}, expected {FORMAT!r} version {FORMAT_VERSION}"
+            )
+        self.path = path
+        self.manifest = manifest
+        collections = manifest["collections"]
+        self.projects = SnapshotCollection(os.path.join(path, "projects"), PROJECT_COLUMNS, collections["projects"]["count"], PROJECT_LISTS)
+        self.prices = SnapshotCollection(os.path.join(path, "prices"), PRICE_COLUMNS, collections["prices"]["count"])
+
+def write_snapshot(
+    path: str,
+    projects: List[dict],
+    prices: List[dict],
+    project_index: HybridIndex,
+    price_index: HybridIndex,
+    source: str = "",
+) -> None:
+    """Write a snapshot next to path and swap it in, so running servers keep their mapping of the old one."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    _write_collection(os.path.join(tmp_path, "projects"), projects, PROJECT_COLUMNS, project_index, with_price=False)
+    IntListColumn.write(os.path.join(tmp_path, "projects"), "sentences", [sentence_offsets(p.get("full_text") or "") for p in projects])
+    _write_collection(os.path.join(tmp_path, "prices"), prices, PRICE_COLUMNS, price_index, with_price=True)
+    manifest = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "source": source,
+        "collections": {
+            "projects": _describe(projects, project_index),
+            "prices": _describe(prices, price_index),
+        },
+    }
+    with open(os.path.join(tmp_path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # Directories can't be replaced atomically: move the old one aside, then drop it.
+    # Unlinked files stay valid for processes that still have them mapped.
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+def _write_collection(directory: str, records: List[dict], columns: Sequence[str], index: HybridIndex, with_price: bool) -> None:
+    os.makedirs(directory)
+    for name in columns:
+        StringColumn.write(directory, name, [record.get(name) for record in records])
+    if with_price:
+        _save(directory, "price", np.array([float(r.get("price") or 0.0) for r in records], dtype=np.float64))
+    if index.vectors is not None:
+        _save(directory, "vectors", np.ascontiguousarray(index.vectors, dtype=np.float32))
+    StringColumn.write(directory, "terms", list(index.terms))
+    _save(directory, "indptr", index.indptr)
+    _save(directory, "doc_ids", index.doc_ids)
+    _save(directory, "weights", index.weights)
+    _save(directory, "idf", index.idf)
+
+def _describe(records: List[dict], index: HybridIndex) -> dict:
+    return {
+        "count": len(records),
+        "dim": int(index.vectors.shape[1]) if index.vectors is not None else 0,
+        "terms": len(index.terms),
+    }
+
+def _save(directory: str, name: str, array: np.ndarray) -> None:
+    np.save(os.path.join(directory, f"{name}.npy"), array, allow_pickle=False)
+
+def _load(directory: str, name: str) -> np.ndarray:
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
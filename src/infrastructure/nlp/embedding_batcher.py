@@ -0,0 +1,32 @@
+import logging
+from typing import List, Optional
+from src.infrastructure.concurrency.micro_batcher import MicroBatcher
+from src.infrastructure.nlp.embeddings import TransformersEmbeddingClient
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent get_embedding() calls into batched get_embeddings() requests.
+
+    A batch is sent when max_batch texts are waiting or window seconds after its
+    first text arrived, whichever comes first. Duplicate texts in a batch are embedded once.
+    """
+
+    def __init__(self, client: TransformersEmbeddingClient, window: float = 0.005, max_batch: int = 32):
+        self.client = client
+        self._batcher = MicroBatcher(client.get_embeddings, window=window, max_batch=max_batch)
+
+    async def get_embedding(self, text: str) -> Optional[List[float]]:
+        try:
+            return await self._batcher.submit(text)
+        except Exception as e:
+            logger.error(f"Batch embedding failed: {e}")
+            return None
+
+    def stats(self) -> dict:
+        return self._batcher.stats()
+
+    async def shutdown(self) -> None:
+        await self._batcher.shutdown()
+        await self.client.shutdown()
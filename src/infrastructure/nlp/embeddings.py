@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import httpx
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+class TransformersEmbeddingClient:
+    """
+    Async client of the local transformers vectorizer service (POST {"text": ...} -> {"vector": [...]}).
+
+    If batch_url is set, get_embeddings() sends {"texts": [...]} there and expects {"vectors": [...]}.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0, batch_url: Optional[str] = None):
+        self.url = url
+        self.timeout = timeout
+        self.batch_url = batch_url
+        self._batch_supported = batch_url is not None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    async def shutdown(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def get_embedding(self, text: str) -> Optional[List[float]]:
+        """Get vector embedding for text, None if the service is unavailable."""
+        try:
+            response = await self.client.post(self.url, json={"text": text})
+            response.raise_for_status()
+            return response.json().get("vector")
+        except Exception as e:
+            logger.error(f"Error getting vector from {self.url}: {e}")
+            return None
+
+    async def get_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Vectors for several texts in one call, falling back to parallel single calls without a batch endpoint."""
+        if self._batch_supported:
+            try:
+                response = await self.client.post(self.batch_url, json={"texts": texts})
+                if response.status_code in (404, 405, 422):
+                    logger.warning(f"{self.batch_url} does not accept batches ({response.status_code}), using single requests")
+                    self._batch_supported = False
+                else:
+                    response.raise_for_status()
+                    vectors = response.json().get("vectors") or []
+                    if len(vectors) == len(texts):
+                        return vectors
+                    logger.error(f"Batch embedding returned {len(vectors)} vectors for {len(texts)} texts")
+                    return [None] * len(texts)
+            except Exception as e:
+                logger.error(f"Error getting vectors from {self.batch_url}: {e}")
+                return [None] * len(texts)
+
+        return list(await asyncio.gather(*(self.get_embedding(text) for text in texts)))
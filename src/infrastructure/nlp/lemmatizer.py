@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import re
+from concurrent.futures import Executor
+from typing import Callable, List
+from src.infrastructure.cache.ttl_cache import TTLCache
+from src.infrastructure.concurrency.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+def lemmatizer_key(text: str) -> str:
+    """Lowercased text without punctuation and extra whitespace: what Mystem actually sees."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+class AsyncLemmatizer:
+    """
+    Async front-end of a blocking batch lemmatizer (TextsTokenizer).
+
+    Results are kept in an LRU keyed by lemmatizer_key(). Concurrent misses are
+    coalesced into one call of lemmatize_batch, which runs on the given executor
+    (one Mystem process lemmatizes newline-joined texts in a single round-trip).
+    """
+
+    def __init__(
+        self,
+        lemmatize_batch: Callable[[List[str]], List[List[str]]],
+        executor: Executor,
+        window: float = 0.002,
+        max_batch: int = 64,
+        cache_size: int = 10000,
+    ):
+        self.lemmatize_batch = lemmatize_batch
+        self.executor = executor
+        self.cache = TTLCache(ttl=float("inf"), max_entries=cache_size)
+        self._batcher = MicroBatcher(self._run_batch, window=window, max_batch=max_batch)
+
+    async def warmup(self) -> None:
+        """Start the lemmatizer process ahead of the first query."""
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self.lemmatize_batch, [""])
+        except Exception as e:
+            logger.warning(f"Lemmatizer warm-up failed: {e}")
+
+    async def lemmatize(self, text: str) -> str:
+        """Space-separated lemmas of text; the raw text if lemmatization fails."""
+        key = lemmatizer_key(text)
+        if not key:
+            return key
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            lemmatized = await self._batcher.submit(key)
+        except Exception as e:
+            # Not cached: the next call of this query asks Mystem again
+            logger.warning(f"Lemmatization failed, using raw query: {e}")
+            return text
+        self.cache.set(key, lemmatized)
+        return lemmatized
+
+    async def _run_batch(self, keys: List[str]) -> List[str]:
+        lemmas = await asyncio.get_running_loop().run_in_executor(self.executor, self.lemmatize_batch, keys)
+        if len(lemmas) != len(keys):
+            raise RuntimeError(f"Lemmatizer returned {len(lemmas)} results for {len(keys)} texts")
+        return [" ".join(tokens) for tokens in lemmas]
+
+    def stats(self) -> dict:
+        return {"cache": self.cache.stats(), "batching": self._batcher.stats()}
+
+    async def shutdown(self) -> None:
+        await self._batcher.shutdown()
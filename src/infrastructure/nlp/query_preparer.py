@@ -0,0 +1,34 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import List, Optional, Tuple
+from src.infrastructure.cache.embedding_cache import IEmbeddingClient
+from src.infrastructure.nlp.lemmatizer import AsyncLemmatizer
+
+class QueryPreparer:
+    """Lemmatized form and embedding of a search query, computed concurrently."""
+
+    def __init__(self, lemmatizer: AsyncLemmatizer, embeddings: IEmbeddingClient, executor: Optional[Executor] = None):
+        self.lemmatizer = lemmatizer
+        self.embeddings = embeddings
+        # Executor the lemmatizer runs on; owned by the preparer and shut down with it
+        self.executor = executor
+
+    async def startup(self) -> None:
+        await self.lemmatizer.warmup()
+
+    async def prepare(self, query: str, embed: bool = True) -> Tuple[str, Optional[List[float]]]:
+        """Lemmatized query and its embedding; without embed (keyword-only search) the embedding is None."""
+        if not embed:
+            return await self.lemmatizer.lemmatize(query), None
+        lemmatized, vector = await asyncio.gather(
+            self.lemmatizer.lemmatize(query),
+            self.embeddings.get_embedding(query),
+        )
+        return lemmatized, vector
+
+    async def shutdown(self) -> None:
+        await self.lemmatizer.shutdown()
+        if hasattr(self.embeddings, "shutdown"):
+            await self.embeddings.shutdown()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
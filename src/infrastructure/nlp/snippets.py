@@ -0,0 +1,186 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+from src.config.settings import settings
+
+# Query-aware snippets of project texts.
+#
+# Query words are reduced to stems by stripping common Russian endings, and a
+# text word matches when it starts with a stem, so inflected forms in the text
+# ("сайта", "сайтов") match the query ("сайт") without lemmatizing the text.
+# Stems are found with str.find in the lowercased text, a sliding window over
+# the sentences picks the passage that covers the most distinct query terms
+# within the length budget: everything is linear in the text length, and
+# Python-level work is per match and per sentence, not per character.
+
+ELLIPSIS = "…"
+_WORD = re.compile(r"\w+")
+# A sentence ends at . ! ? … followed by whitespace, or at a line break; a single
+# character class first lets the regex engine skip ahead quickly
+_SENTENCE_END = re.compile(r"[.!?…\n][\"»)]*\s*")
+_WORD_TAIL = re.compile(r"\w*")
+_SENTENCE_STOPS = (".", "!", "?", ELLIPSIS)
+_ENDINGS = sorted(
+    "иями ями ами его ого ему ому ыми ими ией ах ях ов ев ей ий ый ой ая яя ое ее ую юю ом ем ам ям ие ые "
+    "ию ья ье а я о е ы и у ю ь й".split(),
+    key=len,
+    reverse=True,
+)
+_STOP_WORDS = frozenset("для или при под над без про как что это все так его она они the and for with".split())
+STEM_LENGTH = 6
+MIN_STEM = 3
+
+def stem(word: str) -> str:
+    """Crude stem of a word: lowercased, ё as е, one common ending stripped, at most STEM_LENGTH letters."""
+    word = word.lower().replace("ё", "е")
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            word = word[:-len(ending)]
+            break
+    return word[:STEM_LENGTH]
+
+@lru_cache(maxsize=1024)
+def query_stems(query: str) -> Tuple[str, ...]:
+    """Distinct stems of the query words, longest first; stop words, numbers and short words are skipped."""
+    stems = []
+    for word in _WORD.findall(query):
+        if word.isdigit() or word.lower() in _STOP_WORDS:
+            continue
+        s = stem(word)
+        if len(s) >= MIN_STEM and s not in stems:
+            stems.append(s)
+    return tuple(sorted(stems, key=len, reverse=True))
+
+def sentence_offsets(text: str) -> List[int]:
+    """Start offsets of the sentences of text, the first one is 0."""
+    size = len(text)
+    return [0] + [
+        m.end() for m in _SENTENCE_END.finditer(text)
+        if m.end() < size and text[m.end() - 1].isspace()
+    ]
+
+def find_terms(text: str, stems: Sequence[str]) -> List[Tuple[int, int, int]]:
+    """(start, end, stem number) of the words of text starting with one of stems, in text order."""
+    low = text.lower().replace("ё", "е")
+    if len(low) != len(text):
+        # A few characters lowercase to several; offsets would drift
+        low = text
+    found = {}
+    for term, s in enumerate(stems):
+        i = low.find(s)
+        while i >= 0:
+            # Word starts only; a longer stem (earlier in stems) keeps its match
+            if (i == 0 or not low[i - 1].isalnum()) and i not in found:
+                found[i] = (i, _WORD_TAIL.match(low, i + len(s)).end(), term)
+            i = low.find(s, i + len(s))
+    return sorted(found.values())
+
+def extract_snippet(
+    text: str,
+    query: str,
+    length: int = 200,
+    offsets: Optional[Sequence[int]] = None,
+    highlight: bool = True,
+) -> str:
+    """
+    Passage of text of about length characters that best matches the query, matched words in **bold**.
+    offsets are the precomputed sentence_offsets(text). Without a match the text's beginning is returned.
+    """
+    if not text:
+        return ""
+    stems = query_stems(query) if query else ()
+    matches = find_terms(text, stems) if stems else []
+    if not matches:
+        return _flatten(_lead(text, length))
+
+    if len(text) <= length:
+        start = 0
+    else:
+        if offsets is None:
+            offsets = sentence_offsets(text)
+        start, end = _best_window(text, offsets, matches, length)
+        if end - start > length:
+            # A single long sentence: keep the part around its first match
+            first = next(m[0] for m in matches if m[0] >= start)
+            start = _word_start(text, max(start, first - length // 3))
+    # Fill the budget with the text that follows
+    end = _word_end(text, start, min(len(text), start + length))
+
+    parts = [ELLIPSIS] if start > 0 else []
+    position = start
+    if highlight:
+        for match_start, match_end, _ in matches:
+            if match_start < start or match_end > end:
+                continue
+            parts += (text[position:match_start], "**", text[match_start:match_end], "**")
+            position = match_end
+    parts.append(text[position:end].rstrip())
+    # No ellipsis after a finished sentence
+    if end < len(text) and not text[start:end].rstrip().endswith(_SENTENCE_STOPS):
+        parts.append(ELLIPSIS)
+    return _flatten("".join(parts))
+
+def _best_window(text: str, offsets: Sequence[int], matches: List[Tuple[int, int, int]], length: int) -> Tuple[int, int]:
+    """Character range of the run of whole sentences within length with the most distinct terms, then matches."""
+    count = len(offsets)
+    bounds = list(offsets) + [len(text)]
+    # Term ids of the matches of every sentence (matches and offsets are both ascending)
+    terms: List[List[int]] = [[] for _ in range(count)]
+    sentence = 0
+    for match_start, _, term in matches:
+        while sentence + 1 < count and bounds[sentence + 1] <= match_start:
+            sentence += 1
+        terms[sentence].append(term)
+
+    seen = {}
+    total = 0
+    best_score = None
+    best = (0, 1)
+    left = 0
+    for right in range(count):
+        for term in terms[right]:
+            seen[term] = seen.get(term, 0) + 1
+        total += len(terms[right])
+        # Shrink from the left while the window is too long, but keep at least one sentence
+        while left < right and bounds[right + 1] - bounds[left] > length:
+            for term in terms[left]:
+                seen[term] -= 1
+                if not seen[term]:
+                    del seen[term]
+            total -= len(terms[left])
+            left += 1
+        # Ties go to the earliest window
+        score = (len(seen), total, -left)
+        if best_score is None or score > best_score:
+            best_score = score
+            best = (left, right + 1)
+    left, right = best
+    # Start at the first sentence with a match; the budget is filled from there
+    while not terms[left]:
+        left += 1
+    return bounds[left], bounds[right]
+
+def _lead(text: str, length: int) -> str:
+    end = _word_end(text, 0, min(len(text), length))
+    return text[:end].rstrip() + (ELLIPSIS if end < len(text) else "")
+
+def _word_start(text: str, position: int) -> int:
+    """position moved forward to the start of a word (unless that is too far)."""
+    if position <= 0 or not text[position - 1].isalnum():
+        return position
+    space = text.find(" ", position, position + 30)
+    return space + 1 if space >= 0 else position
+
+def _word_end(text: str, start: int, end: int) -> int:
+    """end moved back to the end of a word (unless that would cut most of the text)."""
+    if end >= len(text) or not text[end].isalnum():
+        return end
+    space = text.rfind(" ", start + (end - start) // 2, end)
+    return space if space > 0 else end
+
+def _flatten(snippet: str) -> str:
+    return " ".join(snippet.split()) if "\n" in snippet else snippet
+
+def project_snippet(text: str, query: str, offsets: Optional[Sequence[int]] = None) -> str:
+    """Description of a project hit with the configured SNIPPET_LENGTH / SNIPPET_HIGHLIGHT."""
+    return extract_snippet(text, query, settings.SNIPPET_LENGTH, offsets, settings.SNIPPET_HIGHLIGHT)
@@ -0,0 +1,157 @@
+import json
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, TextIO
+
+_current: ContextVar[Optional["Span"]] = ContextVar("span", default=None)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "sampled", "attributes", "start", "duration", "status", "_started", "_token", "_tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        if parent is None:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            self.parent_id = None
+            self.sampled = random.random() < tracer.sample_rate
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.sampled = parent.sampled
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.status = "ok"
+        self.duration = 0.0
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        """W3C Trace Context header value identifying this span."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def __enter__(self) -> "Span":
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self._started
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.status = exc_type.__name__
+        if self.sampled:
+            self._tracer.exporter.export(self)
+        return False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled: costs one attribute lookup per span."""
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class JsonLinesExporter:
+    """Writes one JSON object per finished span to a text stream (stderr, stdout or an append-mode file)."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        # Spans may finish on executor threads (e.g. Mystem); keep lines whole
+        self._lock = threading.Lock()
+
+    @classmethod
+    def to_file(cls, path: str) -> "JsonLinesExporter":
+        return cls(open(path, "a", encoding="utf-8", buffering=1))
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.as_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+
+    def close(self) -> None:
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+class Tracer:
+    """
+    Request-scoped spans propagated through contextvars: a span started inside
+    another one (in the same task or a task it spawned) becomes its child.
+    The sampling decision is taken once per trace, at the root span; unsampled
+    spans still carry ids so the trace id can be passed on to the gateway.
+    """
+
+    def __init__(self, exporter: Optional[JsonLinesExporter] = None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, **attributes: Any):
+        if self.exporter is None:
+            return _NOOP
+        return Span(self, name, _current.get(), attributes)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer configured from settings on first use."""
+    global _tracer
+    if _tracer is None:
+        from src.config.settings import settings
+
+        exporter = None
+        if settings.TRACING_ENABLED:
+            if settings.TRACING_EXPORTER == "file":
+                exporter = JsonLinesExporter.to_file(settings.TRACING_FILE)
+            elif settings.TRACING_EXPORTER == "stdout":
+                exporter = JsonLinesExporter(sys.stdout)
+            else:
+                exporter = JsonLinesExporter(sys.stderr)
+        _tracer = Tracer(exporter, settings.TRACING_SAMPLE_RATE)
+    return _tracer
+
+
+def span(name: str, **attributes: Any):
+    """Context manager timing a span of the current trace (a no-op while tracing is disabled)."""
+    return get_tracer().span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
@@ -0,0 +1,259 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Session registry and message relay shared by the workers of the SSE server.
+#
+# A small in-memory stand-in for Redis: one asyncio process holding keys and
+# pub/sub channels, spoken to over a Unix socket (workers of one host) or TCP
+# (several hosts) with one JSON object per line. Keys live as long as the
+# connection that set them, so the sessions of a crashed worker disappear with
+# it. Nothing is authenticated: the socket must only be reachable by the workers.
+
+# Forwarded client messages travel as single lines
+LINE_LIMIT = 16 * 1024 * 1024
+
+class BrokerError(Exception):
+    """The broker is unreachable or the connection to it was lost."""
+
+def parse_url(url: str) -> Tuple[str, str, Optional[int]]:
+    """("unix", path, None) for unix:///path, ("tcp", host, port) for tcp://host:port."""
+    parsed = urlparse(url)
+    if parsed.scheme == "unix" and parsed.path:
+        return "unix", parsed.path, None
+    if parsed.scheme == "tcp" and parsed.hostname and parsed.port:
+        return "tcp", parsed.hostname, parsed.port
+    raise ValueError(f"Unsupported broker URL {url!r}, expected unix:///path/to.sock or tcp://host:port")
+
+async def open_connection(url: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    kind, address, port = parse_url(url)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(address, limit=LINE_LIMIT)
+    return await asyncio.open_connection(address, port, limit=LINE_LIMIT)
+
+def _line(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class _Peer:
+    __slots__ = ("writer", "keys", "channels")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.keys: Set[str] = set()
+        self.channels: Set[str] = set()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        # Whole lines only, so replies and channel messages never interleave
+        if not self.writer.is_closing():
+            self.writer.write(_line(message))
+
+
+class BrokerServer:
+    """
+    Keys and pub/sub channels in memory, for the BrokerClients of the workers.
+
+    Requests are {"id", "op", ...} lines answered by {"id", ...}:
+    set (key, value), get (key) -> value, delete (key),
+    publish (channel, data) -> receivers, subscribe (channel).
+    Messages of subscribed channels arrive as {"channel", "data"} lines.
+    """
+
+    def __init__(self):
+        # key -> (value, connection that set it)
+        self._keys: Dict[str, Tuple[Any, _Peer]] = {}
+        self._channels: Dict[str, Set[_Peer]] = {}
+
+    async def serve(self, url: str) -> asyncio.AbstractServer:
+        kind, address, port = parse_url(url)
+        if kind == "tcp":
+            return await asyncio.start_server(self.handle, address, port, limit=LINE_LIMIT)
+        if os.path.exists(address):
+            # Left over by a broker that was killed
+            os.unlink(address)
+        server = await asyncio.start_unix_server(self.handle, address, limit=LINE_LIMIT)
+        os.chmod(address, 0o600)
+        return server
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = _Peer(writer)
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                try:
+                    reply = self._apply(peer, request)
+                except KeyError as e:
+                    reply = {"error": f"{request.get('op')!r} without {e}"}
+                peer.send({"id": request.get("id"), **reply})
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Dropping broker client: {e!r}")
+        finally:
+            self._forget(peer)
+            writer.close()
+
+    def _apply(self, peer: _Peer, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "get":
+            entry = self._keys.get(request["key"])
+            return {"value": entry[0] if entry else None}
+        if op == "set":
+            key = request["key"]
+            previous = self._keys.get(key)
+            if previous is not None:
+                previous[1].keys.discard(key)
+            self._keys[key] = (request["value"], peer)
+            peer.keys.add(key)
+            return {}
+        if op == "delete":
+            entry = self._keys.pop(request["key"], None)
+            if entry is not None:
+                entry[1].keys.discard(request["key"])
+            return {}
+        if op == "publish":
+            receivers = self._channels.get(request["channel"], ())
+            for receiver in receivers:
+                receiver.send({"channel": request["channel"], "data": request["data"]})
+            return {"receivers": len(receivers)}
+        if op == "subscribe":
+            self._channels.setdefault(request["channel"], set()).add(peer)
+            peer.channels.add(request["channel"])
+            return {}
+        return {"error": f"unknown op {op!r}"}
+
+    def _forget(self, peer: _Peer) -> None:
+        for key in peer.keys:
+            entry = self._keys.get(key)
+            if entry is not None and entry[1] is peer:
+                del self._keys[key]
+        for channel in peer.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(peer)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._keys), "channels": len(self._channels)}
+
+
+class BrokerClient:
+    """
+    Connection of one worker to a BrokerServer.
+
+    Requests may be issued concurrently; replies are matched by id. Messages of
+    subscribed channels are passed to on_message(channel, data) in the reading
+    task, so it must not block. If the connection is lost, pending requests fail
+    with BrokerError and the client reconnects in the background, restoring its
+    subscriptions and the keys it set.
+    """
+
+    def __init__(self, url: str, on_message: Callable[[str, Any], None], reconnect_delay: float = 1.0):
+        parse_url(url)
+        self.url = url
+        self._on_message = on_message
+        self._reconnect_delay = reconnect_delay
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._keys: Dict[str, Any] = {}
+        self._channels: Set[str] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, timeout: float = 10.0) -> None:
+        """Connect, keeping the connection up until close(); fails if the broker isn't reachable within timeout."""
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise BrokerError(f"Session broker at {self.url} is unreachable") from None
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def get(self, key: str) -> Any:
+        return (await self._request({"op": "get", "key": key})).get("value")
+
+    async def set(self, key: str, value: Any) -> None:
+        self._keys[key] = value
+        await self._request({"op": "set", "key": key, "value": value})
+
+    async def delete(self, key: str) -> None:
+        self._keys.pop(key, None)
+        await self._request({"op": "delete", "key": key})
+
+    async def publish(self, channel: str, data: Any) -> int:
+        """Number of connections the message was delivered to."""
+        return (await self._request({"op": "publish", "channel": channel, "data": data}))["receivers"]
+
+    async def subscribe(self, channel: str) -> None:
+        self._channels.add(channel)
+        await self._request({"op": "subscribe", "channel": channel})
+
+    async def _request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._connected.is_set():
+            raise BrokerError(f"Not connected to the session broker at {self.url}")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(_line({"id": request_id, **request}))
+            reply = await future
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in reply:
+            raise BrokerError(reply["error"])
+        return reply
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                reader, self._writer = await open_connection(self.url)
+            except OSError as e:
+                logger.warning(f"Session broker at {self.url} is unreachable: {e!r}")
+                await asyncio.sleep(self._reconnect_delay)
+                continue
+            try:
+                # What the broker forgot with the previous connection
+                for channel in self._channels:
+                    self._writer.write(_line({"id": None, "op": "subscribe", "channel": channel}))
+                for key, value in self._keys.items():
+                    self._writer.write(_line({"id": None, "op": "set", "key": key, "value": value}))
+                self._connected.set()
+                await self._read(reader)
+                logger.warning(f"Session broker at {self.url} closed the connection")
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"Lost the session broker at {self.url}: {e!r}")
+            finally:
+                self._connected.clear()
+                self._writer.close()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(BrokerError(f"Lost the session broker at {self.url}"))
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            message = json.loads(line)
+            if "channel" in message and "id" not in message:
+                self._on_message(message["channel"], message["data"])
+                continue
+            future = self._pending.get(message.get("id"))
+            if future is not None and not future.done():
+                future.set_result(message)
+
+async def run_broker(url: str) -> None:
+    server = await BrokerServer().serve(url)
+    logger.info(f"Session broker listening on {url}")
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,103 @@
+from typing import List
+import weaviate
+import weaviate.classes.init
+from src.domain.interfaces import IKnowledgeBase
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.config.settings import settings
+from src.infrastructure.nlp.query_preparer import QueryPreparer
+from src.infrastructure.nlp.snippets import project_snippet
+
+class AsyncWeaviateAdapter(IKnowledgeBase):
+    """
+    Direct hybrid search in Weaviate without blocking the event loop.
+
+    Uses the async Weaviate client; the query is lemmatized and embedded
+    concurrently by QueryPreparer (Mystem on its own thread, async embedding call).
+    """
+
+    def __init__(self, preparer: QueryPreparer):
+        self.client = weaviate.use_async_with_local(
+            host=settings.WEAVIATE_HOST,
+            port=settings.WEAVIATE_PORT,
+            grpc_port=settings.WEAVIATE_GRPC_PORT,
+            additional_config=weaviate.classes.init.AdditionalConfig(
+                timeout=weaviate.classes.init.Timeout(init=2, query=10, insert=30)
+            )
+        )
+        self.preparer = preparer
+
+    async def startup(self) -> None:
+        await self.client.connect()
+        await self.preparer.startup()
+
+    async def shutdown(self) -> None:
+        await self.client.close()
+        await self.preparer.shutdown()
+
+    async def _ready(self) -> bool:
+        if not self.client.is_connected():
+            await self.client.connect()
+        return await self.client.is_ready()
+
+    async def fetch_collection(self, name: str) -> List[dict]:
+        """All objects of a collection as property dicts with their "vector", for snapshot export."""
+        collection = self.client.collections.get(name)
+        records = []
+        async for obj in collection.iterator(include_vector=True):
+            record = dict(obj.properties)
+            vector = obj.vector
+            if isinstance(vector, dict):
+                # Named vectors: a single-vector collection stores it as "default"
+                vector = vector.get("default") or next(iter(vector.values()), None)
+            if vector:
+                record["vector"] = list(vector)
+            records.append(record)
+        return records
+
+    async def search_projects(self, query: str, limit: int = 3) -> List[ProjectEntity]:
+        if not await self._ready():
+            return []
+
+        l_query, vector = await self.preparer.prepare(query)
+        collection = self.client.collections.get("PortfolioProject")
+
+        response = await collection.query.hybrid(
+            query=l_query,
+            vector=vector,
+            limit=limit,
+            query_properties=["lemmatized_text", "lemmatized_title"],
+            alpha=settings.SEARCH_ALPHA
+        )
+
+        results = []
+        for obj in response.objects:
+            results.append(ProjectEntity(
+                title=obj.properties.get("title", "No Title"),
+                url=obj.properties.get("url"),
+                description=project_snippet(obj.properties.get("full_text") or "", l_query or query)
+            ))
+        return results
+
+    async def search_services(self, query: str, limit: int = 5) -> List[ServiceEntity]:
+        if not await self._ready():
+            return []
+
+        l_query, vector = await self.preparer.prepare(query)
+        collection = self.client.collections.get("PriceList")
+
+        response = await collection.query.hybrid(
+            query=l_query,
+            vector=vector,
+            limit=limit,
+            query_properties=["lemmatized_service", "lemmatized_description"],
+            alpha=settings.SEARCH_ALPHA
+        )
+
+        results = []
+        for obj in response.objects:
+            results.append(ServiceEntity(
+                name=obj.properties.get("service", ""),
+                price=float(obj.properties.get("price", 0.0)),
+                description=obj.properties.get("description", "")
+            ))
+        return results
@@ -0,0 +1,22 @@
+from mcp.types import RequestParams
+from src.config.settings import settings
+
+# "timeout" property added to the input schema of every tool
+TIMEOUT_PROPERTY = {
+    "type": "number",
+    "description": "Необязательный лимит времени на вызов, в секундах.",
+}
+
+def call_timeout(requested: float | None = None, meta: RequestParams.Meta | None = None) -> float:
+    """
+    Time budget of one tool call: the "timeout" tool argument, else "timeout"
+    in the request _meta, else TOOL_CALL_TIMEOUT; never above TOOL_CALL_MAX_TIMEOUT.
+    """
+    for value in (requested, getattr(meta, "timeout", None)):
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            continue
+        if seconds > 0:
+            return min(seconds, settings.TOOL_CALL_MAX_TIMEOUT)
+    return settings.TOOL_CALL_TIMEOUT
@@ -0,0 +1,140 @@
+"""
+Export the PortfolioProject and PriceList collections into a snapshot for KB_BACKEND=local.
+
+    python -m src.presentation.export_snapshot --source weaviate --out data/kb_snapshot
+    python -m src.presentation.export_snapshot --source gateway --limit 10000 --out data/kb_snapshot
+    python -m src.presentation.export_snapshot --source json --input data/knowledge_base.json --out data/kb_snapshot
+
+Weaviate exports properties and vectors as stored. The gateway only returns the
+display properties, so lemmatized properties are computed with Mystem and vectors
+with the transformers service (TRANSFORMERS_URL / TRANSFORMERS_BATCH_URL).
+Point LOCAL_KB_PATH at the output directory; the server memory-maps it at startup.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.config.container import container
+from src.config.settings import settings
+
+logger = logging.getLogger("export_snapshot")
+
+# (lemmatized property, source property) pairs filled in for gateway exports
+PROJECT_LEMMAS = (("lemmatized_title", "title"), ("lemmatized_text", "full_text"))
+PRICE_LEMMAS = (("lemmatized_service", "service"), ("lemmatized_description", "description"))
+
+EMBEDDING_BATCH = 32
+
+
+async def from_weaviate() -> Tuple[List[dict], List[dict]]:
+    from src.infrastructure.weaviate.weaviate_adapter import AsyncWeaviateAdapter
+
+    adapter = AsyncWeaviateAdapter(container.query_preparer)
+    await adapter.client.connect()
+    try:
+        return await adapter.fetch_collection("PortfolioProject"), await adapter.fetch_collection("PriceList")
+    finally:
+        await adapter.shutdown()
+
+
+async def from_gateway(limit: int) -> Tuple[List[dict], List[dict]]:
+    from src.infrastructure.api.search_gateway import SearchGatewayAdapter
+
+    gateway = SearchGatewayAdapter()
+    try:
+        projects = await gateway.fetch_collection("projects", limit)
+        prices = await gateway.fetch_collection("prices", limit)
+    except httpx.HTTPError as e:
+        # Before anything is written: the current snapshot stays in place
+        raise SystemExit(f"Export from the Search Gateway failed: {e!r}") from e
+    finally:
+        await gateway.shutdown()
+
+    for price in prices:
+        # Gateway price objects carry the description as full_text
+        price.setdefault("description", price.get("full_text"))
+    try:
+        await _lemmatize(projects, PROJECT_LEMMAS)
+        await _lemmatize(prices, PRICE_LEMMAS)
+    finally:
+        await container.query_preparer.shutdown()
+    await _embed(projects, ("title", "full_text"))
+    await _embed(prices, ("service", "description"))
+    return projects, prices
+
+
+def from_json(path: str) -> Tuple[List[dict], List[dict]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("projects", []), data.get("prices", [])
+
+
+async def _lemmatize(records: List[dict], fields) -> None:
+    lemmatizer = container.query_preparer.lemmatizer
+    jobs = [(record, target, source) for record in records for target, source in fields if not record.get(target)]
+    lemmas = await asyncio.gather(*(lemmatizer.lemmatize(record.get(source) or "") for record, _, source in jobs))
+    for (record, target, _), lemma in zip(jobs, lemmas):
+        record[target] = lemma
+
+
+async def _embed(records: List[dict], fields) -> None:
+    from src.infrastructure.nlp.embeddings import TransformersEmbeddingClient
+
+    # Not container.embeddings: document vectors must not fill the query embedding cache
+    client = TransformersEmbeddingClient(settings.TRANSFORMERS_URL, batch_url=settings.TRANSFORMERS_BATCH_URL)
+    missing = [r for r in records if not r.get("vector")]
+    try:
+        for start in range(0, len(missing), EMBEDDING_BATCH):
+            batch = missing[start:start + EMBEDDING_BATCH]
+            texts = [" ".join(str(r.get(f) or "") for f in fields) for r in batch]
+            for record, vector in zip(batch, await client.get_embeddings(texts)):
+                if vector:
+                    record["vector"] = vector
+    finally:
+        await client.shutdown()
+
+
+async def export(source: str, out: str, limit: int, input_path: Optional[str]) -> None:
+    from src.infrastructure.local.local_knowledge_base import LocalKnowledgeBase
+    from src.infrastructure.local.snapshot import write_snapshot
+
+    started = time.perf_counter()
+    if source == "weaviate":
+        projects, prices = await from_weaviate()
+    elif source == "gateway":
+        projects, prices = await from_gateway(limit)
+    else:
+        projects, prices = from_json(input_path or settings.LOCAL_KB_PATH)
+    if not projects and not prices:
+        raise SystemExit(f"Nothing exported from {source}")
+
+    project_index, price_index = LocalKnowledgeBase.build_indexes(projects, prices)
+    write_snapshot(out, projects, prices, project_index, price_index, source=source)
+    logger.info(
+        f"Snapshot written to {out}: {len(projects)} projects, {len(prices)} prices "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=("weaviate", "gateway", "json"), default="weaviate")
+    parser.add_argument("--out", default="data/kb_snapshot", help="snapshot directory (replaced atomically)")
+    parser.add_argument("--limit", type=int, default=10000, help="max objects per collection (gateway)")
+    parser.add_argument("--input", help="JSON copy to convert (json, default LOCAL_KB_PATH)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(export(args.source, args.out, args.limit, args.input))
+
+
+if __name__ == "__main__":
+    main()
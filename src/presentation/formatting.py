@@ -0,0 +1,398 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from src.config.settings import settings
+from src.domain.entities import BatchSearchItem, ProjectEntity, ServiceEntity
+
+# Result layout shared by the SSE and FastMCP servers.
+#
+# A renderer builds the whole result in one pass: parts are collected in a list
+# and joined once. With a size budget, hits are kept in rank order while each
+# can still show MIN_DESCRIPTION characters, and the descriptions then share
+# what is left: short ones stay whole, long ones are cut at a word boundary.
+
+FORMATS = ("text", "compact", "json")
+
+# "format" property added to the input schema of every tool
+FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": list(FORMATS),
+    "description": "Необязательный формат ответа: text (подробный), compact (короткий) или json.",
+}
+
+# Rough size of one token of Russian text for common LLM tokenizers
+CHARS_PER_TOKEN = 3
+MIN_DESCRIPTION = 80
+
+Entity = Union[ProjectEntity, ServiceEntity]
+
+# What the json format is built from
+JsonValue = Union[None, bool, int, float, str, List["JsonValue"], Dict[str, "JsonValue"]]
+JsonObject = Dict[str, JsonValue]
+
+class Rendered(NamedTuple):
+    text: str
+    # MCP structured content (json format only)
+    structured: Optional[JsonObject] = None
+
+# Hit of the text layouts: head + (label + description + end, if there is a description) + tail
+_Hit = Tuple[str, str, str, str, str]
+
+def _stale_notice(entities: Sequence[Entity]) -> str:
+    """Warning line for results served from the last good response during an outage."""
+    age = _stale_age(entities)
+    if age is None:
+        return ""
+    return f"(Search is temporarily unavailable: showing cached results from {_age(age)} ago)\n\n"
+
+def _stale_age(entities: Sequence[Entity]) -> Optional[float]:
+    ages = [e.stale_age for e in entities if e.stale_age is not None]
+    return max(ages) if ages else None
+
+def _age(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.0f} h"
+
+def _price(price: float) -> str:
+    return f"{price:.0f}" if float(price).is_integer() else f"{price:.2f}"
+
+def _cut(text: str, limit: int) -> str:
+    """text in at most limit characters, cut at a word boundary and marked with an ellipsis."""
+    if len(text) <= limit:
+        return text
+    if limit <= 1:
+        return ""
+    cut = text[:limit - 1]
+    space = cut.rfind(" ", limit // 2)
+    if space > 0:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+def _fit(fixed: Sequence[int], lengths: Sequence[int], budget: int) -> Tuple[int, List[int]]:
+    """
+    How many hits fit in budget characters and how long each description may be.
+    fixed are the sizes of the hits without their descriptions, lengths the description sizes.
+    At least one hit is always kept.
+    """
+    count = 0
+    used = 0
+    reserved = 0
+    for size, length in zip(fixed, lengths):
+        need = size + min(length, MIN_DESCRIPTION)
+        if count and reserved + need > budget:
+            break
+        reserved += need
+        used += size
+        count += 1
+
+    # Water-filling: the shortest descriptions are kept whole, the rest share what is left equally
+    left = max(0, budget - used)
+    kept = lengths[:count]
+    cap = max(kept, default=0)
+    for i, length in enumerate(sorted(kept)):
+        share = left // (count - i)
+        if length > share:
+            cap = share
+            break
+        left -= length
+    return count, [min(length, cap) for length in kept]
+
+class Renderer(ABC):
+    """Renders search results within max_chars characters (None - no limit)."""
+
+    def __init__(self, max_chars: Optional[int] = None):
+        self.max_chars = max_chars
+
+    def projects(self, query: str, projects: List[ProjectEntity]) -> Rendered:
+        return self._rendered(self._section("projects", query, projects, self.max_chars))
+
+    def services(self, query: str, services: List[ServiceEntity]) -> Rendered:
+        return self._rendered(self._section("services", query, services, self.max_chars))
+
+    def everything(self, item: BatchSearchItem) -> Rendered:
+        return self._rendered(self._everything(item, self.max_chars))
+
+    @abstractmethod
+    def batch(self, items: List[BatchSearchItem]) -> Rendered:
+        """All items of a batch search, sharing the budget."""
+
+    @abstractmethod
+    def partial(self, item: BatchSearchItem, source: str) -> Rendered:
+        """One finished search of an item, sent as a progress update."""
+
+    @abstractmethod
+    def _section(self, kind: str, query: str, entities: Sequence[Entity], budget: Optional[int]) -> Union[str, JsonObject]:
+        """Results of one source in the renderer's own form, for _rendered."""
+
+    @abstractmethod
+    def _everything(self, item: BatchSearchItem, budget: Optional[int]) -> Union[str, JsonObject]:
+        """Results of both sources of an item, for _rendered."""
+
+    @abstractmethod
+    def _rendered(self, result: Union[str, JsonObject]) -> Rendered:
+        """The result of _section or _everything as returned to the client."""
+
+    @staticmethod
+    def _share(budget: Optional[int], used: int, parts_left: int) -> Optional[int]:
+        # What earlier parts left unused goes to the later ones
+        return None if budget is None else max(0, budget - used) // parts_left
+
+class TextRenderer(Renderer):
+    """The verbose layout the tools have always returned."""
+
+    def batch(self, items: List[BatchSearchItem]) -> Rendered:
+        if not items:
+            return Rendered("No queries given.")
+        # Every level appends to the same list: the result is joined exactly once
+        parts: List[str] = []
+        used = 0
+        for i, item in enumerate(items):
+            header = self._query_header(item.query)
+            parts.append(header)
+            mark = len(parts)
+            self._add_everything(parts, item, self._share(self.max_chars, used + len(header), len(items) - i))
+            if self.max_chars is not None:
+                used += len(header) + _size(parts, mark)
+        return Rendered("".join(parts))
+
+    def partial(self, item: BatchSearchItem, source: str) -> Rendered:
+        if source in item.errors:
+            return Rendered(f"[{item.query}] Error searching {source}: {item.errors[source]}")
+        entities = (item.projects if source == "projects" else item.services) or []
+        return Rendered(self._section(source, item.query, entities, self.max_chars))
+
+    def _rendered(self, text: str) -> Rendered:
+        return Rendered(text)
+
+    def _section(self, kind: str, query: str, entities: Sequence[Entity], budget: Optional[int]) -> str:
+        parts: List[str] = []
+        self._add_section(parts, kind, query, entities, budget)
+        return "".join(parts)
+
+    def _everything(self, item: BatchSearchItem, budget: Optional[int]) -> str:
+        parts: List[str] = []
+        self._add_everything(parts, item, budget)
+        return "".join(parts)
+
+    def _add_everything(self, parts: List[str], item: BatchSearchItem, budget: Optional[int]) -> None:
+        errors = {kind: self._error(kind, message) for kind, message in item.errors.items()}
+        listed = [kind for kind in ("projects", "services") if getattr(item, kind) is not None]
+        used = sum(len(error) for error in errors.values())
+        separator = self._separator()
+        done = 0
+        for kind in ("projects", "services"):
+            entities = getattr(item, kind)
+            if entities is not None:
+                mark = len(parts)
+                share = self._share(budget, used + len(separator), len(listed) - done)
+                self._add_section(parts, kind, item.query, entities, share)
+                _strip_newlines(parts, mark)
+                parts.append(separator)
+                if budget is not None:
+                    used += _size(parts, mark)
+                done += 1
+            if kind in errors:
+                parts.append(errors[kind])
+
+    def _add_section(self, parts: List[str], kind: str, query: str, entities: Sequence[Entity], budget: Optional[int]) -> None:
+        if not entities:
+            parts.append(self._empty(kind))
+            return
+        header = self._header(kind, query)
+        stale = self._stale(entities)
+        hits = [self._hit(kind, entity, i) for i, entity in enumerate(entities, 1)]
+        count, limits = len(hits), None
+        if budget is not None:
+            count, limits = self._plan(hits, budget - len(header) - len(stale))
+
+        parts += (header, stale)
+        for i in range(count):
+            head, label, description, end, tail = hits[i]
+            if limits is not None:
+                description = _cut(description, limits[i])
+            if description:
+                parts += (head, label, description, end, tail)
+            else:
+                parts += (head, tail)
+        if count < len(hits):
+            parts.append(self._omitted(len(hits) - count))
+
+    def _plan(self, hits: List[_Hit], budget: int) -> Tuple[int, List[int]]:
+        fixed = [len(head) + len(label) + len(end) + len(tail) for head, label, _, end, tail in hits]
+        lengths = [len(description) for _, _, description, _, _ in hits]
+        count, limits = _fit(fixed, lengths, budget)
+        if count < len(hits):
+            # Make room for the "more results" line
+            count, limits = _fit(fixed, lengths, budget - len(self._omitted(len(hits) - count)))
+        return count, limits
+
+    # Layout
+
+    def _header(self, kind: str, query: str) -> str:
+        return f"{'Projects' if kind == 'projects' else 'Services'} found for '{query}':\n\n"
+
+    def _empty(self, kind: str) -> str:
+        return f"No {kind} found."
+
+    def _hit(self, kind: str, entity: Entity, index: int) -> _Hit:
+        if kind == "projects":
+            url = f"  URL: {entity.url}\n" if entity.url else ""
+            return f"- PROJECT: {entity.title}\n{url}", "  INFO: ", entity.description, "\n", "\n"
+        return f"- SERVICE: {entity.name}\n  PRICE: {entity.price} RUB\n", "  NOTE: ", entity.description or "", "\n", "\n"
+
+    def _stale(self, entities: Sequence[Entity]) -> str:
+        return _stale_notice(entities)
+
+    def _omitted(self, count: int) -> str:
+        return f"(+{count} more not shown)\n\n"
+
+    def _error(self, kind: str, message: str) -> str:
+        return f"Error searching {kind}: {message}\n\n"
+
+    def _separator(self) -> str:
+        return "\n\n"
+
+    def _query_header(self, query: str) -> str:
+        return f"=== QUERY: {query} ===\n"
+
+class CompactRenderer(TextRenderer):
+    """One line per hit, without labels: the same information in fewer tokens."""
+
+    def _header(self, kind: str, query: str) -> str:
+        return f"{'Projects' if kind == 'projects' else 'Services'} for '{query}':\n"
+
+    def _hit(self, kind: str, entity: Entity, index: int) -> _Hit:
+        if kind == "projects":
+            url = f" <{entity.url}>" if entity.url else ""
+            return f"{index}. {entity.title}{url}", ": ", entity.description, "", "\n"
+        return f"{index}. {entity.name}, {_price(entity.price)} RUB", ": ", entity.description or "", "", "\n"
+
+    def _stale(self, entities: Sequence[Entity]) -> str:
+        age = _stale_age(entities)
+        return "" if age is None else f"(search unavailable, cached {_age(age)} ago)\n"
+
+    def _omitted(self, count: int) -> str:
+        return f"(+{count} more)\n"
+
+    def _error(self, kind: str, message: str) -> str:
+        return f"{kind}: error: {message}\n"
+
+    def _separator(self) -> str:
+        return "\n"
+
+    def _query_header(self, query: str) -> str:
+        return f"## {query}\n"
+
+class JsonRenderer(Renderer):
+    """Compact JSON text, also returned as MCP structured content. The size budget is approximate."""
+
+    def batch(self, items: List[BatchSearchItem]) -> Rendered:
+        results = []
+        used = len('{"results":[]}')
+        for i, item in enumerate(items):
+            share = self._share(self.max_chars, used, len(items) - i)
+            obj = self._everything(item, share)
+            results.append(obj)
+            used += len(_dumps(obj)) + 1
+        return self._rendered({"results": results})
+
+    def partial(self, item: BatchSearchItem, source: str) -> Rendered:
+        if source in item.errors:
+            return self._rendered({"query": item.query, "errors": {source: item.errors[source]}})
+        entities = (item.projects if source == "projects" else item.services) or []
+        return self._rendered(self._section(source, item.query, entities, self.max_chars))
+
+    def _rendered(self, obj: JsonObject) -> Rendered:
+        return Rendered(_dumps(obj), obj)
+
+    def _everything(self, item: BatchSearchItem, budget: Optional[int]) -> JsonObject:
+        obj: JsonObject = {"query": item.query}
+        if item.errors:
+            obj["errors"] = dict(item.errors)
+        used = len(_dumps(obj))
+        listed = [kind for kind in ("projects", "services") if getattr(item, kind) is not None]
+        for done, kind in enumerate(listed):
+            section = self._section(kind, item.query, getattr(item, kind), self._share(budget, used, len(listed) - done))
+            section.pop("query")
+            obj.update(section)
+            used += len(_dumps(section))
+        return obj
+
+    def _section(self, kind: str, query: str, entities: Sequence[Entity], budget: Optional[int]) -> JsonObject:
+        hits = [self._hit(kind, entity) for entity in entities]
+        obj: JsonObject = {"query": query, kind: hits}
+        age = _stale_age(entities)
+        if age is not None:
+            obj["stale_age"] = round(age)
+        if budget is None or not hits:
+            return obj
+
+        budget -= len(_dumps(obj)) - len(_dumps(hits)) + len(',"more":00')
+        descriptions = [hit.pop("description") for hit in hits]
+        # Separating comma + the empty "description" member
+        fixed = [len(_dumps(hit)) + len(',"description":""') + 1 for hit in hits]
+        count, limits = _fit(fixed, [len(d) for d in descriptions], budget)
+        for hit, description, limit in zip(hits, descriptions, limits):
+            hit["description"] = _cut(description, limit)
+        if count < len(hits):
+            obj[kind] = hits[:count]
+            obj["more"] = len(hits) - count
+        return obj
+
+    @staticmethod
+    def _hit(kind: str, entity: Entity) -> JsonObject:
+        if kind == "projects":
+            hit = {"title": entity.title, "url": entity.url, "description": entity.description}
+        else:
+            hit = {"name": entity.name, "price": entity.price, "description": entity.description or ""}
+        return {k: v for k, v in hit.items() if v is not None}
+
+def _size(parts: List[str], start: int) -> int:
+    return sum(len(part) for part in parts[start:])
+
+def _strip_newlines(parts: List[str], start: int) -> None:
+    """rstrip("\n") of the text parts[start:] would make, without building it."""
+    while len(parts) > start:
+        part = parts[-1].rstrip("\n")
+        if part:
+            parts[-1] = part
+            return
+        parts.pop()
+
+def _dumps(obj: JsonValue) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+_RENDERERS = {"text": TextRenderer, "compact": CompactRenderer, "json": JsonRenderer}
+_cache: Dict[Optional[str], Renderer] = {}
+
+def max_chars() -> Optional[int]:
+    """Result size budget from RESULT_MAX_CHARS / RESULT_MAX_TOKENS; None if neither is set."""
+    limits = [settings.RESULT_MAX_CHARS, settings.RESULT_MAX_TOKENS * CHARS_PER_TOKEN]
+    limits = [limit for limit in limits if limit > 0]
+    return min(limits) if limits else None
+
+def get_renderer(format: Optional[str] = None) -> Renderer:
+    """Renderer of the requested format (RESULT_FORMAT if None) with the configured size budget."""
+    format = format or settings.RESULT_FORMAT
+    if format not in _RENDERERS:
+        raise ValueError(f"Unknown result format: {format} (expected one of {', '.join(FORMATS)})")
+    renderer = _cache.get(format)
+    if renderer is None:
+        renderer = _cache[format] = _RENDERERS[format](max_chars())
+    return renderer
+
+# The verbose text layout without a size limit
+
+_TEXT = TextRenderer()
+
+def format_projects(query: str, projects: List[ProjectEntity]) -> str:
+    return _TEXT.projects(query, projects).text
+
+def format_services(query: str, services: List[ServiceEntity]) -> str:
+    return _TEXT.services(query, services).text
+
+def format_batch(items: List[BatchSearchItem]) -> str:
+    return _TEXT.batch(items).text
@@ -1,18 +1,50 @@
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import CallToolResult, TextContent
 import sys
 import os
 import asyncio
+import logging
+from typing import Literal
 
 # Add project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.application.use_cases import ResultCallback
 from src.config.container import container
+from src.config.settings import settings
+from src.domain.deadline import deadline
+from src.domain.entities import BatchSearchItem
+from src.infrastructure.observability.tracing import span
+from src.presentation.deadlines import call_timeout
+from src.presentation.formatting import Rendered, Renderer, get_renderer
 
 # Initialize MCP Server
-mcp = FastMCP("Weaviate Knowledge Base")
+mcp = FastMCP("Weaviate Knowledge Base", lifespan=container.lifespan)
+
+Format = Literal["text", "compact", "json"]
+
+def _progress_callback(ctx: Context, renderer: Renderer, total: int) -> ResultCallback:
+    """Report every finished sub-search to the client as a progress update."""
+    done = 0
+
+    async def report(item: BatchSearchItem, source: str) -> None:
+        nonlocal done
+        done += 1
+        # No-op when the client did not send a progressToken
+        await ctx.report_progress(done, total, message=renderer.partial(item, source).text)
+
+    return report
+
+def _result(rendered: Rendered) -> CallToolResult:
+    """Tool result: the text, plus structured content when the format has one (format="json")."""
+    return CallToolResult(content=[TextContent(type="text", text=rendered.text)], structuredContent=rendered.structured)
+
+def _deadline(ctx: Context, timeout: float | None):
+    """Time budget of the call, shared by every search down to the gateway request."""
+    return deadline(call_timeout(timeout, ctx.request_context.meta))
 
 @mcp.tool()
-async def search_projects(query: str) -> str:
+async def search_projects(query: str, ctx: Context, timeout: float | None = None, format: Format | None = None) -> CallToolResult:
     """
     Поиск реализованных проектов и кейсов в портфолио. 
     Используй этот инструмент, когда пользователь спрашивает:
@@ -22,43 +54,90 @@ async def search_projects(query: str) -> str:
     
     Args:
         query: Тематика или тип проекта (например: "интернет-магазин одежды", "медицинский центр").
+        timeout: Необязательный лимит времени на вызов, в секундах.
+        format: Необязательный формат ответа: text (подробный), compact (короткий) или json.
     """
-    projects = await container.search_use_case.search_projects(query)
-    
-    if not projects:
-        return "No projects found."
-
-    result = f"Projects found for '{query}':\n\n"
-    for p in projects:
-        result += f"- PROJECT: {p.title}\n"
-        if p.url:
-            result += f"  URL: {p.url}\n"
-        result += f"  INFO: {p.description}\n\n"
-    
-    return result
+    with _deadline(ctx, timeout), span("tool", tool="search_projects"):
+        with span("use_case"):
+            projects = await container.search_use_case.search_projects(query)
+        with span("render"):
+            return _result(get_renderer(format).projects(query, projects))
 
 @mcp.tool()
-async def search_prices(query: str) -> str:
+async def search_prices(query: str, ctx: Context, timeout: float | None = None, format: Format | None = None) -> CallToolResult:
     """
     Поиск стоимости услуг и работ в прайс-листе.
     Используй этот инструмент для ответов на вопросы о бюджете, тарифах и ценах.
     
     Args:
         query: Название услуги (например: "хостинг", "разработка дизайна", "интеграция с 1С").
+        timeout: Необязательный лимит времени на вызов, в секундах.
+        format: Необязательный формат ответа: text (подробный), compact (короткий) или json.
+    """
+    with _deadline(ctx, timeout), span("tool", tool="search_prices"):
+        with span("use_case"):
+            services = await container.search_use_case.search_services(query)
+        with span("render"):
+            return _result(get_renderer(format).services(query, services))
+
+@mcp.tool()
+async def search_everything(query: str, ctx: Context, timeout: float | None = None, format: Format | None = None) -> CallToolResult:
     """
-    services = await container.search_use_case.search_services(query)
+    Одновременный поиск по портфолио и по прайс-листу.
+    Используй, когда вопрос касается и примеров работ, и стоимости
+    (например: "сколько стоит сайт для клиники, как у вас в портфолио?").
 
-    if not services:
-        return "No services found."
+    Args:
+        query: Тематика проекта или название услуги (например: "сайт медицинского центра").
+        timeout: Необязательный лимит времени на вызов, в секундах.
+        format: Необязательный формат ответа: text (подробный), compact (короткий) или json.
+    """
+    renderer = get_renderer(format)
+    with _deadline(ctx, timeout), span("tool", tool="search_everything"):
+        with span("use_case"):
+            item = await container.search_use_case.search_everything(query, on_result=_progress_callback(ctx, renderer, total=2))
+        with span("render"):
+            return _result(renderer.everything(item))
 
-    result = f"Services found for '{query}':\n\n"
-    for s in services:
-        result += f"- SERVICE: {s.name}\n  PRICE: {s.price} RUB\n"
-        if s.description:
-            result += f"  NOTE: {s.description}\n"
-        result += "\n"
-        
-    return result
+@mcp.tool()
+async def batch_search(
+    queries: list[str],
+    ctx: Context,
+    sources: list[Literal["projects", "prices"]] | None = None,
+    timeout: float | None = None,
+    format: Format | None = None,
+) -> CallToolResult:
+    """
+    Пакетный поиск: выполняет несколько запросов за один вызов (параллельно).
+    Используй вместо нескольких последовательных вызовов search_projects / search_prices,
+    когда нужно проверить сразу несколько тематик или услуг.
+
+    Args:
+        queries: Список поисковых запросов (например: ["интернет-магазин", "медицина", "хостинг"]).
+        sources: Где искать: "projects" (портфолио) и/или "prices" (прайс-лист). По умолчанию - в обоих.
+        timeout: Необязательный лимит времени на вызов, в секундах.
+        format: Необязательный формат ответа: text (подробный), compact (короткий) или json.
+    """
+    # The progress total counts the searches that actually run
+    queries = container.search_use_case.batch_queries(queries)
+    sources = sources or ["projects", "prices"]
+    include_projects = "projects" in sources
+    include_services = "prices" in sources
+    renderer = get_renderer(format)
+    with _deadline(ctx, timeout), span("tool", tool="batch_search"):
+        with span("use_case", queries=len(queries)):
+            items = await container.search_use_case.batch_search(
+                queries,
+                include_projects=include_projects,
+                include_services=include_services,
+                on_result=_progress_callback(ctx, renderer, total=len(queries) * (include_projects + include_services)),
+            )
+        with span("render"):
+            return _result(renderer.batch(items))
 
 if __name__ == "__main__":
+    if settings.TRACING_EXPORTER == "stdout":
+        # Spans on stdout would corrupt the JSON-RPC stream of the stdio transport
+        logging.getLogger(__name__).warning("TRACING_EXPORTER=stdout is not supported by the stdio server, exporting spans to stderr")
+        settings.TRACING_EXPORTER = "stderr"
     mcp.run()
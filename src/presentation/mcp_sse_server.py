@@ -1,13 +1,20 @@
+import asyncio
 import uvicorn
 import sys
 import os
 import logging
+import multiprocessing
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Optional
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
 from mcp.types import Tool, TextContent, EmbeddedResource, ImageContent
 from starlette.applications import Starlette
 from starlette.routing import Route, Mount
 from starlette.requests import Request
+from starlette.responses import Response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,11 +23,24 @@ logger = logging.getLogger("mcp_server")
 # Add project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.application.use_cases import ResultCallback
 from src.config.container import container
+from src.domain.entities import BatchSearchItem
+from src.config.settings import settings
+from src.domain.deadline import deadline
+from src.infrastructure.observability.tracing import span
+from src.infrastructure.sessions.broker import run_broker
+from src.presentation.deadlines import TIMEOUT_PROPERTY, call_timeout
+from src.presentation.formatting import FORMAT_PROPERTY, Renderer, Rendered, get_renderer
+from src.presentation.metrics import count_error, metrics_endpoint, observe_items, observe_results, track_sse_session, track_tool_call
+from src.presentation.session_routing import SessionRouter
 
 # Initialize MCP Server
 server = Server("Weaviate Knowledge Base")
 
+# Content blocks, or content blocks plus structured content (json format)
+ToolResult = list[TextContent | ImageContent | EmbeddedResource] | tuple[list[TextContent], dict]
+
 @server.list_tools()
 async def handle_list_tools() -> list[Tool]:
     return [
@@ -33,7 +53,9 @@ async def handle_list_tools() -> list[Tool]:
                     "query": {
                         "type": "string",
                         "description": "Поисковый запрос, описывающий тематику или тип проекта (например: 'интернет-магазин одежды', 'медицинский центр')."
-                    }
+                    },
+                    "timeout": TIMEOUT_PROPERTY,
+                    "format": FORMAT_PROPERTY
                 },
                 "required": ["query"]
             }
@@ -47,61 +69,166 @@ async def handle_list_tools() -> list[Tool]:
                     "query": {
                         "type": "string",
                         "description": "Название услуги (например: 'хостинг', 'разработка дизайна', 'интеграция с 1С')."
-                    }
+                    },
+                    "timeout": TIMEOUT_PROPERTY,
+                    "format": FORMAT_PROPERTY
+                },
+                "required": ["query"]
+            }
+        ),
+        Tool(
+            name="search_everything",
+            description="Одновременный поиск по портфолио и по прайс-листу. Используй, когда вопрос касается и примеров работ, и стоимости (например: 'сколько стоит сайт для клиники, как у вас в портфолио?').",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Тематика проекта или название услуги (например: 'сайт медицинского центра')."
+                    },
+                    "timeout": TIMEOUT_PROPERTY,
+                    "format": FORMAT_PROPERTY
                 },
                 "required": ["query"]
             }
+        ),
+        Tool(
+            name="batch_search",
+            description="Пакетный поиск: выполняет несколько запросов к портфолио и/или прайс-листу за один вызов. Используй вместо нескольких последовательных вызовов search_projects / search_prices.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "queries": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "maxItems": settings.BATCH_SEARCH_MAX_QUERIES,
+                        "description": "Список поисковых запросов (например: ['интернет-магазин', 'медицина', 'хостинг'])."
+                    },
+                    "sources": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": ["projects", "prices"]},
+                        "description": "Где искать: 'projects' (портфолио) и/или 'prices' (прайс-лист). По умолчанию - в обоих."
+                    },
+                    "timeout": TIMEOUT_PROPERTY,
+                    "format": FORMAT_PROPERTY
+                },
+                "required": ["queries"]
+            }
         )
     ]
 
+def _progress_callback(renderer: Renderer, total: int) -> Optional[ResultCallback]:
+    """
+    Stream every finished sub-search to the client as a progress notification.
+    Returns None when the client did not ask for progress (no progressToken).
+    """
+    ctx = server.request_context
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return None
+
+    done = 0
+
+    async def report(item: BatchSearchItem, source: str) -> None:
+        nonlocal done
+        done += 1
+        try:
+            await ctx.session.send_progress_notification(
+                token,
+                done,
+                total,
+                message=renderer.partial(item, source).text,
+                related_request_id=str(ctx.request_id),
+            )
+        except Exception as e:
+            # The final result is still returned even if a progress update is lost
+            logger.warning(f"Failed to send progress notification: {e}")
+
+    return report
+
 @server.call_tool()
-async def handle_call_tool(name: str, arguments: dict | None) -> list[TextContent | ImageContent | EmbeddedResource]:
+async def handle_call_tool(name: str, arguments: dict | None) -> ToolResult:
     logger.info(f"Handling tool call: {name} with args: {arguments}")
     if not arguments:
         arguments = {}
 
     query = arguments.get("query", "")
+    ctx = server.request_context
+
+    # The whole call, down to the gateway request, shares one time budget
+    with deadline(call_timeout(arguments.get("timeout"), ctx.meta)), track_tool_call(name), span("tool", tool=name):
+        return await _call_tool(name, arguments, query)
+
+def _content(rendered: Rendered) -> ToolResult:
+    """Tool result: the text, plus structured content when the format has one."""
+    content = [TextContent(type="text", text=rendered.text)]
+    if rendered.structured is None:
+        return content
+    return content, rendered.structured
 
+async def _call_tool(name: str, arguments: dict, query: str) -> ToolResult:
     try:
+        renderer = get_renderer(arguments.get("format"))
         if name == "search_projects":
             # Now awaiting the async use case
             logger.info("Calling search_projects use case...")
-            projects = await container.search_use_case.search_projects(query)
+            with span("use_case"):
+                projects = await container.search_use_case.search_projects(query)
             logger.info(f"Got {len(projects) if projects else 0} projects")
-            
-            if not projects:
-                return [TextContent(type="text", text="No projects found.")]
-            
-            result = f"Projects found for '{query}':\n\n"
-            for p in projects:
-                result += f"- PROJECT: {p.title}\n"
-                if p.url:
-                    result += f"  URL: {p.url}\n"
-                result += f"  INFO: {p.description}\n\n"
-            return [TextContent(type="text", text=result)]
+            observe_results(name, "projects", projects)
+
+            with span("render"):
+                return _content(renderer.projects(query, projects))
         
         elif name == "search_prices":
             # Now awaiting the async use case
             logger.info("Calling search_services use case...")
-            services = await container.search_use_case.search_services(query)
+            with span("use_case"):
+                services = await container.search_use_case.search_services(query)
             logger.info(f"Got {len(services) if services else 0} services")
+            observe_results(name, "services", services)
+
+            with span("render"):
+                return _content(renderer.services(query, services))
 
-            if not services:
-                return [TextContent(type="text", text="No services found.")]
+        elif name == "search_everything":
+            logger.info("Calling search_everything use case...")
+            with span("use_case"):
+                item = await container.search_use_case.search_everything(
+                    query, on_result=_progress_callback(renderer, total=2)
+                )
+            observe_items(name, [item])
+            with span("render"):
+                return _content(renderer.everything(item))
 
-            result = f"Services found for '{query}':\n\n"
-            for s in services:
-                result += f"- SERVICE: {s.name}\n  PRICE: {s.price} RUB\n"
-                if s.description:
-                    result += f"  NOTE: {s.description}\n"
-                result += "\n"
-            return [TextContent(type="text", text=result)]
+        elif name == "batch_search":
+            # The progress total counts the searches that actually run
+            queries = container.search_use_case.batch_queries(arguments.get("queries") or [])
+            sources = arguments.get("sources") or ["projects", "prices"]
+            logger.info(f"Calling batch_search use case for {len(queries)} queries...")
+            include_projects = "projects" in sources
+            include_services = "prices" in sources
+            with span("use_case", queries=len(queries)):
+                items = await container.search_use_case.batch_search(
+                    queries,
+                    include_projects=include_projects,
+                    include_services=include_services,
+                    on_result=_progress_callback(renderer, total=len(queries) * (include_projects + include_services)),
+                )
+            observe_items(name, items)
+            with span("render"):
+                return _content(renderer.batch(items))
         
         else:
             logger.error(f"Unknown tool: {name}")
             raise ValueError(f"Unknown tool: {name}")
 
+    except asyncio.CancelledError:
+        # Client cancelled the request or the SSE connection closed; outstanding searches are cancelled with us
+        logger.info(f"Tool call {name} cancelled")
+        raise
     except Exception as e:
+        count_error(name, e)
         logger.error(f"Error executing tool {name}: {e}", exc_info=True)
         return [TextContent(type="text", text=f"Error executing tool: {e}")]
 
@@ -109,25 +236,68 @@ from starlette.requests import Request
 
 # SSE Transport Setup
 sse = SseServerTransport("/sse/messages")
+# Sessions shared with the other workers through SSE_BROKER_URL, if set
+router = SessionRouter(sse, settings.SSE_BROKER_URL, settings.SSE_FORWARD_TIMEOUT)
 
 async def handle_sse(request: Request):
     logger.info("New SSE connection established")
     try:
-        async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
-            logger.info("SSE streams created, running server")
-            await server.run(streams[0], streams[1], server.create_initialization_options())
+        with track_sse_session():
+            async with router.connect_sse(request.scope, request.receive, request._send) as streams:
+                logger.info("SSE streams created, running server")
+                await server.run(streams[0], streams[1], server.create_initialization_options())
     except Exception as e:
         logger.error(f"SSE connection error: {e}")
     finally:
         logger.info("SSE connection closed")
+    # The SSE response has already been sent; Starlette routes still need a Response to call
+    return Response()
+
+@asynccontextmanager
+async def lifespan(app):
+    async with container.lifespan(app):
+        await router.start()
+        try:
+            yield
+        finally:
+            await router.stop()
 
 starlette_app = Starlette(
     debug=True,
+    lifespan=lifespan,
     routes=[
         Route("/sse", endpoint=handle_sse),
-        Mount("/sse/messages", app=sse.handle_post_message),
+        Route("/metrics", endpoint=metrics_endpoint),
+        Mount("/sse/messages", app=router.handle_post_message),
     ],
 )
 
+def _run_broker(url: str) -> None:
+    asyncio.run(run_broker(url))
+
+def run(host: str = "0.0.0.0", port: int = 8000, workers: int = 1, **options) -> None:
+    """
+    Serve starlette_app. Several workers share their SSE sessions through the
+    broker at SSE_BROKER_URL; without one, a broker process is started here.
+    """
+    if workers <= 1:
+        uvicorn.run(starlette_app, host=host, port=port, **options)
+        return
+    broker = None
+    if not settings.SSE_BROKER_URL:
+        directory = tempfile.mkdtemp(prefix="mcp-sse-")
+        url = f"unix://{os.path.join(directory, 'broker.sock')}"
+        broker = multiprocessing.get_context("spawn").Process(target=_run_broker, args=(url,), daemon=True)
+        broker.start()
+        # Workers are fresh processes: they read the URL from the environment
+        os.environ["SSE_BROKER_URL"] = url
+    try:
+        uvicorn.run("src.presentation.mcp_sse_server:starlette_app", host=host, port=port, workers=workers, **options)
+    finally:
+        if broker is not None:
+            broker.terminate()
+            broker.join(5)
+            shutil.rmtree(directory, ignore_errors=True)
+
 if __name__ == "__main__":
-    uvicorn.run(starlette_app, host="0.0.0.0", port=8000)
+    run(workers=settings.SSE_WORKERS)
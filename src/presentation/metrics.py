@@ -0,0 +1,70 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+from starlette.requests import Request
+from starlette.responses import Response
+from src.domain.entities import BatchSearchItem
+from src.infrastructure.observability.metrics import COUNT_BUCKETS, REGISTRY, Counter, Gauge, Histogram
+
+TOOLS = ("search_projects", "search_prices", "search_everything", "batch_search")
+
+TOOL_LATENCY = Histogram("mcp_tool_duration_seconds", "Tool call latency", ["tool"])
+TOOL_ERRORS = Counter("mcp_tool_errors_total", "Failed tool calls and sub-searches by error type", ["tool", "type"])
+TOOL_RESULTS = Histogram("mcp_tool_results", "Results returned per search", ["tool", "source"], buckets=COUNT_BUCKETS)
+TOOL_IN_FLIGHT = Gauge("mcp_tool_calls_in_flight", "Tool calls being executed", ["tool"])
+SSE_SESSIONS = Gauge("mcp_sse_sessions_active", "Open SSE sessions")
+SSE_SESSIONS_TOTAL = Counter("mcp_sse_sessions_total", "SSE sessions opened")
+SSE_FORWARDED = Counter("mcp_sse_forwarded_messages_total", "Client messages forwarded to the worker holding their SSE session, by response status", ["status"])
+
+def _tool_label(name: str) -> str:
+    # Tool names come from clients: keep the label set bounded
+    return name if name in TOOLS else "unknown"
+
+@contextmanager
+def track_tool_call(name: str) -> Iterator[None]:
+    """In-flight gauge and latency of one tool call; cancellations are counted as errors of type "cancelled"."""
+    tool = _tool_label(name)
+    in_flight = TOOL_IN_FLIGHT.labels(tool)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        TOOL_ERRORS.labels(tool, "cancelled").inc()
+        raise
+    finally:
+        in_flight.dec()
+        TOOL_LATENCY.labels(tool).observe(time.perf_counter() - started)
+
+def count_error(name: str, error: BaseException) -> None:
+    TOOL_ERRORS.labels(_tool_label(name), type(error).__name__).inc()
+
+def observe_results(name: str, source: str, results: Optional[Sequence]) -> None:
+    TOOL_RESULTS.labels(_tool_label(name), source).observe(len(results or ()))
+
+def observe_items(name: str, items: Sequence[BatchSearchItem]) -> None:
+    """Result counts and per-source errors of search_everything / batch_search items."""
+    tool = _tool_label(name)
+    for item in items:
+        for source in ("projects", "services"):
+            results = getattr(item, source)
+            if results is not None:
+                TOOL_RESULTS.labels(tool, source).observe(len(results))
+        for message in item.errors.values():
+            TOOL_ERRORS.labels(tool, "timeout" if message == "timed out" else "search_error").inc()
+
+@contextmanager
+def track_sse_session() -> Iterator[None]:
+    SSE_SESSIONS.inc()
+    SSE_SESSIONS_TOTAL.inc()
+    try:
+        yield
+    finally:
+        SSE_SESSIONS.dec()
+
+def count_forwarded(status: int) -> None:
+    SSE_FORWARDED.labels(str(status)).inc()
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
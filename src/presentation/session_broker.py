@@ -0,0 +1,37 @@
+"""
+Session broker of a multi-worker SSE server (SSE_BROKER_URL).
+
+Holds which worker owns which SSE session and relays client messages between
+workers. Start one per deployment and point every worker, on any host, at it:
+
+    python -m src.presentation.session_broker --url unix:///run/mcp/sessions.sock
+    python -m src.presentation.session_broker --url tcp://0.0.0.0:8765
+
+A single host does not need it: SSE_WORKERS=4 python src/presentation/mcp_sse_server.py
+starts a broker on a Unix socket by itself.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.infrastructure.sessions.broker import run_broker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="unix:///path/to.sock or tcp://host:port")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(run_broker(args.url))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+import re
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs
+from mcp.server.sse import SseServerTransport
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Message, Receive, Scope, Send
+from src.infrastructure.cache.ttl_cache import TTLCache
+from src.infrastructure.sessions.broker import BrokerClient, BrokerError
+from src.presentation.metrics import count_forwarded
+
+logger = logging.getLogger("mcp_server")
+
+# The session id the transport announces in the "endpoint" event of a new SSE stream
+_ENDPOINT_SESSION = re.compile(rb"session_id=([0-9a-f]{32})")
+_SESSION_KEY = "sse-session:"
+_WORKER_CHANNEL = "sse-worker:"
+
+def _session_id(scope: Scope) -> Optional[str]:
+    """Normalized session id of a POST to the message endpoint, None if it has none or a malformed one."""
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("session_id")
+    try:
+        return uuid.UUID(hex=values[0]).hex if values else None
+    except ValueError:
+        return None
+
+
+class SessionRouter:
+    """
+    Lets several workers (processes or hosts) serve one SSE endpoint.
+
+    SseServerTransport keeps its sessions in process memory, so a client's POSTs
+    must reach the worker holding its SSE stream. With a broker_url every worker
+    registers the sessions it opens with the shared broker before the client
+    learns their id, and a POST for a session of another worker is forwarded
+    through the broker to that worker, which replays it against its transport
+    and sends back the response. Without a broker_url everything is local, as
+    with the bare transport.
+
+    A forwarded POST costs two broker hops (the message and its reply) on top of
+    the local handling, plus an owner lookup on the first POST of a session, so
+    several workers on one host are slower per call than a single worker; they
+    pay off only when one worker's CPU is the bottleneck.
+    """
+
+    def __init__(self, transport: SseServerTransport, broker_url: str = "", forward_timeout: float = 10.0, owner_cache_size: int = 10000):
+        self.transport = transport
+        self.forward_timeout = forward_timeout
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._broker = BrokerClient(broker_url, self._on_message) if broker_url else None
+        self._local: Set[str] = set()
+        # session -> worker holding it; a session never moves, so its owner is looked up once
+        self._owners = TTLCache(ttl=float("inf"), max_entries=owner_cache_size)
+        # request id -> future of the (status, body) the owner answered with
+        self._replies: Dict[str, asyncio.Future] = {}
+        self._deliveries: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._broker is None:
+            return
+        await self._broker.start()
+        await self._broker.subscribe(_WORKER_CHANNEL + self.worker)
+        logger.info(f"SSE worker {self.worker} joined the session broker at {self._broker.url}")
+
+    async def stop(self) -> None:
+        if self._broker is not None:
+            await self._broker.close()
+
+    @asynccontextmanager
+    async def connect_sse(self, scope: Scope, receive: Receive, send: Send):
+        """transport.connect_sse(), with the new session registered as this worker's."""
+        if self._broker is None:
+            async with self.transport.connect_sse(scope, receive, send) as streams:
+                yield streams
+            return
+
+        session: Optional[str] = None
+
+        async def registering_send(message: Message) -> None:
+            nonlocal session
+            if session is None and message["type"] == "http.response.body":
+                match = _ENDPOINT_SESSION.search(message.get("body", b""))
+                if match:
+                    session = match.group(1).decode()
+                    self._local.add(session)
+                    # Before the client sees the endpoint, so its first POST can be routed
+                    try:
+                        await self._broker.set(_SESSION_KEY + session, self.worker)
+                    except BrokerError as e:
+                        # The client re-registers the session once it is connected again
+                        logger.warning(f"Could not register SSE session {session}: {e}")
+            await send(message)
+
+        try:
+            async with self.transport.connect_sse(scope, receive, registering_send) as streams:
+                yield streams
+        finally:
+            if session is not None:
+                self._local.discard(session)
+                try:
+                    await self._broker.delete(_SESSION_KEY + session)
+                except BrokerError as e:
+                    logger.warning(f"Could not unregister SSE session {session}: {e}")
+
+    async def handle_post_message(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """ASGI app of the message endpoint: local sessions go to the transport, others to their worker."""
+        session = _session_id(scope)
+        if self._broker is None or session is None or session in self._local or scope["method"] != "POST":
+            await self.transport.handle_post_message(scope, receive, send)
+            return
+        owner = self._owners.get(session) or await self._lookup(session)
+        if owner is None or owner == self.worker:
+            # Unknown here and everywhere: the transport answers 404
+            await self.transport.handle_post_message(scope, receive, send)
+            return
+
+        body = await Request(scope, receive).body()
+        status, content = await self._forward(owner, scope, body)
+        if status == 404:
+            # The session or its worker is gone
+            self._owners.delete(session)
+        count_forwarded(status)
+        await Response(content, status_code=status)(scope, receive, send)
+
+    async def _lookup(self, session: str) -> Optional[str]:
+        try:
+            owner = await self._broker.get(_SESSION_KEY + session)
+        except BrokerError as e:
+            logger.warning(f"Session broker lookup failed: {e}")
+            return None
+        if owner is not None:
+            self._owners.set(session, owner)
+        return owner
+
+    async def _forward(self, owner: str, scope: Scope, body: bytes) -> Tuple[int, bytes]:
+        request_id = uuid.uuid4().hex
+        reply = asyncio.get_running_loop().create_future()
+        self._replies[request_id] = reply
+        message = {
+            "type": "post",
+            "id": request_id,
+            "reply_to": self.worker,
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in scope.get("headers", [])],
+            # JSON-RPC bodies are UTF-8; anything else survives the trip and is rejected by the owner
+            "body": body.decode("utf-8", "surrogateescape"),
+        }
+        try:
+            if not await self._broker.publish(_WORKER_CHANNEL + owner, message):
+                # The owner is gone; its sessions are dropped by the broker shortly
+                return 404, b"Could not find session"
+            return await asyncio.wait_for(reply, self.forward_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"SSE worker {owner} did not answer a forwarded message in {self.forward_timeout}s")
+            return 504, b"Session worker did not answer"
+        except BrokerError as e:
+            logger.warning(f"Could not forward a message to SSE worker {owner}: {e}")
+            return 503, b"Session broker unavailable"
+        finally:
+            self._replies.pop(request_id, None)
+
+    def _on_message(self, channel: str, data: Dict[str, Any]) -> None:
+        if data.get("type") == "reply":
+            reply = self._replies.get(data["id"])
+            if reply is not None and not reply.done():
+                reply.set_result((data["status"], data["body"].encode("utf-8", "surrogateescape")))
+        elif data.get("type") == "post":
+            task = asyncio.create_task(self._deliver(data))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, data: Dict[str, Any]) -> None:
+        """Replay a forwarded POST against the local transport and send its response back."""
+        body = data["body"].encode("utf-8", "surrogateescape")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": data["path"],
+            "raw_path": data["path"].encode(),
+            "root_path": "",
+            "query_string": data["query"].encode("latin-1"),
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in data["headers"]],
+            "client": None,
+            "server": None,
+        }
+        received = False
+        status = 500
+        chunks = []
+
+        async def receive() -> Message:
+            nonlocal received
+            if received:
+                return {"type": "http.disconnect"}
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    # Answer as soon as the response is complete: the transport then waits
+                    # until the session has taken the message, like for a local POST
+                    await self._reply(data, status, b"".join(chunks))
+
+        try:
+            await self.transport.handle_post_message(scope, receive, send)
+        except Exception as e:
+            logger.error(f"Forwarded message for SSE session failed: {e!r}")
+
+    async def _reply(self, data: Dict[str, Any], status: int, content: bytes) -> None:
+        reply = {"type": "reply", "id": data["id"], "status": status, "body": content.decode("utf-8", "surrogateescape")}
+        try:
+            await self._broker.publish(_WORKER_CHANNEL + data["reply_to"], reply)
+        except BrokerError as e:
+            logger.warning(f"Could not answer a forwarded message: {e}")
@@ -0,0 +1,14 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+# Manual clients of a running SSE server, started with python, not pytest
+collect_ignore = ["test_list_tools.py", "test_mcp_client.py"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,169 @@
+import asyncio
+import httpx
+import pytest
+from fake_gateway import create_app
+from src.config.container import Container
+from src.config.settings import settings
+from src.domain.deadline import DeadlineExceeded, deadline
+from src.domain.entities import BatchSearchItem, ProjectEntity, ServiceEntity
+from src.infrastructure.api.search_gateway import SearchGatewayAdapter
+from src.infrastructure.cache.cached_knowledge_base import CachedKnowledgeBase
+
+pytestmark = pytest.mark.anyio
+
+
+def _adapter(monkeypatch, fast_decode: bool = True, projection: str = "honor", latency_ms: float = 0) -> SearchGatewayAdapter:
+    monkeypatch.setattr(settings, "SEARCH_GATEWAY_FAST_DECODE", fast_decode)
+    adapter = SearchGatewayAdapter()
+    app = create_app(latency_ms=latency_ms, jitter_ms=0, results=3, text_size=2000, projection=projection)
+    adapter._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gateway")
+    return adapter
+
+
+@pytest.mark.parametrize("projection", ["honor", "ignore"])
+async def test_cached_search_with_fast_decode(monkeypatch, projection):
+    adapter = _adapter(monkeypatch, projection=projection)
+    kb = CachedKnowledgeBase(adapter, ttl=60, max_entries=16, max_bytes=1 << 20)
+    try:
+        projects = await kb.search_projects("разработка сайта", 3)
+        services = await kb.search_services("сайт", 2)
+        assert len(projects) == 3 and all(isinstance(p, ProjectEntity) for p in projects)
+        assert len(services) == 2 and all(isinstance(s, ServiceEntity) for s in services)
+        assert kb.stats()["entries"] == 2
+
+        # Served from the cache the second time
+        assert await kb.search_projects("Разработка  сайта", 3) == projects
+        assert kb.stats()["hits"] == 1
+
+        item = BatchSearchItem(query="сайт", projects=projects, services=services)
+        assert '"title":"Проект 0"' in item.model_dump_json()
+    finally:
+        await adapter.shutdown()
+
+
+async def test_fast_decode_matches_validated_entities(monkeypatch):
+    fast = _adapter(monkeypatch, fast_decode=True)
+    slow = _adapter(monkeypatch, fast_decode=False)
+    try:
+        assert await fast.search_projects("сайт", 3) == await slow.search_projects("сайт", 3)
+        assert await fast.search_services("сайт", 3) == await slow.search_services("сайт", 3)
+    finally:
+        await fast.shutdown()
+        await slow.shutdown()
+
+
+async def test_coalesced_call_ignores_the_deadline_of_its_first_caller(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_GATEWAY_COALESCE", True)
+    monkeypatch.setattr(settings, "SEARCH_GATEWAY_BREAKER", False)
+    adapter = _adapter(monkeypatch, latency_ms=100)
+
+    async def search(timeout: float):
+        with deadline(timeout):
+            return await adapter.search_projects("сайт", 3)
+
+    try:
+        hurried = asyncio.ensure_future(search(0.02))
+        await asyncio.sleep(0)
+        patient = asyncio.ensure_future(search(2.0))
+        with pytest.raises(DeadlineExceeded):
+            await hurried
+        assert len(await patient) == 3
+        assert adapter._single_flight.stats()["started"] == 1
+        assert adapter._single_flight.stats()["coalesced"] == 1
+    finally:
+        await adapter.shutdown()
+
+
+@pytest.mark.parametrize("status", [500, 503])
+async def test_fetch_collection_raises_instead_of_returning_no_results(status):
+    adapter = SearchGatewayAdapter()
+    adapter._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(status, json={"detail": "down"})),
+        base_url="http://gateway",
+    )
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            await adapter.fetch_collection("projects", 10)
+    finally:
+        await adapter.shutdown()
+
+
+async def test_fetch_collection_returns_raw_objects(monkeypatch):
+    adapter = _adapter(monkeypatch)
+    try:
+        results = await adapter.fetch_collection("prices", 2)
+        assert [r["service"] for r in results] == ["Услуга 0", "Услуга 1"]
+        assert "full_text" in results[0]
+    finally:
+        await adapter.shutdown()
+
+
+async def test_projection_retry_respects_the_deadline():
+    requests = []
+
+    async def reject(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(422, json={"detail": "unknown parameters: fields"})
+
+    adapter = SearchGatewayAdapter()
+    adapter._client = httpx.AsyncClient(transport=httpx.MockTransport(reject), base_url="http://gateway")
+    try:
+        with deadline(0.02), pytest.raises(DeadlineExceeded, match="projection retry"):
+            await adapter._post("/search/projects", {"query": "сайт", "limit": 3, "fields": ["title"]})
+        assert len(requests) == 1
+    finally:
+        await adapter.shutdown()
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """Answers every search with one hit; the warm-up path after warmup_delay seconds."""
+
+    def __init__(self, warmup_delay: float = 0.0):
+        self.warmup_delay = warmup_delay
+        self.paths = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        if request.method == "GET":
+            await asyncio.sleep(self.warmup_delay)
+            return httpx.Response(200, text="ok")
+        return httpx.Response(200, json={"results": [{"title": "Проект", "url": "https://example.com", "full_text": "Текст"}]})
+
+
+def _pooled_adapter(monkeypatch, transport: CountingTransport) -> tuple:
+    monkeypatch.setattr(settings, "SEARCH_GATEWAY_WARMUP_CONNECTIONS", 2)
+    created = []
+
+    def create_client():
+        created.append(httpx.AsyncClient(transport=transport, base_url="http://gateway"))
+        return created[-1]
+
+    adapter = SearchGatewayAdapter()
+    monkeypatch.setattr(adapter, "_create_client", create_client)
+    return adapter, created
+
+
+async def test_one_pooled_client_from_startup_to_shutdown(monkeypatch):
+    transport = CountingTransport()
+    adapter, created = _pooled_adapter(monkeypatch, transport)
+    container = Container()
+    container._backend = adapter
+    async with container.lifespan():
+        await container.search_use_case.search_projects("сайт")
+        await container.search_use_case.search_projects("магазин")
+        await container.search_use_case.search_services("хостинг")
+        assert len(created) == 1 and adapter.client is created[0]
+
+    assert transport.paths.count("/") == 2 and len(transport.paths) == 5
+    assert created[0].is_closed and adapter._client is None
+
+
+async def test_warmup_of_an_unresponsive_gateway_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_GATEWAY_WARMUP_TIMEOUT", 0.05)
+    adapter, created = _pooled_adapter(monkeypatch, CountingTransport(warmup_delay=10))
+    try:
+        await asyncio.wait_for(adapter.startup(), 1)
+        assert not created[0].is_closed
+    finally:
+        await adapter.shutdown()
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from src.config.settings import settings
+from src.infrastructure.local.hybrid_index import HybridIndex
+from src.infrastructure.local.snapshot import Snapshot, write_snapshot
+from src.presentation.export_snapshot import export
+
+
+@pytest.mark.anyio
+async def test_failed_gateway_export_keeps_the_current_snapshot(tmp_path, monkeypatch):
+    path = str(tmp_path / "kb")
+    projects = [{"title": "Сайт клиники", "url": None, "full_text": "сайт клиники"}]
+    index = HybridIndex.build(["сайт клиники"], np.ones((1, 2), dtype=np.float32))
+    write_snapshot(path, projects, [], index, HybridIndex.build([]), source="before")
+
+    # Nothing listens on the discard port: the connection is refused
+    monkeypatch.setattr(settings, "SEARCH_GATEWAY_URL", "http://127.0.0.1:9")
+    with pytest.raises(SystemExit, match="Search Gateway failed"):
+        await export("gateway", path, 10, None)
+    assert Snapshot(path).manifest["source"] == "before"
+    assert Snapshot(path).projects[0].get("title") == "Сайт клиники"
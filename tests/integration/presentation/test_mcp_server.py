@@ -0,0 +1,63 @@
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+from src.application.use_cases import SearchUseCase
+from src.config.container import container
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.presentation.mcp_server import mcp
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeKnowledgeBase:
+    async def startup(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def search_projects(self, query: str, limit: int = 3):
+        return [ProjectEntity(title=f"Проект: {query}", url="https://example.com/p", description="Описание")]
+
+    async def search_services(self, query: str, limit: int = 5):
+        return [ServiceEntity(service=f"Услуга: {query}", price=1000.0)]
+
+
+@pytest.fixture
+def kb(monkeypatch):
+    kb = FakeKnowledgeBase()
+    monkeypatch.setattr(container, "_backend", kb)
+    monkeypatch.setattr(container, "_search_use_case", SearchUseCase(kb))
+    return kb
+
+
+async def test_json_format_returns_structured_content(kb):
+    async with create_connected_server_and_client_session(mcp) as client:
+        result = await client.call_tool("search_projects", {"query": "сайт", "format": "json"})
+    assert not result.isError
+    assert result.structuredContent["projects"][0]["title"] == "Проект: сайт"
+    assert result.content[0].text
+
+
+async def test_text_format_has_no_structured_content(kb):
+    async with create_connected_server_and_client_session(mcp) as client:
+        result = await client.call_tool("search_prices", {"query": "хостинг"})
+    assert not result.isError
+    assert result.structuredContent is None
+    assert "Услуга: хостинг" in result.content[0].text
+
+
+async def test_batch_progress_counts_the_searches_that_run(kb, monkeypatch):
+    monkeypatch.setattr(container, "_search_use_case", SearchUseCase(kb, batch_max_queries=2))
+    updates = []
+
+    async def progress(done: float, total: float | None, message: str | None) -> None:
+        updates.append((done, total))
+
+    async with create_connected_server_and_client_session(mcp) as client:
+        result = await client.call_tool(
+            "batch_search",
+            {"queries": ["сайт", "  ", "хостинг", "дизайн"], "sources": ["projects", "prices"]},
+            progress_callback=progress,
+        )
+    assert not result.isError
+    assert updates == [(1, 4), (2, 4), (3, 4), (4, 4)]
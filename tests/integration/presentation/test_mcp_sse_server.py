@@ -0,0 +1,63 @@
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+from src.application.use_cases import SearchUseCase
+from src.config.container import container
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.presentation.mcp_sse_server import server
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeKnowledgeBase:
+    async def startup(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def search_projects(self, query: str, limit: int = 3):
+        if query == "сбой":
+            raise RuntimeError("gateway down")
+        return [ProjectEntity(title=f"Проект: {query}", url="https://example.com/p", description="Описание")]
+
+    async def search_services(self, query: str, limit: int = 5):
+        return [ServiceEntity(service=f"Услуга: {query}", price=1000.0)]
+
+
+@pytest.fixture
+def kb(monkeypatch):
+    kb = FakeKnowledgeBase()
+    monkeypatch.setattr(container, "_backend", kb)
+    monkeypatch.setattr(container, "_search_use_case", SearchUseCase(kb, batch_max_queries=3))
+    return kb
+
+
+async def test_batch_progress_streams_every_search_up_to_the_total(kb):
+    updates = []
+
+    async def progress(done: float, total: float | None, message: str | None) -> None:
+        updates.append((done, total, message))
+
+    async with create_connected_server_and_client_session(server) as client:
+        result = await client.call_tool(
+            "batch_search",
+            {"queries": ["", "сайт", "сбой", " ", "хостинг", "дизайн"], "sources": ["projects"]},
+            progress_callback=progress,
+        )
+    assert not result.isError
+    assert [(done, total) for done, total, _ in updates] == [(1, 3), (2, 3), (3, 3)]
+    assert any("gateway down" in message for _, _, message in updates)
+    text = result.content[0].text
+    assert "Проект: сайт" in text and "Проект: хостинг" in text and "дизайн" not in text
+
+
+async def test_search_everything_reports_both_sources(kb):
+    updates = []
+
+    async def progress(done: float, total: float | None, message: str | None) -> None:
+        updates.append((done, total))
+
+    async with create_connected_server_and_client_session(server) as client:
+        result = await client.call_tool("search_everything", {"query": "сайт", "format": "json"}, progress_callback=progress)
+    assert updates == [(1, 2), (2, 2)]
+    assert result.structuredContent["projects"][0]["title"] == "Проект: сайт"
@@ -0,0 +1,138 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+import httpx
+import pytest
+from starlette.responses import Response
+from src.infrastructure.sessions.broker import BrokerClient, BrokerServer
+from src.presentation.session_routing import SessionRouter
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeTransport:
+    """The part of SseServerTransport the router uses: sessions opened by connect_sse() accept POSTs."""
+
+    def __init__(self, hang: bool = False):
+        self.hang = hang
+        self.sessions = set()
+        self.received = []
+
+    @asynccontextmanager
+    async def connect_sse(self, scope, receive, send):
+        session = uuid.uuid4().hex
+        self.sessions.add(session)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": f"event: endpoint\r\ndata: /messages/?session_id={session}\r\n\r\n".encode(), "more_body": True})
+        try:
+            yield session, None
+        finally:
+            self.sessions.discard(session)
+
+    async def handle_post_message(self, scope, receive, send):
+        session = scope["query_string"].decode().removeprefix("session_id=")
+        if session not in self.sessions:
+            await Response("Could not find session", status_code=404)(scope, receive, send)
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        if self.hang:
+            await asyncio.sleep(10)
+        self.received.append((session, body))
+        await Response("Accepted", status_code=202)(scope, receive, send)
+
+
+@pytest.fixture
+async def broker_url(tmp_path):
+    url = f"unix://{tmp_path / 'broker.sock'}"
+    listener = await BrokerServer().serve(url)
+    yield url
+    listener.close()
+    await listener.wait_closed()
+
+
+@pytest.fixture
+async def routers(broker_url):
+    started = []
+
+    async def start(transport: FakeTransport, forward_timeout: float = 2.0) -> SessionRouter:
+        router = SessionRouter(transport, broker_url, forward_timeout)
+        await router.start()
+        started.append(router)
+        return router
+
+    yield start
+    for router in started:
+        await router.stop()
+
+
+async def _post(router: SessionRouter, session: str, body: bytes = b'{"jsonrpc":"2.0","id":1,"method":"ping"}') -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=router.handle_post_message), base_url="http://worker") as client:
+        return await client.post("/messages/", params={"session_id": session}, content=body)
+
+
+async def _open_session(router: SessionRouter):
+    """connect_sse() of the router with a client that never disconnects; returns the context and the session id."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    context = router.connect_sse({"type": "http"}, None, send)
+    session, _ = await context.__aenter__()
+    return context, session
+
+
+async def test_post_is_forwarded_to_the_worker_holding_the_session(routers):
+    owner_transport, other_transport = FakeTransport(), FakeTransport()
+    owner, other = await routers(owner_transport), await routers(other_transport)
+    context, session = await _open_session(owner)
+    try:
+        response = await _post(other, session, b'{"jsonrpc":"2.0","id":7,"method":"ping"}')
+        assert response.status_code == 202 and response.text == "Accepted"
+        assert owner_transport.received == [(session, b'{"jsonrpc":"2.0","id":7,"method":"ping"}')]
+        assert other_transport.received == []
+
+        # The owner is looked up once per session
+        await _post(other, session)
+        assert len(owner_transport.received) == 2
+        assert other._owners.stats()["hits"] == 1
+    finally:
+        await context.__aexit__(None, None, None)
+
+    # Closed on the owner: its transport answers 404 through the other worker
+    assert (await _post(other, session)).status_code == 404
+
+
+async def test_session_of_a_vanished_worker_is_not_found(routers, broker_url):
+    router = await routers(FakeTransport())
+    registry = BrokerClient(broker_url, lambda channel, data: None)
+    await registry.start(timeout=1)
+    try:
+        session = uuid.uuid4().hex
+        await registry.set("sse-session:" + session, "gone-host:1:deadbeef")
+        response = await _post(router, session)
+        assert response.status_code == 404
+        assert router._owners.get(session) is None
+    finally:
+        await registry.close()
+
+
+async def test_unknown_session_is_answered_by_the_local_transport(routers):
+    router = await routers(FakeTransport())
+    assert (await _post(router, uuid.uuid4().hex)).status_code == 404
+
+
+async def test_owner_that_does_not_answer_times_out(routers):
+    owner = await routers(FakeTransport(hang=True))
+    other = await routers(FakeTransport(), forward_timeout=0.1)
+    context, session = await _open_session(owner)
+    try:
+        response = await asyncio.wait_for(_post(other, session), 2)
+        assert response.status_code == 504
+    finally:
+        await context.__aexit__(None, None, None)
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from src.application.use_cases import SearchUseCase
+from src.domain.deadline import deadline
+from src.domain.entities import ProjectEntity, ServiceEntity
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeKnowledgeBase:
+    """Answers after delay seconds, fails the queries in failing and records the concurrency reached."""
+
+    def __init__(self, delay: float = 0.01, failing: tuple = (), service_delay: float | None = None):
+        self.delay = delay
+        self.service_delay = delay if service_delay is None else service_delay
+        self.failing = failing
+        self.queries = []
+        self.running = 0
+        self.max_running = 0
+
+    async def _search(self, query: str, delay: float):
+        self.queries.append(query)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.running -= 1
+        if query in self.failing:
+            raise RuntimeError(f"backend failed on {query}")
+
+    async def search_projects(self, query: str, limit: int = 3):
+        await self._search(query, self.delay)
+        return [ProjectEntity(title=f"Проект: {query}", url="https://example.com/p", description="")]
+
+    async def search_services(self, query: str, limit: int = 5):
+        await self._search(query, self.service_delay)
+        return [ServiceEntity(service=f"Услуга: {query}", price=1000.0)]
+
+
+async def test_batch_runs_at_most_batch_concurrency_searches_at_once():
+    kb = FakeKnowledgeBase()
+    use_case = SearchUseCase(kb, batch_concurrency=2)
+    items = await use_case.batch_search([f"запрос {i}" for i in range(6)], include_services=False)
+    assert len(items) == 6 and all(item.projects for item in items)
+    assert kb.max_running == 2
+
+
+async def test_batch_is_cut_to_batch_max_queries():
+    kb = FakeKnowledgeBase()
+    use_case = SearchUseCase(kb, batch_max_queries=3)
+    items = await use_case.batch_search(["a", "b", "c", "d", "e"])
+    assert [item.query for item in items] == ["a", "b", "c"]
+    assert sorted(kb.queries) == ["a", "a", "b", "b", "c", "c"]
+
+
+async def test_batch_strips_queries_and_drops_empty_ones():
+    kb = FakeKnowledgeBase()
+    use_case = SearchUseCase(kb)
+    assert use_case.batch_queries(["  сайт ", "", "   ", "хостинг"]) == ["сайт", "хостинг"]
+    items = await use_case.batch_search(["  сайт ", "", "   "], include_services=False)
+    assert [item.query for item in items] == ["сайт"]
+    assert kb.queries == ["сайт"]
+
+
+async def test_failed_query_is_reported_inline():
+    kb = FakeKnowledgeBase(failing=("сбой",))
+    use_case = SearchUseCase(kb)
+    items = await use_case.batch_search(["сайт", "сбой", "хостинг"])
+    ok, failed, other = items
+    assert failed.errors == {"projects": "backend failed on сбой", "services": "backend failed on сбой"}
+    assert failed.projects is None and failed.services is None
+    assert ok.projects[0].title == "Проект: сайт" and ok.services and not ok.errors
+    assert other.projects and other.services and not other.errors
+
+
+async def test_everything_returns_the_side_that_made_the_timeout():
+    kb = FakeKnowledgeBase(delay=0.01, service_delay=5)
+    use_case = SearchUseCase(kb, everything_timeout=0.1)
+    item = await asyncio.wait_for(use_case.search_everything("сайт"), 1)
+    assert item.projects[0].title == "Проект: сайт"
+    assert item.services is None and item.errors == {"services": "timed out"}
+
+
+async def test_everything_is_bounded_by_the_call_deadline():
+    kb = FakeKnowledgeBase(delay=0.01, service_delay=5)
+    use_case = SearchUseCase(kb, everything_timeout=8)
+    with deadline(0.1):
+        item = await asyncio.wait_for(use_case.search_everything("сайт"), 1)
+    assert item.projects and item.errors == {"services": "timed out"}
+
+
+async def test_everything_reports_a_failing_side_inline():
+    class PricesDown(FakeKnowledgeBase):
+        async def search_services(self, query: str, limit: int = 5):
+            raise RuntimeError("prices unavailable")
+
+    landed = []
+
+    async def on_result(item, source):
+        landed.append(source)
+
+    item = await SearchUseCase(PricesDown()).search_everything("сайт", on_result=on_result)
+    assert item.projects[0].title == "Проект: сайт"
+    assert item.errors == {"services": "prices unavailable"}
+    assert sorted(landed) == ["projects", "services"]
@@ -0,0 +1,86 @@
+import os
+import random
+import re
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "arxive"))
+
+pytest.importorskip("pymystem3")
+from texts_processing import PhraseMatcher, TextsTokenizer
+
+
+class SplitLemmatizer:
+    """Mystem-compatible lemmatize(): words and separators as they are, plus the trailing newline."""
+
+    def lemmatize(self, text):
+        return re.findall(r"\w+|\W+", text) + ["\n"]
+
+
+def _tokenizer(stopwords=(), synonyms=()) -> TextsTokenizer:
+    tknz = TextsTokenizer(lemmatizer=SplitLemmatizer())
+    if stopwords:
+        tknz.add_stopwords(list(stopwords))
+    if synonyms:
+        tknz.add_synonyms(list(synonyms))
+    return tknz
+
+
+def _both(tknz: TextsTokenizer, texts):
+    lemm_texts = tknz.texts2tokens(texts)
+    return tknz._apply_matchers(lemm_texts), tknz._apply_patterns(lemm_texts)
+
+
+def test_matches_at_yields_shortest_first():
+    matcher = PhraseMatcher()
+    matcher.add(["веб", "сайт"], "long")
+    matcher.add(["веб"], "short")
+    matcher.add(["веб"], "second")
+    tokens = ["веб", "сайт", "магазин"]
+    assert list(matcher.matches_at(tokens, 0)) == [(1, ["short", "second"]), (2, ["long"])]
+    assert list(matcher.matches_at(tokens, 1)) == []
+    assert not PhraseMatcher() and matcher
+
+
+def test_synonyms_and_stop_words_like_the_regex_engine():
+    tknz = _tokenizer(
+        stopwords=["для", "и", "под ключ"],
+        synonyms=[("веб сайт", "сайт"), ("интернет магазин", "магазин"), ("лендинг", "сайт"), ("сайт визитка", "визитка")],
+    )
+    assert tknz._use_matcher
+    texts = ["Веб сайт и интернет магазин под ключ", "лендинг для клиники", "сайт визитка веб сайт", ""]
+    matched, patterns = _both(tknz, texts)
+    assert matched == patterns
+    assert matched[0] == ["сайт", "магазин"]
+
+
+def test_first_stop_word_in_the_list_wins():
+    tknz = _tokenizer(stopwords=["под", "под ключ"])
+    matched, patterns = _both(tknz, ["сайт под ключ"])
+    assert matched == patterns == [["сайт", "ключ"]]
+
+
+def test_cascading_groups_fall_back_to_the_regex_engine():
+    # Groups apply in the order of their replacements: "ресурс" is rewritten by the "сайт" group
+    tknz = _tokenizer(synonyms=[("веб сайт", "ресурс"), ("ресурс", "сайт")])
+    assert not tknz._use_matcher
+    assert tknz.tokenization(["веб сайт"]) == [["сайт"]]
+
+
+def test_random_dictionaries_give_the_same_output():
+    rnd = random.Random(7)
+    words = ["".join(rnd.choice("абвгдеклмнор") for _ in range(rnd.randint(2, 4))) for _ in range(60)]
+    stop_words, words = words[:15], words[15:]
+    targets = [w.upper() for w in words[:10]]
+
+    def phrase(vocabulary):
+        return " ".join(rnd.choice(vocabulary) for _ in range(rnd.choice((1, 1, 2, 3))))
+
+    for _ in range(20):
+        tknz = _tokenizer(
+            stopwords=[phrase(stop_words) for _ in range(5)],
+            synonyms=[(phrase(words[10:]), rnd.choice(targets)) for _ in range(15)],
+        )
+        texts = [" ".join(rnd.choice(words + stop_words) for _ in range(30)) for _ in range(3)]
+        matched, patterns = _both(tknz, texts)
+        assert matched == patterns
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from src.domain.deadline import DeadlineExceeded, budget, deadline, no_deadline, remaining, within_deadline
+
+
+def test_no_deadline_by_default():
+    assert remaining() is None
+    assert budget(5.0) == 5.0
+
+
+def test_budget_is_capped_by_the_deadline():
+    with deadline(1.0):
+        assert 0.9 < remaining() <= 1.0
+        assert budget(5.0) <= 1.0
+        assert budget(0.5) == 0.5
+    assert remaining() is None
+
+
+def test_nested_deadline_never_extends_the_outer_one():
+    with deadline(0.5) as outer:
+        with deadline(10.0) as inner:
+            assert inner == outer
+        with deadline(0.1) as inner:
+            assert inner < outer
+
+
+def test_deadline_none_keeps_the_current_one():
+    with deadline(1.0) as outer:
+        with deadline(None) as inner:
+            assert inner == outer
+
+
+def test_no_deadline_lifts_the_deadline_for_the_block():
+    with deadline(1.0):
+        with no_deadline():
+            assert remaining() is None
+        assert remaining() is not None
+
+
+@pytest.mark.anyio
+async def test_within_deadline_cancels_the_awaitable():
+    with deadline(0.01):
+        with pytest.raises(DeadlineExceeded):
+            await within_deadline(asyncio.sleep(1))
+
+
+@pytest.mark.anyio
+async def test_within_deadline_without_deadline_just_awaits():
+    assert await within_deadline(asyncio.sleep(0, "done")) == "done"
+
+
+@pytest.mark.anyio
+async def test_within_exhausted_deadline_fails_without_starting():
+    started = False
+
+    async def work():
+        nonlocal started
+        started = True
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            await within_deadline(work())
+    assert not started
+
+
+@pytest.mark.anyio
+async def test_spawned_tasks_inherit_the_deadline():
+    with deadline(1.0):
+        left = await asyncio.create_task(_remaining())
+    assert left is not None and left <= 1.0
+
+
+async def _remaining():
+    return remaining()
@@ -0,0 +1,76 @@
+import json
+import pytest
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.infrastructure.api.decoding import PROJECT_FIELDS, SERVICE_FIELDS, _select_results, _skip, decode_projects, decode_services, select_results
+
+VECTOR = [0.125] * 200
+
+
+def _body(results, **extra) -> bytes:
+    return json.dumps({"results": results, **extra}, ensure_ascii=False).encode()
+
+
+def _expected(results, fields):
+    return [{k: v for k, v in item.items() if k in fields} for item in results]
+
+
+RESULTS = [
+    {
+        "title": f"Проект {i}",
+        "url": f"https://example.com/{i}",
+        "full_text": 'Текст с "кавычками", \\ и é ' * 3,
+        "vector": VECTOR,
+        "meta": {"tags": ["a", "b"], "nested": [[1, 2], {"x": "]"}]},
+        "score": 0.5,
+    }
+    for i in range(3)
+]
+
+
+def test_scanner_selects_only_the_fields():
+    body = _body(RESULTS)
+    # Vectors and metadata are worth skipping: scanned, not loaded
+    assert _select_results(body.decode(), PROJECT_FIELDS) is not None
+    assert select_results(body, PROJECT_FIELDS) == _expected(RESULTS, PROJECT_FIELDS)
+
+
+def test_scanner_handles_whitespace_and_members_around_results():
+    body = json.dumps({"took": 3, "results": RESULTS, "next": None}, indent=2, ensure_ascii=False).encode()
+    assert select_results(body, PROJECT_FIELDS) == _expected(RESULTS, PROJECT_FIELDS)
+
+
+def test_projected_body_is_loaded_with_json():
+    results = [{"title": "a", "url": None, "full_text": "b"}]
+    assert _select_results(_body(results).decode(), PROJECT_FIELDS) is None
+    assert select_results(_body(results), PROJECT_FIELDS) == results
+
+
+@pytest.mark.parametrize("body", [b'{"results": []}', b"{}", b' { "results" : [ ] } '])
+def test_empty_results(body):
+    assert select_results(body, PROJECT_FIELDS) == []
+
+
+def test_malformed_body_raises_json_error():
+    with pytest.raises(json.JSONDecodeError):
+        select_results(b'{"results": [{"title": "a", "vector": [1, 2', PROJECT_FIELDS)
+
+
+@pytest.mark.parametrize("value", ['"plain"', r'"esc \" aped"', r'"ends with \\"', "[1, 2, 3]", '[1, ["]"], 2]', '{"a": [1]}', "12.5", "null"])
+def test_skip_steps_over_one_value(value):
+    text = value + ",1"
+    assert _skip(text, 0) == len(value)
+
+
+def test_decode_projects_builds_entities_with_snippets():
+    results = [{"title": "Сайт", "url": "u", "full_text": "Разработка сайта. " * 50, "vector": VECTOR}] * 2
+    entities = decode_projects(_body(results), {"query": "сайт"})["results"]
+    assert all(isinstance(e, ProjectEntity) for e in entities)
+    assert entities[0].title == "Сайт" and entities[0].stale_age is None
+    assert len(entities[0].description) < len(results[0]["full_text"])
+
+
+def test_decode_services_builds_entities():
+    results = [{"service": "Хостинг", "price": 100, "full_text": "x", "vector": VECTOR}] * 2
+    entities = decode_services(_body(results), {"query": "хостинг"})["results"]
+    assert entities[0] == ServiceEntity(name="Хостинг", price=100.0, description="x")
+    assert select_results(_body(results), SERVICE_FIELDS) == _expected(results, SERVICE_FIELDS)
@@ -0,0 +1,105 @@
+import threading
+import pytest
+from src.infrastructure.cache.embedding_cache import CachedEmbeddingClient, EmbeddingCache
+
+DIM = 8
+
+
+def _vector(i: int):
+    return [float(i + d) for d in range(DIM)]
+
+
+def test_vectors_survive_a_restart(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("Сайт клиники", _vector(1))
+    cache.close()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert reopened.recall("сайт клиники") is None
+    assert reopened.get("  САЙТ клиники ") == _vector(1)
+    assert reopened.recall("сайт клиники") == _vector(1)
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get("другой") is None and reopened.misses == 1
+    reopened.close()
+
+
+def test_workers_see_each_others_vectors(tmp_path):
+    first = EmbeddingCache(str(tmp_path))
+    second = EmbeddingCache(str(tmp_path))
+    first.put("a", _vector(1))
+    assert second.get("a") == _vector(1)
+    first.close()
+    second.close()
+
+
+def test_memory_tier_keeps_float32_arrays(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.remember("a", [0.1] * DIM)
+    stored = cache._memory["a"]
+    assert stored.typecode == "f" and stored.itemsize * len(stored) == 4 * DIM
+
+    vector = cache.recall("a")
+    assert vector == stored.tolist() and vector == pytest.approx([0.1] * DIM)
+    # Callers get their own list
+    vector[0] = 1.0
+    assert cache.recall("a")[0] == pytest.approx(0.1)
+    cache.close()
+
+
+def test_compaction_keeps_the_newest_vectors_byte_for_byte(tmp_path):
+    size = DIM * 4
+    cache = EmbeddingCache(str(tmp_path), memory_entries=1, max_disk_bytes=10 * size, compact_ratio=0.5)
+    for i in range(11):
+        cache.put(f"text {i}", _vector(i))
+    stats = cache.stats()
+    assert stats["compactions"] == 1 and stats["generation"] == 1
+    assert stats["disk_entries"] == 5 and stats["disk_bytes"] == 5 * size
+    reopened = EmbeddingCache(str(tmp_path))
+    assert [reopened.get(f"text {i}") for i in range(6, 11)] == [_vector(i) for i in range(6, 11)]
+    assert reopened.get("text 5") is None
+    cache.close()
+    reopened.close()
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_embedding(self, text):
+        self.calls += 1
+        return _vector(len(text))
+
+
+@pytest.mark.anyio
+async def test_client_writes_to_disk_off_the_event_loop(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    threads = []
+    store = cache.store
+
+    def recording_store(text, vector):
+        threads.append(threading.current_thread())
+        store(text, vector)
+
+    cache.store = recording_store
+    client = CachedEmbeddingClient(FakeEmbeddings(), cache)
+    assert await client.get_embedding("сайт") == _vector(4)
+    # Answered from memory while the write may still be pending
+    assert await client.get_embedding("Сайт") == _vector(4)
+    assert client.client.calls == 1
+    await client.shutdown()
+    assert threads and threads[0] is not threading.main_thread()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert reopened.get("сайт") == _vector(4)
+    reopened.close()
+
+
+@pytest.mark.anyio
+async def test_client_reads_disk_hits_without_calling_the_service(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("сайт", _vector(1))
+    cache.close()
+    client = CachedEmbeddingClient(FakeEmbeddings(), EmbeddingCache(str(tmp_path)))
+    assert await client.get_embedding("сайт") == _vector(1)
+    assert client.client.calls == 0
+    await client.shutdown()
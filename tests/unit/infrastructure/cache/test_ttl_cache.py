@@ -0,0 +1,106 @@
+import pytest
+from src.domain.entities import ProjectEntity
+from src.domain.interfaces import IKnowledgeBase
+from src.infrastructure.cache.cached_knowledge_base import CachedKnowledgeBase, normalize_query
+from src.infrastructure.cache.ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = TTLCache(ttl=10, max_entries=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1 and len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_bound():
+    cache = TTLCache(ttl=60, max_entries=10, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxx")
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 8
+    # Larger than the whole cache: not stored, nothing evicted for it
+    cache.set("d", "x" * 11)
+    assert cache.get("d") is None and len(cache) == 2
+
+
+def test_overwrite_replaces_size_and_ttl():
+    clock = Clock()
+    cache = TTLCache(ttl=10, max_entries=10, max_bytes=100, sizeof=len, clock=clock)
+    cache.set("a", "xxxx")
+    clock.now = 5
+    cache.set("a", "xx")
+    clock.now = 12
+    assert cache.get("a") == "xx"
+    assert cache.stats()["bytes"] == 2
+
+
+def test_hit_and_miss_counts():
+    cache = TTLCache(ttl=60, max_entries=10)
+    cache.get("a")
+    cache.set("a", 1)
+    cache.get("a")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+class CountingKnowledgeBase(IKnowledgeBase):
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    async def search_projects(self, query, limit=3):
+        self.calls += 1
+        return self.results
+
+    async def search_services(self, query, limit=5):
+        self.calls += 1
+        return self.results
+
+
+def test_normalize_query():
+    assert normalize_query("  Разработка\tСАЙТА ") == "разработка сайта"
+
+
+@pytest.mark.anyio
+async def test_knowledge_base_results_are_cached_by_normalized_query():
+    kb = CountingKnowledgeBase([ProjectEntity(title="Сайт", description="...")])
+    cached = CachedKnowledgeBase(kb, ttl=60, max_entries=10)
+    first = await cached.search_projects("Сайт", 3)
+    assert await cached.search_projects(" сайт ", 3) == first
+    assert kb.calls == 1
+    await cached.search_projects("сайт", 5)
+    assert kb.calls == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("results", [[], [ProjectEntity(title="Сайт", description="...", stale_age=30.0)]])
+async def test_empty_and_stale_results_are_not_cached(results):
+    kb = CountingKnowledgeBase(results)
+    cached = CachedKnowledgeBase(kb, ttl=60, max_entries=10)
+    await cached.search_projects("сайт")
+    await cached.search_projects("сайт")
+    assert kb.calls == 2
@@ -0,0 +1,81 @@
+import pytest
+from src.infrastructure.concurrency.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock: Clock) -> CircuitBreaker:
+    return CircuitBreaker("gateway", failure_threshold=3, reset_timeout=10.0, clock=clock)
+
+
+def _trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures():
+    breaker = _breaker(Clock())
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    assert breaker.stats()["trips"] == 1 and breaker.rejected == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = _breaker(Clock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_lets_a_single_probe_through():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now = 10.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_probe_opens_the_circuit_again():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2
+    assert breaker.retry_in() == 10.0
+
+
+def test_cancelled_probe_frees_the_probe_slot():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.record_cancel()
+    assert breaker.state == HALF_OPEN and breaker.allow()
+
+
+def test_check_raises_while_open():
+    clock = Clock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.now = 4.0
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check()
+    assert error.value.retry_in == 6.0
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from src.infrastructure.concurrency.hedging import Hedger, LatencyTracker
+
+pytestmark = pytest.mark.anyio
+
+
+def _attempts(*delays: float):
+    """fn for Hedger.run whose n-th attempt answers its index after delays[n]."""
+    started = []
+
+    async def fn():
+        index = len(started)
+        started.append(index)
+        await asyncio.sleep(delays[index])
+        return index
+
+    return fn, started
+
+
+async def test_fast_call_is_not_hedged():
+    hedger = Hedger(delay=0.05, max_ratio=1.0, burst=1.0)
+    fn, started = _attempts(0.0)
+    assert await hedger.run(fn) == 0
+    assert started == [0] and hedger.hedged == 0
+
+
+async def test_slow_call_is_hedged_and_the_faster_attempt_wins():
+    hedger = Hedger(delay=0.01, max_ratio=1.0, burst=1.0)
+    fn, started = _attempts(1.0, 0.0)
+    assert await hedger.run(fn) == 1
+    assert hedger.stats()["hedged"] == 1 and hedger.hedge_wins == 1
+
+
+async def test_primary_can_still_win_after_the_hedge_started():
+    hedger = Hedger(delay=0.01, max_ratio=1.0, burst=1.0)
+    fn, _ = _attempts(0.02, 1.0)
+    assert await hedger.run(fn) == 0
+    assert hedger.hedged == 1 and hedger.hedge_wins == 0
+
+
+async def test_hedges_stay_within_the_budget():
+    hedger = Hedger(delay=0.001, max_ratio=0.5, burst=1.0)
+    for _ in range(4):
+        fn, _ = _attempts(0.01, 0.01)
+        await hedger.run(fn)
+    # The budget grows by 0.5 per call: every second call may be hedged
+    assert hedger.hedged == 2 and hedger.over_budget == 2
+
+
+async def test_failed_attempt_falls_back_to_the_other():
+    hedger = Hedger(delay=0.01, max_ratio=1.0, burst=1.0)
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.02)
+            raise ConnectionError("reset")
+        await asyncio.sleep(0.05)
+        return "hedge"
+
+    assert await hedger.run(fn) == "hedge"
+
+
+async def test_no_adaptive_hedging_before_min_samples():
+    hedger = Hedger(min_samples=3)
+    assert hedger.delay() is None
+    for _ in range(3):
+        fn, _ = _attempts(0.0)
+        await hedger.run(fn)
+    assert hedger.delay() == hedger.min_delay
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100, refresh_every=1)
+    assert tracker.percentile(0.5) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(0.5) == pytest.approx(0.051)
+    assert tracker.percentile(0.99) == pytest.approx(0.1)
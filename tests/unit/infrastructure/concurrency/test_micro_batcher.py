@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from src.infrastructure.concurrency.micro_batcher import MicroBatcher
+
+pytestmark = pytest.mark.anyio
+
+
+class Recorder:
+    """process() of the batcher: doubles every key, after delay seconds, or raises error."""
+
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.batches = []
+        self.cancelled = False
+
+    async def __call__(self, keys):
+        self.batches.append(list(keys))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return [key * 2 for key in keys]
+
+
+async def test_window_flushes_a_partial_batch():
+    process = Recorder()
+    batcher = MicroBatcher(process, window=0.02, max_batch=10)
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(3))), 1)
+    assert results == [0, 2, 4]
+    assert process.batches == [[0, 1, 2]]
+    assert batcher.stats()["batch_sizes"] == {3: 1}
+
+
+async def test_full_batch_is_sent_without_waiting_for_the_window():
+    process = Recorder()
+    batcher = MicroBatcher(process, window=10, max_batch=2)
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), 1)
+    assert results == [0, 2, 4, 6]
+    assert process.batches == [[0, 1], [2, 3]]
+
+
+async def test_duplicate_keys_share_one_slot():
+    process = Recorder()
+    batcher = MicroBatcher(process, window=0.01, max_batch=10)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), batcher.submit(1), batcher.submit(1))
+    assert results == [2, 4, 2, 2]
+    assert process.batches == [[1, 2]]
+    assert batcher.stats()["items"] == 4 and batcher.stats()["mean_batch_size"] == 2
+
+
+async def test_batch_failure_reaches_every_waiter():
+    process = Recorder(error=RuntimeError("vectorizer down"))
+    batcher = MicroBatcher(process, window=0.01, max_batch=10)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), batcher.submit(2), return_exceptions=True)
+    assert [str(r) for r in results] == ["vectorizer down"] * 3
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_cancelled_waiter_does_not_cancel_the_shared_batch():
+    process = Recorder(delay=0.05)
+    batcher = MicroBatcher(process, window=0.01, max_batch=10)
+    impatient = asyncio.ensure_future(batcher.submit(1))
+    patient = asyncio.ensure_future(batcher.submit(1))
+    other = asyncio.ensure_future(batcher.submit(2))
+    await asyncio.sleep(0.03)
+    impatient.cancel()
+    assert await patient == 2 and await other == 4
+    assert impatient.cancelled()
+    assert process.batches == [[1, 2]] and not process.cancelled
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from src.infrastructure.concurrency.single_flight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_with_one_key_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("q", fetch) for _ in range(5)))
+    assert results == [1] * 5
+    assert flight.stats() == {"started": 1, "coalesced": 4, "in_flight": 0}
+
+
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert await asyncio.gather(flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b"))) == ["a", "b"]
+    assert flight.started == 2
+
+
+async def test_finished_call_is_not_reused():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.do("q", fetch) == 1
+    assert await flight.do("q", fetch) == 2
+    assert len(flight) == 0
+
+
+async def test_every_waiter_receives_the_exception():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("gateway down")
+
+    results = await asyncio.gather(flight.do("q", fail), flight.do("q", fail), return_exceptions=True)
+    assert [type(r) for r in results] == [ValueError, ValueError]
+
+
+async def test_cancelled_waiter_leaves_the_call_to_the_others():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("q", fetch))
+    second = asyncio.ensure_future(flight.do("q", fetch))
+    await started.wait()
+    first.cancel()
+    assert await second == "done"
+    assert first.cancelled()
+
+
+async def test_call_is_cancelled_when_the_last_waiter_leaves():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.ensure_future(flight.do("q", fetch))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    # A new caller starts a fresh call instead of joining the dying one
+    assert len(flight) == 0
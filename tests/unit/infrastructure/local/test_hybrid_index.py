@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from src.infrastructure.local.hybrid_index import HybridIndex, tokenize
+
+TEXTS = [
+    "разработка сайта для клиники",
+    "интернет магазин одежды",
+    "сайт магазина и доставка",
+    "мобильное приложение",
+]
+VECTORS = np.array([[1, 0, 0], [0, 1, 0], [0.6, 0.8, 0], [0, 0, 3]], dtype=np.float32)
+
+
+def _bm25(texts, query, k1=1.2, b=0.75):
+    """Plain BM25 as a reference for the CSR index."""
+    docs = [tokenize(t) for t in texts]
+    average = sum(len(d) for d in docs) / len(docs)
+    scores = []
+    for doc in docs:
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in d for d in docs)
+            tf = doc.count(term)
+            if tf:
+                idf = np.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / average))
+        scores.append(score)
+    return np.array(scores)
+
+
+def test_bm25_matches_the_reference():
+    index = HybridIndex.build(TEXTS)
+    for query in ("сайт магазина", "магазин", "доставка сайта клиники"):
+        np.testing.assert_allclose(index.bm25(tokenize(query)), _bm25(TEXTS, query), rtol=1e-5)
+
+
+def test_keyword_search_only_returns_documents_with_a_query_term():
+    index = HybridIndex.build(TEXTS, VECTORS)
+    hits = index.search("магазин", [1, 0, 0], limit=10, alpha=0.0)
+    assert [doc for doc, _ in hits] == [1]
+    assert hits[0][1] == pytest.approx(1.0)
+
+
+def test_vector_search_ranks_by_cosine():
+    index = HybridIndex.build(TEXTS, VECTORS)
+    assert [doc for doc, _ in index.search("", [0, 0, 1], limit=2, alpha=1.0)] == [3, 0]
+    # Vectors are normalized: the length of [0, 0, 3] doesn't matter
+    assert index.cosine([0, 0, 1])[3] == pytest.approx(1.0)
+
+
+def test_hybrid_scores_fuse_both_rankings():
+    index = HybridIndex.build(TEXTS, VECTORS)
+    hits = dict(index.search("сайт", [0, 1, 0], limit=4, alpha=0.5))
+    # Document 2 has the keyword and is close to the vector
+    assert max(hits, key=hits.get) == 2
+    assert all(0.0 <= score <= 1.0 for score in hits.values())
+
+
+def test_unusable_vector_falls_back_to_keywords():
+    index = HybridIndex.build(TEXTS, VECTORS)
+    for vector in (None, [0, 0, 0], [1, 0]):
+        assert index.search("сайт", vector, limit=5, alpha=0.9) == index.search("сайт", None, limit=5, alpha=0.0)
+
+
+def test_limit_and_empty_index():
+    index = HybridIndex.build(TEXTS, VECTORS)
+    assert len(index.search("", [1, 1, 1], limit=2, alpha=1.0)) == 2
+    assert index.search("сайт", None, limit=0) == []
+    assert HybridIndex.build([]).search("сайт", None, limit=3) == []
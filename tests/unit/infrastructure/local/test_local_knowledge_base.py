@@ -0,0 +1,63 @@
+import pytest
+from src.infrastructure.local.local_knowledge_base import LocalKnowledgeBase
+from src.infrastructure.nlp.query_preparer import QueryPreparer
+
+pytestmark = pytest.mark.anyio
+
+PROJECTS = [
+    {"title": "Клиника", "url": "https://example.com/1", "full_text": "Сайт для клиники.", "lemmatized_text": "сайт для клиника",
+     "vector": [1.0, 0.0]},
+    {"title": "Магазин", "url": "https://example.com/2", "full_text": "Интернет-магазин одежды.", "lemmatized_text": "интернет магазин одежда",
+     "vector": [0.0, 1.0]},
+]
+PRICES = [{"service": "Хостинг", "price": 1500, "lemmatized_service": "хостинг"}]
+
+
+class FakeLemmatizer:
+    async def lemmatize(self, text: str) -> str:
+        return text.lower()
+
+    async def shutdown(self) -> None:
+        pass
+
+
+class FakeEmbeddings:
+    """Embedding client whose service is down when vector is None."""
+
+    def __init__(self, vector=None):
+        self.vector = vector
+        self.calls = 0
+
+    async def get_embedding(self, text: str):
+        self.calls += 1
+        return self.vector
+
+
+def _kb(embeddings: FakeEmbeddings, alpha: float = 0.5, projects=PROJECTS) -> LocalKnowledgeBase:
+    kb = LocalKnowledgeBase("unused.json", QueryPreparer(FakeLemmatizer(), embeddings), alpha=alpha)
+    kb.index([dict(p) for p in projects], [dict(p) for p in PRICES])
+    return kb
+
+
+async def test_hybrid_search_uses_the_query_vector():
+    embeddings = FakeEmbeddings([0.0, 1.0])
+    projects = await _kb(embeddings, alpha=0.9).search_projects("сайт", limit=2)
+    # The vector outweighs the single keyword hit
+    assert [p.title for p in projects] == ["Магазин", "Клиника"]
+    assert embeddings.calls == 1
+
+
+async def test_unavailable_embedding_service_falls_back_to_keywords():
+    embeddings = FakeEmbeddings(None)
+    projects = await _kb(embeddings).search_projects("клиника")
+    assert [p.title for p in projects] == ["Клиника"]
+    assert embeddings.calls == 1
+
+
+@pytest.mark.parametrize("alpha, projects", [(0.0, PROJECTS), (0.5, [{k: v for k, v in p.items() if k != "vector"} for p in PROJECTS])])
+async def test_keyword_only_search_does_not_call_the_embedding_service(alpha, projects):
+    embeddings = FakeEmbeddings([1.0, 0.0])
+    kb = _kb(embeddings, alpha=alpha, projects=projects)
+    assert [p.title for p in await kb.search_projects("магазин")] == ["Магазин"]
+    assert [s.name for s in await kb.search_services("хостинг")] == ["Хостинг"]
+    assert embeddings.calls == 0
@@ -0,0 +1,57 @@
+import os
+import numpy as np
+from src.infrastructure.local.hybrid_index import HybridIndex
+from src.infrastructure.local.snapshot import Snapshot, is_snapshot, write_snapshot
+from src.infrastructure.nlp.snippets import sentence_offsets
+
+PROJECTS = [
+    {"title": "Сайт клиники", "url": "https://example.com/1", "full_text": "Первое. Второе предложение!"},
+    {"title": "Магазин", "url": None, "full_text": ""},
+]
+PRICES = [
+    {"service": "Хостинг", "description": None, "full_text": "хостинг сайта", "price": 990.5},
+    {"service": "Дизайн", "description": "Макеты", "full_text": "дизайн макетов", "price": 15000},
+]
+
+
+def _write(path: str) -> None:
+    project_index = HybridIndex.build([p["full_text"] for p in PROJECTS], np.eye(2, 3, dtype=np.float32))
+    price_index = HybridIndex.build([p["full_text"] for p in PRICES])
+    write_snapshot(path, PROJECTS, PRICES, project_index, price_index, source="test")
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "kb")
+    _write(path)
+    assert is_snapshot(path)
+
+    snapshot = Snapshot(path)
+    assert snapshot.manifest["source"] == "test"
+    assert len(snapshot.projects) == 2 and len(snapshot.prices) == 2
+    for i, project in enumerate(PROJECTS):
+        for field in ("title", "url", "full_text"):
+            assert snapshot.projects[i].get(field) == project[field]
+        assert snapshot.projects.value("sentences", i) == sentence_offsets(project["full_text"])
+    assert snapshot.prices[0].get("description", "-") == "-"
+    assert snapshot.prices[1].get("price") == 15000.0
+
+
+def test_reopened_index_searches_like_the_built_one(tmp_path):
+    path = str(tmp_path / "kb")
+    _write(path)
+    built = HybridIndex.build([p["full_text"] for p in PRICES])
+    opened = Snapshot(path).prices.index()
+    assert opened.search("хостинг", None, limit=2) == built.search("хостинг", None, limit=2)
+    assert opened.vectors is None
+    vectors = Snapshot(path).projects.index().vectors
+    assert isinstance(vectors, np.memmap) and vectors.shape == (2, 3)
+
+
+def test_rewrite_swaps_the_snapshot(tmp_path):
+    path = str(tmp_path / "kb")
+    _write(path)
+    old = Snapshot(path)
+    _write(path)
+    # The old mapping stays readable, no temporary directories are left behind
+    assert old.projects[0].get("title") == "Сайт клиники"
+    assert os.listdir(tmp_path) == ["kb"]
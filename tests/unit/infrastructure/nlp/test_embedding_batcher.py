@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from src.infrastructure.nlp.embedding_batcher import EmbeddingBatcher
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeEmbeddingClient:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+        self.closed = False
+
+    async def get_embeddings(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("vectorizer down")
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def shutdown(self) -> None:
+        self.closed = True
+
+
+async def test_concurrent_texts_are_embedded_in_one_request():
+    client = FakeEmbeddingClient()
+    batcher = EmbeddingBatcher(client, window=0.01, max_batch=8)
+    vectors = await asyncio.gather(*(batcher.get_embedding(text) for text in ["сайт", "хостинг", "сайт"]))
+    assert vectors == [[4.0, 1.0], [7.0, 1.0], [4.0, 1.0]]
+    assert client.batches == [["сайт", "хостинг"]]
+
+
+async def test_max_batch_splits_requests():
+    client = FakeEmbeddingClient()
+    batcher = EmbeddingBatcher(client, window=10, max_batch=2)
+    texts = ["a", "bb", "ccc"]
+    tasks = [asyncio.ensure_future(batcher.get_embedding(text)) for text in texts]
+    await asyncio.sleep(0.01)
+    # The first two are sent at once, the third waits for its window
+    assert client.batches == [["a", "bb"]]
+    await batcher.shutdown()
+    assert client.closed
+    assert [t.result() for t in tasks[:2]] == [[1.0, 1.0], [2.0, 1.0]]
+    with pytest.raises(asyncio.CancelledError):
+        await tasks[2]
+
+
+async def test_failed_batch_gives_every_caller_no_vector():
+    client = FakeEmbeddingClient(fail=True)
+    batcher = EmbeddingBatcher(client, window=0.01, max_batch=8)
+    assert await asyncio.gather(batcher.get_embedding("a"), batcher.get_embedding("b")) == [None, None]
+    assert client.batches == [["a", "b"]]
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.infrastructure.nlp.lemmatizer import AsyncLemmatizer, lemmatizer_key
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeMystem:
+    """lemmatize_batch of the lemmatizer: drops a trailing "ы" of every word, fails while broken."""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self.broken = False
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        if self.broken:
+            raise TypeError("mystem died")
+        return [[word.removesuffix("ы") for word in text.split()] for text in texts]
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mystem")
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_key_ignores_case_punctuation_and_spacing():
+    assert lemmatizer_key("  Сайты,  для КЛИНИК! ") == "сайты для клиник"
+
+
+async def test_repeated_query_is_served_from_the_cache(executor):
+    mystem = FakeMystem()
+    lemmatizer = AsyncLemmatizer(mystem, executor, window=0.001)
+    assert await lemmatizer.lemmatize("Сайты клиник") == "сайт клиник"
+    assert await lemmatizer.lemmatize("сайты, клиник!") == "сайт клиник"
+    assert mystem.calls == [["сайты клиник"]]
+    assert lemmatizer.stats()["cache"]["hits"] == 1
+
+
+async def test_concurrent_misses_share_one_call_on_the_executor(executor):
+    mystem = FakeMystem()
+    lemmatizer = AsyncLemmatizer(mystem, executor, window=0.01)
+    results = await asyncio.gather(*(lemmatizer.lemmatize(q) for q in ["сайты", "магазины", "Сайты"]))
+    assert results == ["сайт", "магазин", "сайт"]
+    assert mystem.calls == [["сайты", "магазины"]]
+    assert len(mystem.threads) == 1 and mystem.threads.pop().startswith("mystem")
+
+
+async def test_failure_falls_back_to_the_raw_text_without_caching_it(executor):
+    mystem = FakeMystem()
+    mystem.broken = True
+    lemmatizer = AsyncLemmatizer(mystem, executor, window=0.001)
+    assert await lemmatizer.lemmatize("Сайты клиник") == "Сайты клиник"
+    assert len(lemmatizer.cache) == 0
+
+    mystem.broken = False
+    assert await lemmatizer.lemmatize("Сайты клиник") == "сайт клиник"
+    assert len(mystem.calls) == 2
+
+
+async def test_short_result_is_a_failure(executor):
+    lemmatizer = AsyncLemmatizer(lambda texts: [], executor, window=0.001)
+    assert await lemmatizer.lemmatize("сайты") == "сайты"
+    assert len(lemmatizer.cache) == 0
@@ -0,0 +1,57 @@
+from src.infrastructure.nlp.snippets import ELLIPSIS, extract_snippet, find_terms, query_stems, sentence_offsets, stem
+
+FILLER = "Компания работает на рынке много лет и ценит своих клиентов. " * 10
+TARGET = "Мы сделали интернет-магазин для сети клиник с онлайн-записью. "
+TEXT = FILLER + TARGET + FILLER
+
+
+def test_stems_match_inflected_forms():
+    assert stem("сайтов") == stem("сайта") == "сайт"
+    assert stem("Ёлка") == "елк"
+
+
+def test_query_stems_skip_stop_words_numbers_and_short_words():
+    # Longest first, at most STEM_LENGTH letters
+    assert query_stems("сайт для 2 клиник и магазинов, сайты") == ("клиник", "магази", "сайт")
+
+
+def test_find_terms_matches_word_starts_only():
+    text = "Сайты, веб-сайт и пересайт."
+    assert [text[s:e] for s, e, _ in find_terms(text, ("сайт",))] == ["Сайты", "сайт"]
+
+
+def test_sentence_offsets():
+    text = "Первое. Второе! Третье\nЧетвертое"
+    assert [text[i:i + 3] for i in sentence_offsets(text)] == ["Пер", "Вто", "Тре", "Чет"]
+
+
+def test_snippet_is_the_passage_with_the_query_words():
+    snippet = extract_snippet(TEXT, "интернет-магазины клиники", 120)
+    assert snippet.startswith(ELLIPSIS)
+    assert "**магазин**" in snippet and "**клиник**" in snippet
+    assert len(snippet) <= 120 + 2 * len(ELLIPSIS) + 4 * len("**")
+
+
+def test_snippet_without_highlight():
+    snippet = extract_snippet(TEXT, "клиники", 120, highlight=False)
+    assert "**" not in snippet and "клиник" in snippet
+
+
+def test_snippet_without_match_is_the_lead():
+    snippet = extract_snippet(TEXT, "хостинг", 50)
+    assert TEXT.startswith(snippet.rstrip(ELLIPSIS)) and snippet.endswith(ELLIPSIS)
+    assert extract_snippet(TEXT, "", 50) == snippet
+
+
+def test_short_text_is_kept_whole():
+    assert extract_snippet("Сайт клиники.", "клиника", 200) == "Сайт **клиники**."
+    assert extract_snippet("", "сайт") == ""
+
+
+def test_snippet_does_not_cut_words():
+    snippet = extract_snippet(TEXT, "хостинг", 47)
+    assert snippet.rstrip(ELLIPSIS).split()[-1] in TEXT.split()
+
+
+def test_precomputed_offsets_give_the_same_snippet():
+    assert extract_snippet(TEXT, "клиники", 120, offsets=sentence_offsets(TEXT)) == extract_snippet(TEXT, "клиники", 120)
@@ -0,0 +1,50 @@
+import pytest
+from src.infrastructure.observability.metrics import Counter, Gauge, Histogram, Registry, _Metric
+
+
+def test_exposition_format():
+    registry = Registry()
+    errors = Counter("errors_total", "Errors", ["endpoint", "type"], registry=registry)
+    in_flight = Gauge("in_flight", "In flight", registry=registry)
+    latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1), registry=registry)
+    errors.labels("/search", 'Time"out').inc()
+    in_flight.inc(3)
+    in_flight.dec()
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    assert registry.render().splitlines() == [
+        "# HELP errors_total Errors",
+        "# TYPE errors_total counter",
+        'errors_total{endpoint="/search",type="Time\\"out"} 1',
+        "# HELP in_flight In flight",
+        "# TYPE in_flight gauge",
+        "in_flight 2",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 2',
+        "latency_seconds_sum 0.55",
+        "latency_seconds_count 2",
+    ]
+
+
+def test_callback_gauge_is_read_at_scrape_time():
+    registry = Registry()
+    Gauge("entries", "Entries", callback=lambda: 7, registry=registry)
+    assert "entries 7" in registry.render()
+
+
+def test_label_count_and_duplicate_names_are_checked():
+    registry = Registry()
+    counter = Counter("calls_total", "Calls", ["tool"], registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+    with pytest.raises(ValueError):
+        Counter("calls_total", "Calls", registry=registry)
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric("base", "Base", registry=None)
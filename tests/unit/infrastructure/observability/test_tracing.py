@@ -0,0 +1,45 @@
+import io
+import json
+import sys
+from src.config.settings import settings
+from src.infrastructure.observability import tracing
+from src.infrastructure.observability.tracing import JsonLinesExporter, Tracer, current_span
+
+
+def test_spans_nest_and_export_as_json_lines():
+    stream = io.StringIO()
+    tracer = Tracer(JsonLinesExporter(stream), sample_rate=1.0)
+    with tracer.span("tool", tool="search") as root:
+        with tracer.span("gateway.request") as child:
+            assert current_span() is child
+            child.set("status", 200)
+        assert current_span() is root
+    assert current_span() is None
+
+    child_line, root_line = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert child_line["parent_id"] == root_line["span_id"]
+    assert child_line["trace_id"] == root_line["trace_id"]
+    assert child_line["attributes"] == {"status": 200}
+    assert root.traceparent() == f"00-{root.trace_id}-{root.span_id}-01"
+
+
+def test_unsampled_spans_are_not_exported():
+    stream = io.StringIO()
+    tracer = Tracer(JsonLinesExporter(stream), sample_rate=0.0)
+    with tracer.span("tool"):
+        with tracer.span("render"):
+            pass
+    assert stream.getvalue() == ""
+
+
+def test_disabled_tracer_returns_noop_spans():
+    with Tracer().span("tool") as noop:
+        noop.set("key", "value")
+        assert current_span() is None
+
+
+def test_default_exporter_keeps_stdout_clean(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", type(settings).model_fields["TRACING_EXPORTER"].default)
+    assert tracing.get_tracer().exporter.stream is sys.stderr
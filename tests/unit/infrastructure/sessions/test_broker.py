@@ -0,0 +1,151 @@
+import asyncio
+import pytest
+from src.infrastructure.sessions.broker import BrokerClient, BrokerError, BrokerServer, parse_url
+
+pytestmark = pytest.mark.anyio
+
+
+class Inbox:
+    """on_message of a client: collects channel messages."""
+
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, channel, data) -> None:
+        self.messages.append((channel, data))
+
+
+async def _eventually(condition, timeout: float = 2.0) -> None:
+    """Wait until condition(), a plain or a coroutine function, holds."""
+    async def holds() -> bool:
+        result = condition()
+        return await result if asyncio.iscoroutine(result) else result
+
+    async def wait() -> None:
+        while not await holds():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(wait(), timeout)
+
+
+@pytest.fixture
+async def broker(tmp_path):
+    url = f"unix://{tmp_path / 'broker.sock'}"
+    server = BrokerServer()
+    listener = await server.serve(url)
+    yield url, server
+    listener.close()
+    await listener.wait_closed()
+
+
+@pytest.fixture
+async def connect(broker):
+    url, _ = broker
+    clients = []
+
+    async def connect(inbox=None, reconnect_delay: float = 0.01) -> BrokerClient:
+        client = BrokerClient(url, inbox or Inbox(), reconnect_delay=reconnect_delay)
+        await client.start(timeout=1)
+        clients.append(client)
+        return client
+
+    yield connect
+    for client in clients:
+        await client.close()
+
+
+def test_url_parsing():
+    assert parse_url("unix:///tmp/b.sock") == ("unix", "/tmp/b.sock", None)
+    assert parse_url("tcp://10.0.0.1:7000") == ("tcp", "10.0.0.1", 7000)
+    with pytest.raises(ValueError):
+        parse_url("redis://localhost:6379")
+
+
+async def test_set_get_delete(connect):
+    first, second = await connect(), await connect()
+    await first.set("session:a", "worker-1")
+    assert await second.get("session:a") == "worker-1"
+    await second.set("session:a", "worker-2")
+    assert await first.get("session:a") == "worker-2"
+    await first.delete("session:a")
+    assert await second.get("session:a") is None
+
+
+async def test_publish_reaches_subscribers_only(connect):
+    inbox = Inbox()
+    subscriber = await connect(inbox)
+    publisher = await connect()
+    await subscriber.subscribe("worker:1")
+    assert await publisher.publish("worker:1", {"type": "post", "body": "{}"}) == 1
+    assert await publisher.publish("worker:2", "nobody") == 0
+    await _eventually(lambda: bool(inbox.messages))
+    assert inbox.messages == [("worker:1", {"type": "post", "body": "{}"})]
+
+
+async def test_keys_of_a_disconnected_client_are_dropped(broker, connect):
+    _, server = broker
+    leaving, staying = await connect(), await connect()
+    await leaving.set("session:a", "worker-1")
+    await staying.set("session:b", "worker-2")
+    await leaving.subscribe("worker:1")
+    await leaving.close()
+
+    async def forgotten():
+        return await staying.get("session:a") is None
+    await _eventually(forgotten)
+    assert await staying.get("session:b") == "worker-2"
+    assert await staying.publish("worker:1", "gone") == 0
+    assert server.stats() == {"keys": 1, "channels": 0}
+
+
+async def test_unreachable_broker(tmp_path):
+    client = BrokerClient(f"unix://{tmp_path / 'missing.sock'}", Inbox(), reconnect_delay=0.01)
+    with pytest.raises(BrokerError):
+        await client.start(timeout=0.1)
+    with pytest.raises(BrokerError):
+        await client.get("session:a")
+
+
+async def test_client_restores_keys_and_subscriptions_after_reconnecting(connect):
+    inbox = Inbox()
+    client = await connect(inbox, reconnect_delay=0.2)
+    observer = await connect()
+    await client.set("session:a", "worker-1")
+    await client.subscribe("worker:1")
+
+    # The broker loses the connection and forgets what the client had set
+    client._writer.transport.abort()
+
+    async def forgotten():
+        return await observer.get("session:a") is None and await observer.publish("worker:1", "lost") == 0
+    await _eventually(forgotten)
+
+    async def restored():
+        try:
+            return await observer.get("session:a") == "worker-1" and await observer.publish("worker:1", "again") == 1
+        except BrokerError:
+            return False
+    await _eventually(restored)
+    await _eventually(lambda: ("worker:1", "again") in inbox.messages)
+    assert await client.get("session:a") == "worker-1"
+
+
+async def test_client_moves_to_a_restarted_broker(tmp_path):
+    url = f"unix://{tmp_path / 'broker.sock'}"
+    listener = await BrokerServer().serve(url)
+    inbox = Inbox()
+    client = BrokerClient(url, inbox, reconnect_delay=0.01)
+    await client.start(timeout=1)
+    try:
+        await client.set("session:a", "worker-1")
+        await client.subscribe("worker:1")
+        listener.close()
+        client._writer.transport.abort()
+        await listener.wait_closed()
+
+        restarted = BrokerServer()
+        listener = await restarted.serve(url)
+        await _eventually(lambda: restarted.stats() == {"keys": 1, "channels": 1})
+        assert await client.get("session:a") == "worker-1"
+    finally:
+        await client.close()
+        listener.close()
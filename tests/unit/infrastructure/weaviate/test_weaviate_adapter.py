@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("weaviate")
+
+import weaviate
+from src.config.settings import settings
+from src.domain.entities import ProjectEntity, ServiceEntity
+from src.infrastructure.weaviate.weaviate_adapter import AsyncWeaviateAdapter
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeQuery:
+    def __init__(self, objects):
+        self.objects = objects
+        self.calls = []
+
+    async def hybrid(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(objects=[SimpleNamespace(properties=p) for p in self.objects])
+
+
+class FakeAsyncClient:
+    """The part of WeaviateAsyncClient the adapter uses."""
+
+    def __init__(self, collections, ready: bool = True):
+        self.ready = ready
+        self.connected = False
+        self.queries = {name: FakeQuery(objects) for name, objects in collections.items()}
+        self.collections = SimpleNamespace(get=lambda name: SimpleNamespace(query=self.queries[name]))
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def connect(self) -> None:
+        self.connected = True
+
+    async def is_ready(self) -> bool:
+        return self.ready
+
+
+class FakePreparer:
+    def __init__(self):
+        self.queries = []
+
+    async def prepare(self, query: str):
+        self.queries.append(query)
+        return "сайт клиника", [0.1, 0.2]
+
+
+def _adapter(monkeypatch, client: FakeAsyncClient) -> AsyncWeaviateAdapter:
+    monkeypatch.setattr(weaviate, "use_async_with_local", lambda **kwargs: client)
+    return AsyncWeaviateAdapter(FakePreparer())
+
+
+async def test_projects_hybrid_query_and_mapping(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_ALPHA", 0.7)
+    client = FakeAsyncClient({"PortfolioProject": [
+        {"title": "Клиника", "url": "https://example.com/clinic", "full_text": "Сайт для клиники с записью к врачу."},
+        {"url": None, "full_text": None},
+    ]})
+    adapter = _adapter(monkeypatch, client)
+    projects = await adapter.search_projects("Сайты клиник", limit=2)
+
+    assert client.queries["PortfolioProject"].calls == [{
+        "query": "сайт клиника",
+        "vector": [0.1, 0.2],
+        "limit": 2,
+        "query_properties": ["lemmatized_text", "lemmatized_title"],
+        "alpha": 0.7,
+    }]
+    assert adapter.preparer.queries == ["Сайты клиник"]
+    assert all(isinstance(p, ProjectEntity) for p in projects)
+    assert projects[0].title == "Клиника" and projects[0].url == "https://example.com/clinic"
+    assert "клиники" in projects[0].description
+    assert projects[1].title == "No Title" and projects[1].description == ""
+
+
+async def test_services_hybrid_query_and_mapping(monkeypatch):
+    client = FakeAsyncClient({"PriceList": [{"service": "Хостинг", "price": "1500", "description": "В месяц"}]})
+    adapter = _adapter(monkeypatch, client)
+    services = await adapter.search_services("хостинг")
+
+    call, = client.queries["PriceList"].calls
+    assert call["limit"] == 5 and call["query_properties"] == ["lemmatized_service", "lemmatized_description"]
+    assert services == [ServiceEntity(service="Хостинг", price=1500.0, description="В месяц")]
+    assert client.connected
+
+
+async def test_not_ready_returns_no_results(monkeypatch):
+    client = FakeAsyncClient({"PortfolioProject": [{"title": "Клиника"}], "PriceList": []}, ready=False)
+    adapter = _adapter(monkeypatch, client)
+    assert await adapter.search_projects("сайт") == []
+    assert await adapter.search_services("хостинг") == []
+    assert client.queries["PortfolioProject"].calls == [] and adapter.preparer.queries == []
@@ -0,0 +1,86 @@
+import json
+import pytest
+from src.domain.entities import BatchSearchItem, ProjectEntity, ServiceEntity
+from src.presentation.formatting import (
+    MIN_DESCRIPTION,
+    CompactRenderer,
+    JsonRenderer,
+    Renderer,
+    TextRenderer,
+    _cut,
+    _fit,
+    format_projects,
+)
+
+PROJECTS = [
+    ProjectEntity(title=f"Проект {i}", url=f"https://example.com/{i}", description="слово " * (20 + 60 * i))
+    for i in range(5)
+]
+SERVICES = [ServiceEntity(name=f"Услуга {i}", price=1000.0 + i, description="описание " * 30) for i in range(3)]
+
+
+def test_fit_keeps_everything_within_budget():
+    assert _fit([10, 10], [50, 50], 1000) == (2, [50, 50])
+
+
+def test_fit_shares_what_is_left_between_long_descriptions():
+    count, limits = _fit([10, 10, 10], [20, 500, 900], 400)
+    assert count == 3
+    # The short description stays whole, the long ones get equal shares
+    assert limits[0] == 20 and limits[1] == limits[2] == (400 - 30 - 20) // 2
+
+
+def test_fit_drops_hits_that_cannot_show_min_description():
+    count, limits = _fit([10] * 5, [500] * 5, 3 * (10 + MIN_DESCRIPTION))
+    assert count == 3 and sum(limits) + 30 <= 3 * (10 + MIN_DESCRIPTION)
+
+
+def test_fit_always_keeps_one_hit():
+    count, limits = _fit([100, 100], [500, 500], 50)
+    assert count == 1 and limits == [0]
+
+
+def test_cut_at_word_boundary():
+    assert _cut("short", 10) == "short"
+    assert _cut("one two three four", 12) == "one two…"
+    assert len(_cut("x" * 50, 10)) == 10
+
+
+@pytest.mark.parametrize("renderer_class", [TextRenderer, CompactRenderer])
+@pytest.mark.parametrize("budget", [300, 800, 2000])
+def test_text_layouts_stay_within_budget(renderer_class, budget):
+    renderer = renderer_class(budget)
+    assert len(renderer.projects("сайт", PROJECTS).text) <= budget
+    item = BatchSearchItem(query="сайт", projects=PROJECTS, services=SERVICES)
+    assert len(renderer.everything(item).text) <= budget
+
+
+def test_batch_shares_the_budget_between_queries():
+    item = BatchSearchItem(query="сайт", projects=PROJECTS, services=SERVICES)
+    text = TextRenderer(1500).batch([item, item]).text
+    assert len(text) <= 1500 and text.count("=== QUERY") == 2
+
+
+def test_omitted_hits_are_announced():
+    text = CompactRenderer(300).projects("сайт", PROJECTS).text
+    assert "more)" in text and "1. Проект 0" in text
+
+
+@pytest.mark.parametrize("budget", [400, 1500])
+def test_json_layout_is_valid_and_about_the_budget(budget):
+    rendered = JsonRenderer(budget).everything(BatchSearchItem(query="сайт", projects=PROJECTS, services=SERVICES))
+    assert json.loads(rendered.text) == rendered.structured
+    assert len(rendered.text) <= budget * 1.1
+
+
+def test_unlimited_text_layout_is_unchanged():
+    text = format_projects("сайт", PROJECTS[:1])
+    assert text == (
+        "Projects found for 'сайт':\n\n"
+        f"- PROJECT: Проект 0\n  URL: https://example.com/0\n  INFO: {PROJECTS[0].description}\n\n"
+    )
+
+
+def test_renderer_is_abstract():
+    with pytest.raises(TypeError):
+        Renderer()